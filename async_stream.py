@@ -0,0 +1,153 @@
+"""Asynchronous, incremental simulation API for embedding the simulator.
+
+``main.simulation_loop`` and ``bulk_run.run_benchmarks`` block until every
+battle is done. ``simulate_stream`` is an async generator for tools that want
+to show live convergence or stop early::
+
+    async for snapshot in simulate_stream(config, runs=100_000, batch=1000, seed=7):
+        print(snapshot.battles, snapshot.win_rate, snapshot.interval)
+
+Battles are simulated in batches on an executor (a worker thread, or a process
+pool with ``workers > 1``), so the event loop stays free. After each batch a
+``Snapshot`` of the running totals is yielded, in battle order. Battle ``i``
+draws from ``battle_rng(seed, i)``, the same stream ``simulation_loop`` uses,
+so a stream reproduces a ``main.py --seed`` run of the object or mass engine.
+
+The stream stops early if ``deadline`` seconds pass, and it can be
+cancelled like any other coroutine: cancel the consuming task, or break out
+of the loop and ``aclose()`` the generator. Batches that have not started yet
+are cancelled; a batch already running in a worker is abandoned.
+"""
+import asyncio
+import copy
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, NamedTuple, Optional, Tuple
+
+from battle_engine import run_battle
+from confidence import Z_95, wilson_interval
+from mass_engine import run_mass_battle
+from random_streams import battle_rng, derive_seed, new_master_seed
+from scenario import compile_scenario, validate_scenario_config
+from streaming_stats import MomentumRegression, RunLengthHistogram
+
+# (config, first battle index, battle count, master seed, engine)
+BatchTask = Tuple[Dict[str, Any], int, int, int, str]
+
+class Snapshot(NamedTuple):
+    """Running results after a batch.
+
+    Attributes:
+        battles: Battles simulated so far.
+        pc_wins: PC wins so far.
+        win_rate: PC win rate so far.
+        interval: Wilson confidence interval of the win rate.
+        pc_runs: PC run-length histogram so far.
+        npc_runs: NPC run-length histogram so far.
+        regression: Momentum regression moments so far.
+        elapsed: Seconds since the stream started.
+        done: True on the last snapshot of a stream that ran every battle.
+    """
+    battles: int
+    pc_wins: int
+    win_rate: float
+    interval: Tuple[float, float]
+    pc_runs: RunLengthHistogram
+    npc_runs: RunLengthHistogram
+    regression: MomentumRegression
+    elapsed: float
+    done: bool
+
+def run_stream_batch(task: BatchTask) -> Tuple[MomentumRegression, RunLengthHistogram, RunLengthHistogram]:
+    """Simulates one batch and returns its regression moments and run-length histograms (runs in a worker)."""
+    config, start, count, seed, engine = task
+    regression, pc_runs, npc_runs = MomentumRegression(), RunLengthHistogram(), RunLengthHistogram()
+    if engine == "batch":
+        from batch_engine import run_battles_batch
+        battles = run_battles_batch(config, count, rng=derive_seed(seed, "batch", start))
+    else:
+        battle_fn = run_mass_battle if engine == "mass" else run_battle
+        scenario = compile_scenario(config)
+        battles = (battle_fn(i + 1, scenario, rng=battle_rng(seed, i + 1)) for i in range(start, start + count))
+    for pcs_runs, npcs_runs, winner in battles:
+        regression.add_runs(winner, pcs_runs, npcs_runs)
+        pc_runs.extend(pcs_runs)
+        npc_runs.extend(npcs_runs)
+    return regression, pc_runs, npc_runs
+
+async def simulate_stream(config: Dict[str, Any], runs: int, batch: int = 1000, seed: Optional[int] = None,
+                          engine: str = "object", workers: int = 1, executor: Optional[Executor] = None,
+                          deadline: Optional[float] = None, z: float = Z_95) -> AsyncIterator[Snapshot]:
+    """Simulates a scenario off the event loop and yields the running results after every batch.
+
+    Args:
+        config: Scenario configuration (validated before anything runs).
+        runs: Total number of battles.
+        batch: Battles per batch (and per snapshot).
+        seed: Master seed (random if None).
+        engine: "object", "mass" or "batch" (requires NumPy).
+        workers: Batches kept in flight; with no ``executor``, more than one
+            starts a process pool of this size.
+        executor: Executor to run batches on (owned by the caller), or None
+            to create one for the stream.
+        deadline: Seconds after which the stream stops, or None.
+        z: Normal quantile of the win-rate interval (95% by default).
+
+    Yields:
+        Snapshot: Running totals, once per completed batch, in battle order.
+
+    Raises:
+        ConfigurationError: If the scenario configuration is invalid.
+    """
+    validate_scenario_config(config)
+    if seed is None:
+        seed = new_master_seed()
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    stop_at = None if deadline is None else loop.time() + deadline
+
+    owned = executor is None
+    if owned:
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else ThreadPoolExecutor(max_workers=1)
+
+    tasks = ((config, start, min(batch, runs - start), seed, engine) for start in range(0, runs, batch))
+    pending: "deque[asyncio.Future]" = deque()
+    regression, pc_runs, npc_runs = MomentumRegression(), RunLengthHistogram(), RunLengthHistogram()
+
+    def submit():
+        for task in tasks:
+            pending.append(loop.run_in_executor(executor, run_stream_batch, task))
+            if len(pending) >= max(1, workers):
+                break
+
+    try:
+        submit()
+        while pending:
+            timeout = None if stop_at is None else stop_at - loop.time()
+            if timeout is not None and timeout <= 0:
+                return
+            try:
+                chunk_regression, chunk_pc, chunk_npc = await asyncio.wait_for(pending.popleft(), timeout)
+            except asyncio.TimeoutError:
+                return
+            submit()
+            regression.merge(chunk_regression)
+            pc_runs.merge(chunk_pc)
+            npc_runs.merge(chunk_npc)
+            yield Snapshot(
+                battles=regression.battles,
+                pc_wins=regression.pc_wins,
+                win_rate=regression.pc_wins / regression.battles,
+                interval=wilson_interval(regression.pc_wins, regression.battles, z),
+                pc_runs=copy.deepcopy(pc_runs),
+                npc_runs=copy.deepcopy(npc_runs),
+                regression=copy.deepcopy(regression),
+                elapsed=time.perf_counter() - started,
+                done=not pending,
+            )
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned:
+            executor.shutdown(wait=False)
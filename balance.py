@@ -0,0 +1,204 @@
+"""Balance target solver: find the integer parameter value that gives a target PC win rate.
+
+``solve_balance`` answers questions like "which DT makes this fight a 60% PC
+win?" by stochastic bisection over an integer parameter of the scenario
+(an NPC's DT, a PC's HP, ...):
+
+- The PC win rate is assumed monotone in the parameter over the searched
+  range (higher DT or NPC HP means fewer PC wins, higher PC HP or aptitude
+  means more), which the solver checks at both ends of the range.
+- Every candidate value replays the same battle streams (battle ``i`` always
+  draws from ``battle_rng(seed, i)``), so differences between candidates come
+  from the parameter and not from sampling noise (common random numbers).
+- Each candidate is simulated in batches only until its 95% Wilson interval
+  excludes the target, so clearly-off values cost one batch and values close
+  to the target get more battles, up to a cap.
+"""
+import copy
+import random
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from battle_engine import run_battle
+from confidence import Z_95, wilson_interval
+from exceptions import ConfigurationError, SolverError
+from mass_engine import run_mass_battle
+from random_streams import battle_rng
+from scenario import compile_scenario, validate_scenario_config
+
+# "npcs[0].dt", "pcs[*].hp" (every member of the team), ...
+_PARAMETER = re.compile(r"^(pcs|npcs)\[(\d+|\*)\]\.(\w+)$")
+
+# Tunable integer attributes and the default search range for each
+DEFAULT_BOUNDS = {
+    'dt': (1, 40),
+    'hp': (1, 30),
+    'aptitude': (-5, 20),
+}
+
+class BalanceResult(NamedTuple):
+    """Outcome of a balance search.
+
+    Attributes:
+        parameter: The tuned parameter path.
+        value: Value whose estimated win rate is closest to the target.
+        win_rate: Estimated PC win rate at ``value``.
+        interval: 95% Wilson interval of the win rate at ``value``.
+        value_interval: Range of evaluated values whose win-rate interval contains
+            the target (``(value, value)`` if every value was told apart from it).
+        runs: Total battles simulated over all candidates.
+        evaluations: (PC wins, battles) of every evaluated value.
+    """
+    parameter: str
+    value: int
+    win_rate: float
+    interval: Tuple[float, float]
+    value_interval: Tuple[int, int]
+    runs: int
+    evaluations: Dict[int, Tuple[int, int]]
+
+def parse_parameter(config: Dict[str, Any], parameter: str) -> Tuple[str, List[int], str]:
+    """Resolves a parameter path to (team key, member indices, attribute).
+
+    Raises:
+        ConfigurationError: If the path is malformed, out of range or not a tunable attribute.
+    """
+    match = _PARAMETER.match(parameter)
+    if match is None:
+        raise ConfigurationError(f"Invalid parameter '{parameter}' (expected e.g. 'npcs[0].dt' or 'pcs[*].hp').")
+    team, index, attribute = match.groups()
+    if attribute not in DEFAULT_BOUNDS:
+        raise ConfigurationError(f"Parameter '{parameter}' is not tunable (expected one of {', '.join(DEFAULT_BOUNDS)}).")
+    members = config.get(team, [])
+    if index == '*':
+        indices = list(range(len(members)))
+    else:
+        indices = [int(index)]
+    if not indices or indices[-1] >= len(members):
+        raise ConfigurationError(f"Parameter '{parameter}' refers to a missing member of '{team}'.")
+    if team == 'pcs' and attribute == 'dt':
+        raise ConfigurationError("PCs have no DT.")
+    return team, indices, attribute
+
+def with_parameter(config: Dict[str, Any], parameter: str, value: int) -> Dict[str, Any]:
+    """Returns a copy of ``config`` with the parameter set to ``value``."""
+    team, indices, attribute = parse_parameter(config, parameter)
+    updated = copy.deepcopy(config)
+    for i in indices:
+        updated[team][i][attribute] = value
+    return updated
+
+class _Candidate:
+    """Running win count of one parameter value over the shared battle streams."""
+    __slots__ = ('scenario', 'wins', 'runs')
+
+    def __init__(self, config: Dict[str, Any]):
+        self.scenario = compile_scenario(config)
+        self.wins = 0
+        self.runs = 0
+
+    def simulate(self, count: int, seed: int, battle_fn: Callable):
+        """Plays the next ``count`` battles; battle ``i`` uses the same stream for every candidate."""
+        for i in range(self.runs, self.runs + count):
+            _, _, winner = battle_fn(i + 1, self.scenario, rng=battle_rng(seed, i + 1))
+            self.wins += winner == "pcs"
+        self.runs += count
+
+    def interval(self, z: float) -> Tuple[float, float]:
+        return wilson_interval(self.wins, self.runs, z)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.runs if self.runs else 0.0
+
+def solve_balance(config: Dict[str, Any], parameter: str, target_win_rate: float,
+                  low: Optional[int] = None, high: Optional[int] = None, seed: Optional[int] = None,
+                  batch_size: int = 200, max_runs: int = 5000, engine: str = "object",
+                  z: float = Z_95) -> BalanceResult:
+    """Finds the integer parameter value whose PC win rate is closest to a target.
+
+    Args:
+        config: Scenario configuration (left unchanged).
+        parameter: Path of the integer to tune, e.g. ``"npcs[0].dt"``, ``"pcs[1].hp"``
+            or ``"npcs[*].hp"`` to set the same value on every NPC.
+        target_win_rate: Target PC win rate, between 0 and 1.
+        low: Lowest value searched (``DEFAULT_BOUNDS`` of the attribute if None).
+        high: Highest value searched.
+        seed: Seed of the shared battle streams (random if None).
+        batch_size: Battles added to a candidate per step.
+        max_runs: Battles after which a candidate that cannot be told apart from
+            the target is accepted as a match.
+        engine: "object" or "mass".
+        z: Normal quantile of the intervals (95% by default).
+
+    Returns:
+        BalanceResult: Best value, its win rate and interval, and the search data.
+
+    Raises:
+        ConfigurationError: If the parameter or bounds are invalid.
+        SolverError: If the target is not between the win rates at the two bounds.
+    """
+    if not 0.0 < target_win_rate < 1.0:
+        raise ConfigurationError(f"Target win rate must be between 0 and 1, got {target_win_rate}.")
+    _, _, attribute = parse_parameter(config, parameter)
+    default_low, default_high = DEFAULT_BOUNDS[attribute]
+    low = default_low if low is None else low
+    high = default_high if high is None else high
+    if low >= high:
+        raise ConfigurationError(f"Empty search range [{low}, {high}].")
+    if attribute == 'hp':
+        low = max(low, 1)
+    if seed is None:
+        seed = random.SystemRandom().randrange(2**32)
+    battle_fn = run_mass_battle if engine == "mass" else run_battle
+
+    candidates: Dict[int, _Candidate] = {}
+
+    def side(value: int) -> int:
+        """+1 / -1 if the win rate at ``value`` is clearly above / below the target, 0 if undecided."""
+        candidate = candidates.get(value)
+        if candidate is None:
+            updated = with_parameter(config, parameter, value)
+            validate_scenario_config(updated)
+            candidate = candidates[value] = _Candidate(updated)
+        while True:
+            ci_low, ci_high = candidate.interval(z)
+            if ci_low > target_win_rate:
+                return 1
+            if ci_high < target_win_rate:
+                return -1
+            if candidate.runs >= max_runs:
+                return 0
+            candidate.simulate(min(batch_size, max_runs - candidate.runs), seed, battle_fn)
+
+    side_low, side_high = side(low), side(high)
+    if side_low == side_high != 0:
+        rates = f"{candidates[low].win_rate:.1%} at {low}, {candidates[high].win_rate:.1%} at {high}"
+        raise SolverError(f"Target win rate {target_win_rate:.1%} is not bracketed by {parameter} "
+                          f"in [{low}, {high}] ({rates}).")
+
+    # Integer bisection keeping side(lo) == side_low and side(hi) == side_high
+    lo, hi = low, high
+    if side_low != 0 and side_high != 0:
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            s = side(mid)
+            if s == 0:
+                break
+            if s == side_low:
+                lo = mid
+            else:
+                hi = mid
+
+    best = min(candidates, key=lambda v: (abs(candidates[v].win_rate - target_win_rate), v))
+    plausible = [v for v, c in candidates.items() if c.interval(z)[0] <= target_win_rate <= c.interval(z)[1]]
+    value_interval = (min(plausible), max(plausible)) if plausible else (best, best)
+    return BalanceResult(
+        parameter=parameter,
+        value=best,
+        win_rate=candidates[best].win_rate,
+        interval=candidates[best].interval(z),
+        value_interval=value_interval,
+        runs=sum(c.runs for c in candidates.values()),
+        evaluations={v: (c.wins, c.runs) for v, c in sorted(candidates.items())},
+    )
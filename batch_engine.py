@@ -0,0 +1,226 @@
+"""Vectorized battle engine that simulates many battles in lockstep.
+
+Every battle of a batch is a row in a set of NumPy arrays (HP matrices,
+momentum vector, friction stacks, run-actor masks). Each loop iteration
+advances every unfinished battle by one turn, draws all dice for that turn in
+a single vectorized call and retires finished battles by masking.
+
+The rules mirror ``battle_engine.run_battle`` with the default targeting
+strategies: PCs attack the living NPC with the lowest DT (first in team order
+on ties) and NPCs attack a uniformly random living PC.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from constants import DEFAULT_PC_HP, DEFAULT_APTITUDE, CRITICAL_DAMAGE, STANDARD_DAMAGE, MIN_DAMAGE, BOON_BANE_DICE
+from exceptions import BattleError
+from scenario import CompiledScenario
+
+# Outcome codes used inside the arrays
+TRIUMPH, CLEAN_SUCCESS, SETBACK, FAILURE, CATASTROPHE = range(5)
+
+BattleResult = Tuple[List[int], List[int], str]
+
+# Boon/bane die sides indexed by capped net stacks (index 0 is never rolled)
+_DIE_SIDES = np.array([1] + [BOON_BANE_DICE[s] for s in range(1, 6)], dtype=np.int64) if np is not None else None
+
+def _team_arrays(members: List[Dict[str, Any]], is_pc: bool) -> Dict[str, "np.ndarray"]:
+    """Extracts the per-member columns for a team, applying the same defaults as PC/NPC."""
+    if is_pc:
+        hp = [m['hp'] if m.get('hp') is not None else DEFAULT_PC_HP for m in members]
+        dt = [0 for _ in members]
+    else:
+        hp = [m['hp'] for m in members]
+        dt = [m['dt'] for m in members]
+    aptitude = [m['aptitude'] if m.get('aptitude') is not None else DEFAULT_APTITUDE for m in members]
+    exp_atk = [bool(m.get('expertise_attack', False) or m.get('exp_atk', False)) for m in members]
+    exp_def = [bool(m.get('expertise_defense', False) or m.get('exp_def', False)) for m in members]
+
+    exp_atk = np.array(exp_atk, dtype=bool)
+    # Actor priority: attack experts first, then everyone else, both in team order
+    order = np.concatenate([np.flatnonzero(exp_atk), np.flatnonzero(~exp_atk)])
+    return {
+        'hp': np.array(hp, dtype=np.int64),
+        'dt': np.array(dt, dtype=np.int64),
+        'aptitude': np.array(aptitude, dtype=np.int64),
+        'exp_atk': exp_atk,
+        'exp_def': np.array(exp_def, dtype=bool),
+        'order': order,
+    }
+
+def _first_in_order(mask: "np.ndarray", order: "np.ndarray") -> "np.ndarray":
+    """Returns, per row, the first member index in ``order`` whose mask entry is True."""
+    return order[np.argmax(mask[:, order], axis=1)]
+
+def _select_actors(hp: "np.ndarray", acted: "np.ndarray", order: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Vectorized ``select_actor``: unacted attack experts, then unacted others, then any living member."""
+    living = hp > 0
+    candidates = living & ~acted
+    exhausted = ~candidates.any(axis=1)
+    candidates[exhausted] = living[exhausted]
+    return _first_in_order(candidates, order), living
+
+def _roll_outcomes(d20_a, d20_b, die_u, expertise, aptitude, dt, net_stacks) -> "np.ndarray":
+    """Vectorized ``resolve_roll`` on pre-drawn uniforms, returning outcome codes."""
+    d1 = np.floor(d20_a * 20).astype(np.int64) + 1
+    d2 = np.floor(d20_b * 20).astype(np.int64) + 1
+    d20 = np.where(expertise, np.maximum(d1, d2), d1)
+
+    magnitude = np.minimum(np.abs(net_stacks), 5)
+    sides = _DIE_SIDES[magnitude]
+    die = np.where(magnitude > 0, np.floor(die_u * sides).astype(np.int64) + 1, 0)
+    total = d20 + aptitude + np.sign(net_stacks) * die
+
+    outcome = np.full(total.shape, FAILURE, dtype=np.int64)
+    outcome[total <= dt - 10] = CATASTROPHE
+    outcome[total >= dt - 2] = SETBACK
+    outcome[total >= dt + 3] = CLEAN_SUCCESS
+    outcome[d20 == 20] = TRIUMPH
+    return outcome
+
+def run_battles_batch(scenario_config: Union[Dict[str, Any], CompiledScenario], n: int, rng: Optional[Any] = None,
+                      return_hp: bool = False):
+    """
+    Executes ``n`` independent battles of one scenario in lockstep.
+
+    Args:
+        scenario_config: Configuration dictionary (or compiled scenario) defining teams and settings.
+        n (int): Number of battles to simulate.
+        rng: Optional ``numpy.random.Generator`` (or an integer seed) for reproducible batches.
+        return_hp (bool): Also return the final HP of every combatant.
+
+    Returns:
+        List[Tuple[List[int], List[int], str]]: One ``(pcs_run_lengths, npcs_run_lengths, winner)``
+        tuple per battle, in the same format as ``run_battle``. With ``return_hp``,
+        a ``(results, final_hp)`` pair where ``final_hp`` is an ``(n, pcs + npcs)``
+        array with the PCs first.
+
+    Raises:
+        BattleError: If NumPy is not installed.
+    """
+    if np is None:
+        raise BattleError("The batch engine requires NumPy (pip install numpy).")
+    if not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+    if isinstance(scenario_config, CompiledScenario):
+        scenario_config = scenario_config.config
+
+    pcs = _team_arrays(scenario_config.get("pcs", []), is_pc=True)
+    npcs = _team_arrays(scenario_config.get("npcs", []), is_pc=False)
+    # PCs always pick the living NPC with the lowest DT (stable on ties)
+    npc_dt_order = np.argsort(npcs['dt'], kind='stable')
+
+    pc_hp = np.tile(pcs['hp'], (n, 1))
+    npc_hp = np.tile(npcs['hp'], (n, 1))
+    pc_acted = np.zeros(pc_hp.shape, dtype=bool)
+    npc_acted = np.zeros(npc_hp.shape, dtype=bool)
+    pcs_momentum = np.full(n, scenario_config.get("starting_momentum", "pcs") == "pcs")
+    friction_stacks = np.zeros(n, dtype=np.int64)
+    friction_active = np.zeros(n, dtype=bool)
+    run_length = np.zeros(n, dtype=np.int64)
+    running = np.ones(n, dtype=bool)
+
+    # Completed runs, recorded as parallel chunks of (battle, side is pcs, length)
+    run_battle_ids, run_sides, run_lengths = [], [], []
+
+    def record(battles, sides, lengths):
+        run_battle_ids.append(battles)
+        run_sides.append(sides)
+        run_lengths.append(lengths)
+
+    while True:
+        b = np.flatnonzero(running)
+        if b.size == 0:
+            break
+
+        # Check Win, then retire finished battles and record their last run
+        done = ~(pc_hp[b] > 0).any(axis=1) | ~(npc_hp[b] > 0).any(axis=1)
+        if done.any():
+            finished = b[done]
+            running[finished] = False
+            open_run = finished[run_length[finished] > 0]
+            record(open_run, pcs_momentum[open_run], run_length[open_run])
+            b = b[~done]
+            if b.size == 0:
+                break
+
+        # All dice for this turn in one draw: d20, second d20, boon/bane die, target pick
+        u = rng.random((4, b.size))
+
+        # Calculate Friction for this Turn
+        friction_stacks[b] += friction_active[b]
+        friction_count = np.where(friction_active[b], friction_stacks[b], 0)
+
+        shift = np.zeros(b.size, dtype=bool)
+        pc_turn = pcs_momentum[b]
+
+        # --- PCs attack NPCs: friction applies as banes ---
+        sel = np.flatnonzero(pc_turn)
+        if sel.size:
+            bp = b[sel]
+            actor, living = _select_actors(pc_hp[bp], pc_acted[bp], pcs['order'])
+            target = _first_in_order(npc_hp[bp] > 0, npc_dt_order)
+            bane_stacks = friction_count[sel] + npcs['exp_def'][target]
+            outcome = _roll_outcomes(
+                u[0, sel], u[1, sel], u[2, sel],
+                expertise=pcs['exp_atk'][actor],
+                aptitude=pcs['aptitude'][actor],
+                dt=npcs['dt'][target],
+                net_stacks=1 - bane_stacks,
+            )
+            damage = np.where(outcome == TRIUMPH, CRITICAL_DAMAGE, np.where(outcome == CLEAN_SUCCESS, MIN_DAMAGE, 0))
+            npc_hp[bp, target] = np.maximum(npc_hp[bp, target] - damage, 0)
+            pc_acted[bp, actor] = True
+            all_acted = (pc_acted[bp] | ~living).all(axis=1)
+            friction_active[bp] |= all_acted
+            shift[sel] = (outcome != CLEAN_SUCCESS) & (outcome != TRIUMPH)
+
+        # --- NPCs attack PCs: the PC defends, friction applies as boons ---
+        sel = np.flatnonzero(~pc_turn)
+        if sel.size:
+            bn = b[sel]
+            actor, living = _select_actors(npc_hp[bn], npc_acted[bn], npcs['order'])
+            living_pcs = pc_hp[bn] > 0
+            pick = np.floor(u[3, sel] * living_pcs.sum(axis=1)).astype(np.int64)
+            target = np.argmax(np.cumsum(living_pcs, axis=1) > pick[:, None], axis=1)
+            outcome = _roll_outcomes(
+                u[0, sel], u[1, sel], u[2, sel],
+                expertise=pcs['exp_def'][target],
+                aptitude=pcs['aptitude'][target],
+                dt=npcs['dt'][actor],
+                net_stacks=1 + friction_count[sel] - npcs['exp_atk'][actor],
+            )
+            damage = np.where(outcome == CATASTROPHE, CRITICAL_DAMAGE,
+                              np.where((outcome == FAILURE) | (outcome == SETBACK), STANDARD_DAMAGE, 0))
+            pc_hp[bn, target] = np.maximum(pc_hp[bn, target] - damage, 0)
+            npc_acted[bn, actor] = True
+            all_acted = (npc_acted[bn] | ~living).all(axis=1)
+            friction_active[bn] |= all_acted
+            shift[sel] = (outcome == CLEAN_SUCCESS) | (outcome == TRIUMPH)
+
+        # Update Run State and handle Momentum Shift
+        run_length[b] += 1
+        if shift.any():
+            shifted = b[shift]
+            record(shifted, pcs_momentum[shifted], run_length[shifted])
+            pcs_momentum[shifted] = ~pcs_momentum[shifted]
+            run_length[shifted] = 0
+            friction_stacks[shifted] = 0
+            friction_active[shifted] = False
+            pc_acted[shifted] = False
+            npc_acted[shifted] = False
+
+    results = [([], [], "pcs" if alive else "npcs") for alive in (pc_hp > 0).any(axis=1)]
+    if run_battle_ids:
+        battle_ids = np.concatenate(run_battle_ids).tolist()
+        sides = np.concatenate(run_sides).tolist()
+        lengths = np.concatenate(run_lengths).tolist()
+        for battle, is_pcs, length in zip(battle_ids, sides, lengths):
+            results[battle][0 if is_pcs else 1].append(length)
+    if return_hp:
+        return results, np.concatenate([pc_hp, npc_hp], axis=1)
+    return results
@@ -1,36 +1,39 @@
 import random
-import logging
-from typing import List, Set, Tuple, Optional
-from pcs import PC
-from npcs import NPC
-from mechanics import Outcome, Combatant
-
-logger = logging.getLogger(__name__)
+from typing import List, Set, Tuple, Optional, Union
+from mechanics import Outcome, Combatant, explain_roll, outcome_samplers
+from battle_trace import TraceSink, TurnEvent, explain_rng
+from strategies import TargetIndex, bind_strategies, takes_rng
+from scenario import CompiledScenario, compile_scenario
+from constants import CRITICAL_DAMAGE, MIN_DAMAGE, STANDARD_DAMAGE
 
 def get_living_members(team: List[Combatant]) -> List[Combatant]:
     """Returns a list of members in the team that are currently alive."""
     return [m for m in team if m.is_alive()]
 
-def select_target(attacker: Combatant, enemy_team: List[Combatant]) -> Optional[Combatant]:
+def select_target(attacker: Combatant, enemy_team: List[Combatant], rng: Optional[random.Random] = None) -> Optional[Combatant]:
     """
     Selects a target from the enemy team using the attacker's strategy.
     
     Args:
         attacker: The entity initiating the action.
         enemy_team: List of potential targets.
+        rng: Random stream passed to strategies that accept it (global stream if None).
         
     Returns:
         The selected target, or None if no valid targets exist.
     """
-    # Use the attacker's strategy if available
+    # Use the attacker's strategy if available; two-argument strategies don't take the stream
     if hasattr(attacker, 'targeting_strategy'):
-        return attacker.targeting_strategy(attacker, enemy_team)
+        strategy = attacker.targeting_strategy
+        if takes_rng(strategy):
+            return strategy(attacker, enemy_team, rng=rng)
+        return strategy(attacker, enemy_team)
     
     # Fallback to random if no strategy defined
     living_enemies = get_living_members(team=enemy_team)
     if not living_enemies:
         return None
-    return random.choice(living_enemies)
+    return (rng or random).choice(living_enemies)
 
 def select_actor(team: List[Combatant], run_actors: Set[Combatant]) -> Combatant:
     """Selects the next character to act from the team based on expertise and turn state."""
@@ -48,13 +51,31 @@ def select_actor(team: List[Combatant], run_actors: Set[Combatant]) -> Combatant
         return experts[0]
     return others[0] if others else candidates[0]
 
-def run_battle(battle_id: int, scenario_config: dict) -> Tuple[List[int], List[int], str]:
+def _target_id(index: Optional[TargetIndex], actor: int, team_views: List[Combatant], enemy_views: List[Combatant],
+               rng: Optional[random.Random]) -> Optional[int]:
+    """Selects a target ID from the actor's bound strategy index.
+
+    Function-style strategies (no index) are called through ``select_target`` with the combatant views.
+    """
+    if index is not None:
+        return index.choose(rng)
+    target = select_target(attacker=team_views[actor], enemy_team=enemy_views, rng=rng)
+    return None if target is None else target.index
+
+def run_battle(battle_id: int, scenario_config: Union[dict, CompiledScenario], rng: Optional[random.Random] = None,
+               trace: Optional[TraceSink] = None) -> Tuple[List[int], List[int], str]:
     """
     Executes a single battle simulation.
     
     Args:
         battle_id (int): Identifier for this battle.
-        scenario_config (dict): Configuration dictionary defining teams and settings.
+        scenario_config: Configuration dictionary defining teams and settings, or a
+            CompiledScenario (from validate_scenario_config) whose teams are reset and
+            reused instead of being rebuilt.
+        rng (random.Random, optional): Random stream for every die and target pick
+            (global stream if None). Pass a seeded stream to reproduce a battle.
+        trace (TraceSink, optional): Receives a ``TurnEvent`` per turn (see
+            ``battle_trace``). The battle plays out the same with or without it.
         
     Returns:
         Tuple[List[int], List[int], str]: 
@@ -62,13 +83,18 @@ def run_battle(battle_id: int, scenario_config: dict) -> Tuple[List[int], List[i
             - List of NPC run lengths.
             - Winner string ("pcs" or "npcs").
     """
-    # Initialize Teams from Scenario Config
-    pcs_team = [PC(**p) for p in scenario_config.get("pcs", [])]
-    npcs_team = [NPC(**n) for n in scenario_config.get("npcs", [])]
+    # Initialize Teams from the compiled scenario
+    if isinstance(scenario_config, CompiledScenario):
+        scenario = scenario_config
+    else:
+        scenario = compile_scenario(scenario_config)
+    scenario.reset()
+    # The loop works on integer member IDs; the schedulers hold each team's
+    # actor queue and living count, so every turn is O(1) or O(log n)
+    pcs, npcs = scenario.pc_scheduler, scenario.npc_scheduler
 
     # State
-    current_momentum = scenario_config.get("starting_momentum", "pcs")
-    run_actors = set() # Track who acted in current run
+    pcs_turn = scenario.starting_momentum == "pcs"
     run_length = 0
     friction_stacks = 0  # Renamed: applied as banes or boons depending on momentum
     friction_active = False # Friction starts AFTER everyone acted once
@@ -79,36 +105,37 @@ def run_battle(battle_id: int, scenario_config: dict) -> Tuple[List[int], List[i
     
     turn_count = 0
     
-    logger.debug(f"=== Battle {battle_id} Start ===")
+    # Outcome draws; streams such as RoleStreams may supply their own samplers
+    (pc_sample, pc_rolls), (npc_sample, npc_rolls) = outcome_samplers(rng)
 
-    while True:
-        # Check Win
-        if not get_living_members(team=pcs_team):
-            logger.debug("NPCs Win!")
-            break
-        if not get_living_members(team=npcs_team):
-            logger.debug("PCs Win!")
-            break
-            
+    # Targeting indexes over the enemy team, told about every death on it
+    pc_targets, pc_watchers = bind_strategies(scenario.pc_state.strategies, scenario.npc_state)
+    npc_targets, npc_watchers = bind_strategies(scenario.npc_state.strategies, scenario.pc_state)
+
+    if trace is not None:
+        trace.battle_start(battle_id, scenario)
+        dice_rng = explain_rng(rng)
+
+    # Check Win
+    while pcs.any_alive() and npcs.any_alive():
         turn_count += 1
         
         # Identify Active Team and Passive Team
-        if current_momentum == "pcs":
-            active_team = pcs_team
-            passive_team = npcs_team
+        if pcs_turn:
+            active, passive = pcs, npcs
+            active_views, passive_views = scenario.pcs, scenario.npcs
+            targets, watchers = pc_targets, pc_watchers
         else:
-            active_team = npcs_team
-            passive_team = pcs_team
+            active, passive = npcs, pcs
+            active_views, passive_views = scenario.npcs, scenario.pcs
+            targets, watchers = npc_targets, npc_watchers
             
         # Select Actor and Target
-        actor = select_actor(team=active_team, run_actors=run_actors)
-        target = select_target(attacker=actor, enemy_team=passive_team)
+        actor = active.next_actor()
+        target = _target_id(targets[actor], actor, active_views, passive_views, rng)
         
-        if not target:
+        if target is None:
             break # Should be caught by win check
-            
-        # Friction Logic
-        living_active = get_living_members(team=active_team)
         
         # Calculate Friction for this Turn
         friction_count = 0
@@ -116,75 +143,75 @@ def run_battle(battle_id: int, scenario_config: dict) -> Tuple[List[int], List[i
             friction_stacks += 1
             friction_count = friction_stacks
         
-        logger.debug(f"Turn {turn_count}: {actor.name} (Friction: {friction_count}) acts against {target.name}")
-        
         # --- EXECUTE ACTION ---
-        momentum_shift = False
-
-        if isinstance(actor, PC):
-            from constants import CRITICAL_DAMAGE
+        if pcs_turn:
             # PC Attacking NPC - PC has momentum, friction applies as banes
-            damage, outcome = actor.make_attack(target=target, friction_banes=friction_count)
-            
-            if damage > 0:
-                target.take_damage(amount=damage)
+            expertise, aptitude, dt, banes = scenario.pc_attack[actor][target]
+            boon_stacks, bane_stacks = 1, banes + friction_count
+            outcome = pc_sample(expertise, aptitude, dt, boon_stacks, bane_stacks, rng=pc_rolls)
+            if outcome == Outcome.TRIUMPH:
+                damage = CRITICAL_DAMAGE
+            elif outcome == Outcome.CLEAN_SUCCESS:
+                damage = MIN_DAMAGE
+            else:
+                damage = 0
             
             # PC Success (Keep Momentum) = Clean Success or Triumph
-            momentum_shift = outcome not in [Outcome.CLEAN_SUCCESS, Outcome.TRIUMPH]
-            logger.debug(f"PC Attack {outcome.value}! Momentum {'Lost' if momentum_shift else 'Retained'}.")
+            momentum_shift = outcome not in (Outcome.CLEAN_SUCCESS, Outcome.TRIUMPH)
 
-        elif isinstance(actor, NPC):
+        else:
             # NPC Attacking PC -> PC Defends
             # Friction applies as BOONS to PC (NPCs have momentum)
-            outcome = target.defend_attack(attacker=actor, friction_boons=friction_count)
+            expertise, aptitude, dt, banes = scenario.npc_attack[actor][target]
+            boon_stacks, bane_stacks = 1 + friction_count, banes
+            outcome = npc_sample(expertise, aptitude, dt, boon_stacks, bane_stacks, rng=npc_rolls)
             
-            damage_to_pc = 0
+            damage = 0
             if outcome == Outcome.CATASTROPHE:
-                damage_to_pc = CRITICAL_DAMAGE
-            elif outcome in [Outcome.FAILURE, Outcome.SETBACK]:
-                damage_to_pc = 1
-            
-            if damage_to_pc > 0:
-                target.take_damage(amount=damage_to_pc)
+                damage = CRITICAL_DAMAGE
+            elif outcome in (Outcome.FAILURE, Outcome.SETBACK):
+                damage = STANDARD_DAMAGE
                 
             # If PC Defended (Clean/Triumph), they STEAL momentum.
-            momentum_shift = outcome in [Outcome.CLEAN_SUCCESS, Outcome.TRIUMPH]
-            logger.debug(f"PC Defense {outcome.value}! Momentum {'Stolen' if momentum_shift else 'NPC Keeps'}.")
+            momentum_shift = outcome in (Outcome.CLEAN_SUCCESS, Outcome.TRIUMPH)
+
+        if damage > 0 and passive.take_damage(target, damage):
+            for index in watchers:
+                index.on_death(target)
 
-        # Update Run State
-        run_actors.add(actor)
+        if trace is not None:
+            d20, boon, bane = explain_roll(expertise, aptitude, dt, boon_stacks, bane_stacks, outcome, rng=dice_rng)
+            trace.turn(TurnEvent(turn_count, pcs_turn, actor, target, friction_count, d20, boon, bane, outcome, damage))
+
+        # Update Run State; friction starts on the NEXT turn once everyone has acted.
+        # The active team takes no damage during its run, so its queue only shrinks by acting
         run_length += 1
-        
-        # Check friction trigger for NEXT turn
-        if not friction_active and all(m in run_actors for m in living_active):
+        if active.mark_acted(actor):
             friction_active = True
         
         # Handle Momentum Shift
         if momentum_shift:
             # Record Run Length
-            if current_momentum == "pcs":
+            if pcs_turn:
                 pcs_run_lengths.append(run_length)
-                current_momentum = "npcs"
-                logger.debug("Momentum shifts to NPCs.")
             else:
                 npcs_run_lengths.append(run_length)
-                current_momentum = "pcs"
-                logger.debug("Momentum shifts to PCs.")
+            pcs_turn = not pcs_turn
             
             # Reset Run State
-            run_actors = set()
+            passive.new_run()
             run_length = 0
             friction_stacks = 0
             friction_active = False
             
     # End of Battle - Record last run
     if run_length > 0:
-        if current_momentum == "pcs":
+        if pcs_turn:
             pcs_run_lengths.append(run_length)
         else:
             npcs_run_lengths.append(run_length)
             
-    winner = "pcs" if get_living_members(pcs_team) else "npcs"
+    winner = "pcs" if pcs.any_alive() else "npcs"
+    if trace is not None:
+        trace.battle_end(winner)
     return pcs_run_lengths, npcs_run_lengths, winner
-
-
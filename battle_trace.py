@@ -0,0 +1,185 @@
+"""Structured battle tracing.
+
+The engines emit compact ``TurnEvent`` tuples to an optional sink instead of
+formatting log messages; without a sink they build no strings at all. Text is
+only produced by ``TraceFormatter``, which rebuilds the classic battle log
+(names, aptitude, DT, expertise banes and HP) from the compiled scenario.
+
+Sinks implement the ``TraceSink`` protocol:
+
+- ``EventRecorder`` keeps the raw events, e.g. for tests or analysis.
+- ``LoggingTraceSink`` renders every event with a ``TraceFormatter`` and writes
+  the lines to a logger (this is what ``main.py`` uses for its verbose and
+  default modes).
+"""
+import logging
+import random
+from typing import Any, List, NamedTuple, Optional, Protocol, Tuple, runtime_checkable
+
+from mechanics import Outcome
+
+class TurnEvent(NamedTuple):
+    """One turn of a battle, as emitted by the engines.
+
+    Attributes:
+        turn (int): Turn number within the battle (from 1).
+        pcs_turn (bool): True if the PCs had momentum (the actor is a PC).
+        actor (int): Actor ID within the active team.
+        target (int): Target ID within the passive team.
+        friction (int): Friction stacks applied this turn.
+        d20 (int): Kept d20 of the roll (the PC's attack or defense roll).
+        boon (int): Boon die result (0 if none).
+        bane (int): Bane die result (0 if none).
+        outcome (Outcome): Outcome of the roll.
+        damage (int): Damage dealt this turn.
+    """
+    turn: int
+    pcs_turn: bool
+    actor: int
+    target: int
+    friction: int
+    d20: int
+    boon: int
+    bane: int
+    outcome: Outcome
+    damage: int
+
+@runtime_checkable
+class TraceSink(Protocol):
+    """Receiver of battle trace events."""
+    def battle_start(self, battle_id: int, scenario: Any) -> None: ...
+    def turn(self, event: TurnEvent) -> None: ...
+    def battle_end(self, winner: str) -> None: ...
+
+def explain_rng(rng: Optional[random.Random] = None) -> random.Random:
+    """Creates the stream a traced battle draws its displayed dice from.
+
+    It is seeded from the state of the battle stream without consuming it,
+    so a battle plays out the same with or without a sink and its log can be
+    regenerated from the battle seed.
+    """
+    return random.Random(repr((rng or random).getstate()))
+
+class TraceFormatter:
+    """
+    Renders trace events of one scenario as battle log lines.
+
+    The formatter tracks HP itself (starting from full HP at each battle
+    start), so events only need to carry the damage dealt.
+    """
+    def __init__(self, scenario: Any):
+        """Initializes the formatter.
+
+        Args:
+            scenario (CompiledScenario): The scenario the events refer to.
+        """
+        self.scenario = scenario
+        self.pc_hp: List[int] = []
+        self.npc_hp: List[int] = []
+
+    def battle_start(self, battle_id: int) -> List[str]:
+        """Lines opening a battle; resets the tracked HP."""
+        self.pc_hp = list(self.scenario.pc_state.max_hp)
+        self.npc_hp = list(self.scenario.npc_state.max_hp)
+        return [f"=== Battle {battle_id} Start ==="]
+
+    def battle_end(self, winner: str) -> List[str]:
+        """Lines closing a battle."""
+        return ["PCs Win!" if winner == "pcs" else "NPCs Win!"]
+
+    def turn(self, event: TurnEvent) -> List[str]:
+        """Lines describing one turn."""
+        pcs, npcs = self.scenario.pc_state, self.scenario.npc_state
+        if event.pcs_turn:
+            return self._pc_attack(event, pcs, npcs)
+        return self._pc_defense(event, pcs, npcs)
+
+    def _pc_attack(self, event: TurnEvent, pcs, npcs) -> List[str]:
+        pc, npc = event.actor, event.target
+        aptitude, dt = pcs.aptitude[pc], npcs.dt[npc]
+        lines = [
+            f"Turn {event.turn}: {pcs.names[pc]} (Friction: {event.friction}) acts against {npcs.names[npc]}",
+            f"{pcs.names[pc]} attacks {npcs.names[npc]}!",
+        ]
+        if npcs.exp_def[npc]:
+            lines.append(f"  -> Added Bane for Target Defense Expertise (Total Banes: {event.friction + 1})")
+        total = event.d20 + aptitude + event.boon - event.bane
+        lines.append(f"  -> Attack Roll: {event.d20} (d20) + {aptitude} (Apt) + {event.boon} (Boon) - {event.bane} (Bane) = {total}")
+        lines.append(f"  -> vs DT {dt}: {event.outcome.value}")
+        lines.extend(self._damage(self.npc_hp, npcs.names[npc], npc, event.damage))
+        shift = event.outcome not in (Outcome.CLEAN_SUCCESS, Outcome.TRIUMPH)
+        lines.append(f"PC Attack {event.outcome.value}! Momentum {'Lost' if shift else 'Retained'}.")
+        if shift:
+            lines.append("Momentum shifts to NPCs.")
+        return lines
+
+    def _pc_defense(self, event: TurnEvent, pcs, npcs) -> List[str]:
+        npc, pc = event.actor, event.target
+        aptitude, dt = pcs.aptitude[pc], npcs.dt[npc]
+        lines = [f"Turn {event.turn}: {npcs.names[npc]} (Friction: {event.friction}) acts against {pcs.names[pc]}"]
+        if npcs.exp_atk[npc]:
+            lines.append("  -> Added Bane for Attacker Attack Expertise (Total Banes: 1)")
+        total = event.d20 + aptitude + event.boon - event.bane
+        lines.append(f"{pcs.names[pc]} defends against {npcs.names[npc]}!")
+        lines.append(f"  -> Defense Roll: {event.d20} (d20) + {aptitude} (Apt) + {event.boon} (Boon, stacks={1 + event.friction}) - {event.bane} (Bane) = {total}")
+        lines.append(f"  -> vs DT {dt}: {event.outcome.value}")
+        lines.extend(self._damage(self.pc_hp, pcs.names[pc], pc, event.damage))
+        shift = event.outcome in (Outcome.CLEAN_SUCCESS, Outcome.TRIUMPH)
+        lines.append(f"PC Defense {event.outcome.value}! Momentum {'Stolen' if shift else 'NPC Keeps'}.")
+        if shift:
+            lines.append("Momentum shifts to PCs.")
+        return lines
+
+    @staticmethod
+    def _damage(hp: List[int], name: str, index: int, damage: int) -> List[str]:
+        if damage <= 0:
+            return []
+        hp[index] = max(0, hp[index] - damage)
+        return [f"{name} takes {damage} damage. HP: {hp[index]}"]
+
+class EventRecorder:
+    """Sink that keeps every event of every battle.
+
+    Attributes:
+        battles (List[Tuple[int, List[TurnEvent], str]]): ``(battle_id, events, winner)`` per battle.
+    """
+    def __init__(self):
+        self.battles: List[Tuple[int, List[TurnEvent], Optional[str]]] = []
+
+    def battle_start(self, battle_id: int, scenario: Any):
+        self.battles.append((battle_id, [], None))
+
+    def turn(self, event: TurnEvent):
+        self.battles[-1][1].append(event)
+
+    def battle_end(self, winner: str):
+        battle_id, events, _ = self.battles[-1]
+        self.battles[-1] = (battle_id, events, winner)
+
+class LoggingTraceSink:
+    """Sink that renders events with a ``TraceFormatter`` and writes them to a logger."""
+    def __init__(self, log: logging.Logger, level: int = logging.INFO):
+        """Initializes the sink.
+
+        Args:
+            log: Logger receiving the battle log lines.
+            level: Level the lines are logged at.
+        """
+        self.log = log
+        self.level = level
+        self.formatter: Optional[TraceFormatter] = None
+
+    def _write(self, lines: List[str]):
+        for line in lines:
+            self.log.log(self.level, line)
+
+    def battle_start(self, battle_id: int, scenario: Any):
+        if self.formatter is None or self.formatter.scenario is not scenario:
+            self.formatter = TraceFormatter(scenario)
+        self._write(self.formatter.battle_start(battle_id))
+
+    def turn(self, event: TurnEvent):
+        self._write(self.formatter.turn(event))
+
+    def battle_end(self, winner: str):
+        self._write(self.formatter.battle_end(winner))
@@ -1,12 +1,24 @@
 import logging
-import json
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from statistics import mean
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 
 from battle_engine import run_battle
+from mass_engine import run_mass_battle
+from constants import CACHE_DIR, PROFILE_FILE
+from random_streams import derive_seed, make_rng, new_master_seed
+from result_cache import DEFAULT_MAX_BYTES, ResultCache, scenario_key
+from results_store import ChunkRecords, ResultsStore, ResultsWriter
+from scenario import compile_scenario
+from scenario_store import ScenarioStore
+from confidence import correlation_interval, wilson_interval
+from generate_benchmarks import benchmark_sweep
+from importance import RareEventEstimate, choose_tilt, estimate_win_probability
 from stats import get_regression_lines
+from streaming_stats import MomentumRegression
 
 # Define a minimal logging config to avoid cluttering the console
 logging.basicConfig(level=logging.WARNING, format='%(message)s')
@@ -29,70 +41,277 @@ def parse_regression_info(regression_lines: List[str]) -> Dict[str, str]:
                     info["label"] = full_label
     return info
 
-def run_benchmarks(scenario_file="scenarios.json", sim_count=200):
-    """Runs all scenarios and generates a robustness & sensitivity report."""
-    print(f"--- Starting Bulk Benchmark on {scenario_file} ---")
-    print(f"--- {sim_count} runs per scenario ---")
-    
-    path = Path(scenario_file)
-    if not path.exists():
-        print(f"Error: {scenario_file} not found.")
-        return
+# Battles per task; fixed so results do not depend on the worker count
+CHUNK_SIZE = 100
 
-    with path.open('r') as f:
-        data = json.load(f)
-        scenarios = {s['id']: s for s in data['scenarios']}
-    
-    results = []
-    
-    for sid, config in scenarios.items():
-        print(f"Simulating: {sid}...")
-        
-        pcs_wins = 0
-        battle_data = []
-        
-        for i in range(sim_count):
-            pcs_runs, npcs_runs, winner = run_battle(i, config)
-            if winner == "pcs":
-                pcs_wins += 1
-            
-            battle_data.append({
-                'winner': winner,
-                'pc_mean_run': mean(pcs_runs) if pcs_runs else 0,
-                'npc_mean_run': mean(npcs_runs) if npcs_runs else 0
-            })
-            
-        win_rate = (pcs_wins / sim_count) * 100
-        reg_info = parse_regression_info(get_regression_lines(battle_data))
-        
-        # Calculate Offset: Average NPC DT - Average PC Aptitude
-        avg_apt = mean([p.get('aptitude', 5) for p in config['pcs']]) if config['pcs'] else 5
-        avg_dt = mean([n.get('dt', 12) for n in config['npcs']]) if config['npcs'] else 12
-        offset = avg_dt - avg_apt
-        
-        # Calculate Ratio: NPC count / PC count
-        ratio = len(config['npcs']) / len(config['pcs']) if config['pcs'] else 0
-
-        results.append({
-            "id": sid,
-            "win_rate": win_rate,
-            "r": reg_info["r"],
-            "label": reg_info["label"],
-            "offset": offset,
-            "ratio": ratio,
-            "pc_count": len(config['pcs']),
-            "npc_count": len(config['npcs']),
-            "description": config["description"]
-        })
+# Chunks submitted ahead per worker, bounding memory when streaming large sweeps
+PREFETCH_PER_WORKER = 4
 
-    # Generate Report
-    report_dir = Path("reports")
-    report_dir.mkdir(exist_ok=True)
-    
-    report_path = report_dir / f"balance_report_{path.stem}.md"
-    
+# (scenario id, config, first battle index, battle count, chunk seed, engine)
+ChunkTask = Tuple[str, Dict[str, Any], int, int, int, str]
+
+def _simulate_chunk(task: ChunkTask, records: Optional[ChunkRecords] = None) -> MomentumRegression:
+    """Simulates one chunk, optionally appending every battle to ``records``."""
+    sid, config, start, count, seed, engine = task
+    summary = MomentumRegression()
+    if engine == "batch":
+        from batch_engine import run_battles_batch
+        battles, final_hp = run_battles_batch(config, count, rng=seed, return_hp=True)
+        for i, (pcs_runs, npcs_runs, winner) in enumerate(battles):
+            summary.add_runs(winner, pcs_runs, npcs_runs)
+            if records is not None:
+                records.add(seed, start + i, pcs_runs, npcs_runs, winner, final_hp[i].tolist())
+        return summary
+
+    battle_fn = run_mass_battle if engine == "mass" else run_battle
+    rng = make_rng(seed)
+    scenario = compile_scenario(config)
+    for i in range(count):
+        pcs_runs, npcs_runs, winner = battle_fn(start + i, scenario, rng=rng)
+        summary.add_runs(winner, pcs_runs, npcs_runs)
+        if records is not None:
+            records.add(seed, start + i, pcs_runs, npcs_runs, winner,
+                        scenario.pc_state.hp.tolist() + scenario.npc_state.hp.tolist())
+    return summary
+
+def run_chunk(task: ChunkTask) -> MomentumRegression:
+    """Simulates one chunk of battles for a scenario and returns their merged summary statistics.
+
+    Runs in a worker process; every chunk draws from its own stream seeded by
+    its derived seed, so the outcome is the same whichever process runs it.
+    """
+    return _simulate_chunk(task)
+
+def run_chunk_records(task: ChunkTask) -> Tuple[MomentumRegression, ChunkRecords]:
+    """Like ``run_chunk``, but also returns the per-battle records of the chunk for a results store."""
+    records = ChunkRecords()
+    return _simulate_chunk(task, records), records
+
+def run_importance(task: Tuple[str, Dict[str, Any], int, int, str]) -> Tuple[str, RareEventEstimate]:
+    """Estimates one scenario's PC win probability by importance sampling (runs in a worker process).
+
+    The task is (scenario id, config, battles, seed, engine); the tilt is chosen from pilot runs.
+    """
+    sid, config, battles, seed, engine = task
+    theta = choose_tilt(config, seed, engine=engine)
+    return sid, estimate_win_probability(config, battles, seed, theta=theta, engine=engine)
+
+def chunk_tasks(sid: str, config: Dict[str, Any], seed: int, engine: str, start: int, stop: int) -> List[ChunkTask]:
+    """Splits battles ``start`` to ``stop`` of a scenario into chunk tasks.
+
+    Chunk ``k`` always covers battles ``k * CHUNK_SIZE`` onwards with the same
+    derived seed, so extending a scenario replays exactly the battles a larger
+    fixed run would have.
+    """
+    tasks = []
+    for first in range(start, stop, CHUNK_SIZE):
+        count = min(CHUNK_SIZE, stop - first)
+        tasks.append((sid, config, first, count, derive_seed(seed, sid, first // CHUNK_SIZE), engine))
+    return tasks
+
+def run_tasks(tasks: Iterable[ChunkTask], executor: Optional[ProcessPoolExecutor], seed: int,
+              cache: Optional[ResultCache] = None, writer: Optional[ResultsWriter] = None,
+              prefetch: int = 0) -> Iterator[Tuple[ChunkTask, MomentumRegression]]:
+    """Yields ``(task, summary)`` for every task in order, simulating only chunks missing from the cache.
+
+    Tasks are consumed lazily: with a process pool, up to ``prefetch`` chunks
+    are in flight ahead of the one being yielded, so workers start on the
+    first chunk while later tasks are still being generated.
+
+    Args:
+        tasks: Chunk tasks (any iterable, e.g. a generator over a sweep).
+        executor: Process pool, or None to simulate in-process.
+        seed: Master seed the tasks were derived from (part of the cache key).
+        cache: Result cache, or None to always simulate.
+        writer: Results store receiving every battle; all chunks are then
+            simulated, since the cache only holds summaries.
+        prefetch: Chunks submitted to the pool ahead of the one being yielded.
+    """
+    keys = {}
+    window = prefetch if executor is not None else 0
+    in_flight = deque()
+
+    def resolve(task, hit, future):
+        if writer is not None:
+            summary, records = future.result() if future is not None else run_chunk_records(task)
+            writer.extend(writer.scenario_index(task[1]), records)
+            return summary
+        if hit is not None:
+            return hit
+        summary = future.result() if future is not None else run_chunk(task)
+        if cache is not None:
+            cache.put(keys[task[0]], task[2] // CHUNK_SIZE, task[3], summary)
+        return summary
+
+    for task in tasks:
+        hit = None
+        if cache is not None and writer is None:
+            sid, config, start, count, _, engine = task
+            if sid not in keys:
+                keys[sid] = scenario_key(config, engine, seed)
+            hit = cache.get(keys[sid], start // CHUNK_SIZE, count)
+        future = None
+        if executor is not None and hit is None:
+            future = executor.submit(run_chunk_records if writer is not None else run_chunk, task)
+        in_flight.append((task, hit, future))
+        while len(in_flight) > window:
+            task, hit, future = in_flight.popleft()
+            yield task, resolve(task, hit, future)
+    while in_flight:
+        task, hit, future = in_flight.popleft()
+        yield task, resolve(task, hit, future)
+
+def scenario_items(scenarios: Union[Dict[str, Dict[str, Any]], Iterable[Dict[str, Any]]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """``(id, config)`` pairs of a dict keyed by ID or of any iterable of configs (such as a ``Sweep``)."""
+    if isinstance(scenarios, dict):
+        return iter(scenarios.items())
+    return ((config['id'], config) for config in scenarios)
+
+def simulate_scenarios(scenarios: Union[Dict[str, Dict[str, Any]], Iterable[Dict[str, Any]]], sim_count: int, seed: int,
+                       workers: int = 1, engine: str = "object", cache: Optional[ResultCache] = None,
+                       writer: Optional[ResultsWriter] = None) -> Iterator[Tuple[str, MomentumRegression]]:
+    """Fans (scenario, battle-chunk) tasks out to a process pool and merges them per scenario.
+
+    Scenarios are read lazily, and each scenario's result is yielded as soon
+    as its last chunk completes, so a sweep generator can stream through
+    without ever being materialized.
+
+    Args:
+        scenarios: Scenario configurations keyed by ID, or an iterable of configs.
+        sim_count: Number of battles per scenario.
+        seed: Master seed; every chunk derives its own stream from it.
+        workers: Number of worker processes (1 runs in-process).
+        engine: Battle engine used inside each chunk.
+        cache: Result cache; chunks found there are not simulated again.
+        writer: Results store receiving every simulated battle, or None.
+
+    Yields:
+        (scenario id, summary statistics) in scenario order; chunks are merged in
+        chunk order, so the result does not depend on the worker count.
+    """
+    tasks = (task for sid, config in scenario_items(scenarios)
+             for task in chunk_tasks(sid, config, seed, engine, 0, sim_count))
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        current_sid, summary = None, None
+        for task, chunk in run_tasks(tasks, executor, seed, cache, writer, prefetch=workers * PREFETCH_PER_WORKER):
+            if task[0] != current_sid:
+                if current_sid is not None:
+                    yield current_sid, summary
+                current_sid, summary = task[0], MomentumRegression()
+            summary.merge(chunk)
+        if current_sid is not None:
+            yield current_sid, summary
+    finally:
+        if cache is not None:
+            cache.flush()
+        if executor is not None:
+            executor.shutdown()
+
+def ci_satisfied(summary: MomentumRegression, target_width: float, r_target_width: Optional[float] = None) -> bool:
+    """True once the 95% interval on PC win rate (and optionally on r) is narrower than the targets."""
+    low, high = wilson_interval(summary.pc_wins, summary.battles)
+    if high - low > target_width:
+        return False
+    if r_target_width is not None:
+        r_low, r_high = correlation_interval(summary.diff.pearson(), summary.battles)
+        return r_high - r_low <= r_target_width
+    return True
+
+def simulate_adaptive(scenarios: Dict[str, Dict[str, Any]], seed: int, target_width: float,
+                      r_target_width: Optional[float] = None, batch_size: int = 500, max_runs: int = 100_000,
+                      workers: int = 1, engine: str = "object", cache: Optional[ResultCache] = None,
+                      writer: Optional[ResultsWriter] = None) -> Iterator[Tuple[str, MomentumRegression]]:
+    """Runs every scenario in sequential batches until its confidence interval is tight enough.
+
+    Each round simulates the next batch of every unfinished scenario (in
+    parallel when ``workers > 1``), then stops the scenarios whose 95% Wilson
+    interval on PC win rate, and optionally the Fisher interval on the run
+    difference correlation r, is at most the target width. Batches reuse the
+    fixed chunk streams, so the results only depend on the seed and the
+    batch size, not on the worker count.
+
+    Args:
+        scenarios: Scenario configurations keyed by ID.
+        seed: Master seed.
+        target_width: Maximum full width of the win-rate interval (0.04 = +/-2 points).
+        r_target_width: Maximum full width of the r interval, or None to ignore r.
+        batch_size: Battles added per scenario and round (rounded up to whole chunks).
+        max_runs: Battles after which a scenario stops even if the target is not reached.
+        workers: Number of worker processes (1 runs in-process).
+        engine: Battle engine used inside each chunk.
+        cache: Result cache; chunks found there are not simulated again.
+        writer: Results store receiving every simulated battle, or None.
+
+    Yields:
+        (scenario id, summary statistics) in scenario order.
+    """
+    batch_size = max(CHUNK_SIZE, -(-batch_size // CHUNK_SIZE) * CHUNK_SIZE)
+    summaries = {sid: MomentumRegression() for sid in scenarios}
+    pending = list(scenarios)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while pending:
+            tasks: List[ChunkTask] = []
+            for sid in pending:
+                done = summaries[sid].battles
+                tasks.extend(chunk_tasks(sid, scenarios[sid], seed, engine, done, min(done + batch_size, max_runs)))
+            for task, chunk in run_tasks(tasks, executor, seed, cache, writer, prefetch=len(tasks)):
+                summaries[task[0]].merge(chunk)
+            pending = [sid for sid in pending
+                       if summaries[sid].battles < max_runs
+                       and not ci_satisfied(summaries[sid], target_width, r_target_width)]
+    finally:
+        if cache is not None:
+            cache.flush()
+        if executor is not None:
+            executor.shutdown()
+    yield from summaries.items()
+
+def result_row(sid: str, config: Dict[str, Any], summary: MomentumRegression) -> Dict[str, Any]:
+    """Builds the report row of one scenario from its summary statistics."""
+    win_rate = (summary.pc_wins / summary.battles) * 100
+    ci_low, ci_high = wilson_interval(summary.pc_wins, summary.battles)
+    reg_info = parse_regression_info(get_regression_lines(summary))
+
+    # Calculate Offset: Average NPC DT - Average PC Aptitude
+    avg_apt = mean([p.get('aptitude', 5) for p in config['pcs']]) if config['pcs'] else 5
+    avg_dt = mean([n.get('dt', 12) for n in config['npcs']]) if config['npcs'] else 12
+    offset = avg_dt - avg_apt
+
+    # Calculate Ratio: NPC count / PC count
+    ratio = len(config['npcs']) / len(config['pcs']) if config['pcs'] else 0
+
+    return {
+        "id": sid,
+        "win_rate": win_rate,
+        "r": reg_info["r"],
+        "label": reg_info["label"],
+        "offset": offset,
+        "ratio": ratio,
+        "pc_count": len(config['pcs']),
+        "npc_count": len(config['npcs']),
+        "description": config["description"],
+        "runs": summary.battles,
+        "ci": (ci_low * 100, ci_high * 100),
+    }
+
+def write_report(report_path: Path, title: str, results: List[Dict[str, Any]], adaptive_note: Optional[str] = None,
+                 rare_estimates: Optional[Dict[str, RareEventEstimate]] = None):
+    """Writes the markdown balance report (heatmap, group scaling and raw data).
+
+    Args:
+        report_path: Output markdown file.
+        title: Source shown in the report heading.
+        results: Rows from ``result_row``.
+        adaptive_note: Description of the adaptive sampling; when set, the raw
+            data table also lists runs and confidence intervals.
+        rare_estimates: Importance-sampling estimates of low win rates, by scenario ID.
+    """
+    report_path.parent.mkdir(exist_ok=True)
     with report_path.open("w", encoding="utf-8") as f:
-        f.write(f"# High-Resolution Balance Report: {scenario_file}\n\n")
+        f.write(f"# High-Resolution Balance Report: {title}\n\n")
         
         f.write("## 🌡️ The Balance Heatmap (Win Rates)\n")
         f.write("This table shows PC Win Rate (%) for different Offsets and Team Ratios.\n\n")
@@ -139,17 +358,210 @@ def run_benchmarks(scenario_file="scenarios.json", sim_count=200):
                 f.write(f"| {ratio:.1f}:1 | {pc_sz} | {npc_sz} | {avg_wr:.1f}% | {avg_r:.4f} |\n")
 
         f.write("\n## 📋 Raw Data Summary\n")
-        f.write("| Scenario ID | Offset | NPC:PC | Win Rate | r | Status |\n")
-        f.write("| :--- | :---: | :---: | :---: | :---: | :--- |\n")
-        for r in sorted(results, key=lambda x: (x['offset'], x['ratio'])):
-            f.write(f"| `{r['id']}` | +{r['offset']} | {r['npc_count']}:{r['pc_count']} | {r['win_rate']:.1f}% | {r['r']} | **{r['label']}** |\n")
+        if adaptive_note is None:
+            f.write("| Scenario ID | Offset | NPC:PC | Win Rate | r | Status |\n")
+            f.write("| :--- | :---: | :---: | :---: | :---: | :--- |\n")
+            for r in sorted(results, key=lambda x: (x['offset'], x['ratio'])):
+                f.write(f"| `{r['id']}` | +{r['offset']} | {r['npc_count']}:{r['pc_count']} | {r['win_rate']:.1f}% | {r['r']} | **{r['label']}** |\n")
+        else:
+            total_runs = sum(r['runs'] for r in results)
+            f.write(f"{adaptive_note}; {total_runs} runs in total.\n\n")
+            f.write("| Scenario ID | Offset | NPC:PC | Runs | Win Rate | 95% CI | r | Status |\n")
+            f.write("| :--- | :---: | :---: | :---: | :---: | :---: | :---: | :--- |\n")
+            for r in sorted(results, key=lambda x: (x['offset'], x['ratio'])):
+                low, high = r['ci']
+                f.write(f"| `{r['id']}` | +{r['offset']} | {r['npc_count']}:{r['pc_count']} | {r['runs']} | "
+                        f"{r['win_rate']:.1f}% | {low:.1f}-{high:.1f}% | {r['r']} | **{r['label']}** |\n")
+
+        if rare_estimates:
+            f.write("\n## 🔬 Rare-Outcome Estimates (Importance Sampling)\n")
+            f.write("Dice tilted towards the PCs, with every battle reweighted by its likelihood ratio.\n\n")
+            f.write("| Scenario ID | Win Rate (plain) | Win Probability (IS) | Std. Error | Tilt | Eff. Samples |\n")
+            f.write("| :--- | :---: | :---: | :---: | :---: | :---: |\n")
+            rates = {r['id']: r['win_rate'] for r in results}
+            for sid, est in rare_estimates.items():
+                f.write(f"| `{sid}` | {rates[sid]:.1f}% | {est.probability:.3e} | {est.standard_error:.2e} | "
+                        f"{est.theta} | {est.effective_sample_size:.0f} |\n")
+
+def run_benchmarks(scenario_file="scenarios.json", sim_count=200, engine="object", workers=1, seed: Optional[int] = None,
+                   target_ci: Optional[float] = None, target_r_ci: Optional[float] = None, max_runs: int = 100_000,
+                   cache: Optional[ResultCache] = None, store: Optional[str] = None,
+                   sweep: Optional[Iterable[Dict[str, Any]]] = None, rare_below: Optional[float] = None):
+    """Runs all scenarios and generates a robustness & sensitivity report.
+
+    Args:
+        scenario_file: Path to the scenario JSON file (with ``sweep``, only names the report).
+        sim_count: Number of battles per scenario, or the batch size when
+            ``target_ci`` is set.
+        engine: "object" runs battles one at a time, "mass" does the same with
+            O(1) per-turn bookkeeping (for large armies), "batch" runs each
+            scenario's battles in lockstep with the NumPy batch engine.
+        workers: Number of worker processes to spread battle chunks over.
+        seed: Master seed; results are identical for any worker count.
+        target_ci: If set, run each scenario in batches of ``sim_count`` until the
+            95% interval on PC win rate is at most this wide (as a fraction).
+        target_r_ci: Optional maximum width of the 95% interval on r as well.
+        max_runs: Per-scenario battle cap in ``target_ci`` mode.
+        cache: Result cache of simulated chunks, or None to simulate everything.
+        store: Directory to write every battle to (see ``results_store``), or None.
+        sweep: Scenario configs to run lazily instead of loading ``scenario_file``
+            (e.g. a ``sweep.Sweep``); results stream out as each scenario completes.
+        rare_below: Re-estimate scenarios whose PC win rate is below this fraction
+            by importance sampling (``sim_count`` tilted battles each).
+    """
+    if seed is None:
+        seed = new_master_seed()
+
+    path = Path(scenario_file)
+    source = f"{path.stem} sweep" if sweep is not None else scenario_file
+    print(f"--- Starting Bulk Benchmark on {source} ---")
+    if target_ci is None:
+        print(f"--- {sim_count} runs per scenario, {workers} worker(s), seed {seed} ---")
+    else:
+        print(f"--- batches of {sim_count} runs until the 95% CI is within {target_ci * 100:.1f} points, "
+              f"{workers} worker(s), seed {seed} ---")
+
+    if sweep is not None:
+        scenarios = sweep
+    elif not path.exists():
+        print(f"Error: {scenario_file} not found.")
+        return
+    else:
+        # Parsed one entry at a time as the pool asks for work; a repeated ID keeps its last entry
+        indexed = ScenarioStore(path)
+        scenarios = (indexed[sid] for sid in indexed)
+
+    # Configs are only held until their scenario's results are in
+    configs = {}
+
+    def tracked():
+        for sid, config in scenario_items(scenarios):
+            configs[sid] = config
+            yield config
+
+    results = []
+    writer = None
+    if store:
+        # The cache only holds summaries, so every battle is simulated to be stored
+        writer, cache = ResultsWriter(store), None
+    
+    if target_ci is None:
+        simulated = simulate_scenarios(tracked(), sim_count, seed, workers=workers, engine=engine, cache=cache,
+                                       writer=writer)
+    else:
+        # Adaptive rounds revisit every unfinished scenario, so they need them all up front
+        simulated = simulate_adaptive(dict(scenario_items(tracked())), seed, target_ci, r_target_width=target_r_ci,
+                                      batch_size=sim_count, max_runs=max_runs, workers=workers, engine=engine,
+                                      cache=cache, writer=writer)
+
+    rare_tasks = []
+    for sid, summary in simulated:
+        print(f"Simulated: {sid}")
+        config = configs.pop(sid)
+        results.append(result_row(sid, config, summary))
+        if rare_below is not None and summary.pc_wins < rare_below * summary.battles:
+            rare_tasks.append((sid, config, sim_count, derive_seed(seed, "importance", sid), engine))
+
+    rare_estimates = {}
+    if rare_tasks:
+        print(f"--- Importance sampling {len(rare_tasks)} scenario(s) below {rare_below * 100:.1f}% ---")
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rare_estimates = dict(executor.map(run_importance, rare_tasks))
+        else:
+            rare_estimates = dict(map(run_importance, rare_tasks))
+
+    if cache is not None:
+        hits, misses = cache.stats()
+        print(f"Cache: {hits} chunk(s) reused, {misses} simulated ({cache.directory})")
+    if writer is not None:
+        writer.close()
+        print(f"Per-battle records written to {store}")
+
+    adaptive_note = None
+    if target_ci is not None:
+        adaptive_note = (f"Adaptive sampling: batches of {sim_count} until the 95% Wilson interval on win rate is "
+                         f"within {target_ci * 100:.1f} points (cap {max_runs} runs)")
+
+    # Generate Report
+    report_path = Path("reports") / f"balance_report_{path.stem}.md"
+    write_report(report_path, source, results, adaptive_note, rare_estimates)
 
     print(f"\nBenchmark Complete! View the results in: {report_path}")
 
+def report_from_store(store: str):
+    """Rebuilds the balance report from a results store without simulating.
+
+    Args:
+        store: Store directory written with ``--store``.
+    """
+    results_store = ResultsStore(store)
+    print(f"--- Rebuilding report from {len(results_store)} stored battles in {store} ---")
+    configs = {scenario['id']: scenario['config'] for scenario in results_store.scenarios}
+    results = [result_row(sid, configs[sid], summary) for sid, summary in results_store.scenario_summaries().items()]
+
+    report_path = Path("reports") / f"balance_report_{Path(store).name}.md"
+    write_report(report_path, store, results)
+    print(f"\nReport Complete! View the results in: {report_path}")
+
+def run_from_args(args: argparse.Namespace):
+    """Runs the benchmark (or the report rebuild) selected on the command line."""
+    if args.from_store:
+        report_from_store(args.from_store)
+    else:
+        # Results are only reproducible, and therefore cacheable, under a fixed seed
+        cache = None
+        if not args.no_cache:
+            if args.seed is not None:
+                cache = ResultCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024)
+            else:
+                print("--- No --seed given: results are not cached ---")
+    
+        run_benchmarks(scenario_file=args.file, sim_count=args.runs, engine=args.engine, workers=args.workers, seed=args.seed,
+                       target_ci=args.target_ci, target_r_ci=args.target_r_ci, max_runs=args.max_runs, cache=cache,
+                       store=args.store, sweep=benchmark_sweep() if args.sweep else None, rare_below=args.rare_below)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Bulk runner for balance benchmarks")
     parser.add_argument("--file", type=str, default="benchmarks.json", help="Scenario JSON file")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Stream the benchmark grid from generate_benchmarks instead of reading --file")
     parser.add_argument("--runs", type=int, default=500, help="Simulations per scenario")
+    parser.add_argument("--engine", type=str, default="object", choices=["object", "mass", "batch"],
+                        help="Battle engine: object (one battle at a time), mass (O(1) per-turn bookkeeping for large armies) "
+                             "or batch (vectorized, requires NumPy)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for parallel simulation")
+    parser.add_argument("--seed", type=int, default=None, help="Master seed for reproducible runs")
+    parser.add_argument("--target-ci", type=float, default=None,
+                        help="Run batches of --runs until the 95%% CI on PC win rate is at most this wide (e.g. 0.04)")
+    parser.add_argument("--target-r-ci", type=float, default=None,
+                        help="With --target-ci, also require the 95%% CI on r to be at most this wide")
+    parser.add_argument("--max-runs", type=int, default=100_000, help="Per-scenario cap in --target-ci mode")
+    parser.add_argument("--no-cache", action="store_true", help="Simulate everything, ignoring the result cache")
+    parser.add_argument("--cache-dir", type=str, default=CACHE_DIR, help="Result cache directory")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Result cache size budget in MB (least recently used entries are evicted)")
+    parser.add_argument("--rare-below", type=float, default=None,
+                        help="Re-estimate scenarios with a PC win rate below this fraction by importance sampling (e.g. 0.01)")
+    parser.add_argument("--store", type=str, default=None,
+                        help="Directory to write every battle to as memory-mappable .npy columns (bypasses the cache)")
+    parser.add_argument("--from-store", type=str, default=None,
+                        help="Rebuild the report from a results store instead of simulating")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time the phases of the run in-process (no workers, no cache) and print a breakdown table")
+    parser.add_argument("--profile-out", type=str, default=PROFILE_FILE,
+                        help=f"Collapsed-stack file written by --profile, for flamegraph tools (default: {PROFILE_FILE})")
     args = parser.parse_args()
-    
-    run_benchmarks(scenario_file=args.file, sim_count=args.runs)
+
+    if args.profile:
+        from profiling import PhaseProfiler
+        # Worker processes would run uninstrumented code and cache hits would skip the work
+        if args.workers > 1:
+            print("--- Profiling runs in-process: --workers ignored ---")
+        args.workers, args.no_cache = 1, True
+        profiler = PhaseProfiler("bulk_run")
+        with profiler:
+            run_from_args(args)
+        profiler.report(args.profile_out)
+    else:
+        run_from_args(args)
@@ -0,0 +1,45 @@
+"""Confidence intervals for simulated estimates."""
+import math
+from typing import Tuple
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959963984540054
+
+def wilson_interval(successes: int, n: int, z: float = Z_95) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion.
+
+    Args:
+        successes: Number of successes (e.g. PC wins).
+        n: Number of trials.
+        z: Normal quantile of the confidence level.
+
+    Returns:
+        (low, high) bounds of the proportion; (0, 1) without data.
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    z2 = z * z
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half = z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    # The bounds are exactly 0 and 1 at the extremes; avoid rounding residue there
+    low = 0.0 if successes == 0 else max(0.0, center - half)
+    high = 1.0 if successes == n else min(1.0, center + half)
+    return low, high
+
+def correlation_interval(r: float, n: int, z: float = Z_95) -> Tuple[float, float]:
+    """Fisher z-transform interval for a Pearson correlation.
+
+    Args:
+        r: Sample correlation.
+        n: Number of observations.
+        z: Normal quantile of the confidence level.
+
+    Returns:
+        (low, high) bounds of the correlation; (-1, 1) if it cannot be estimated.
+    """
+    if n <= 3 or abs(r) >= 1:
+        return -1.0, 1.0
+    center = math.atanh(r)
+    half = z / math.sqrt(n - 3)
+    return math.tanh(center - half), math.tanh(center + half)
@@ -13,6 +13,13 @@ MIN_DAMAGE = 1
 # File Names
 SCENARIO_FILE = "scenarios.json"
 RESULTS_FILE = "simulation_results.txt"
+CACHE_DIR = ".battle_cache"
+PROFILE_FILE = "profile.folded"
+BATTLE_LOG_FILE = "battle_log.tsv"
+
+# Version of the battle rules and engines. Bump it by hand whenever a change
+# alters simulated outcomes, so cached results from older rules are ignored.
+RULES_VERSION = 1
 
 # Scaling Dice Sides
 BOON_BANE_DICE = {
@@ -11,3 +11,7 @@ class ConfigurationError(SimulatorError):
 class BattleError(SimulatorError):
     """Raised when an error occurs during the battle simulation."""
     pass
+
+class SolverError(SimulatorError):
+    """Raised when a scenario cannot be solved exactly (e.g. its state space is too large)."""
+    pass
@@ -0,0 +1,161 @@
+"""Importance-sampling estimator of small PC win probabilities.
+
+In high-offset scenarios the PCs win a fraction of a percent of battles, so
+plain Monte Carlo sees no wins at all in thousands of battles.
+``estimate_win_probability`` instead draws every roll outcome from an
+exponentially tilted distribution that favours the PCs,
+
+    p'(o) ∝ p(o) * exp(theta * score(o)),
+
+where the score is +1 for outcomes that are good for the PCs (a PC attack
+landing, a PC defense stealing momentum), +2 for a PC Triumph and -1 for a
+Catastrophe on defense. Each battle carries the product of ``p(o) / p'(o)``
+over its rolls (its likelihood ratio), and the win indicator weighted by it
+is an unbiased estimate of the true win probability. Target picks are not
+tilted.
+
+Long battles against many NPCs multiply many ratios together and the weights
+degenerate: a few battles carry most of the estimate and the standard error
+is itself unreliable. ``effective_sample_size`` flags this.
+"""
+import math
+import random
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from battle_engine import run_battle
+from mass_engine import run_mass_battle
+from mechanics import Outcome, sample_tilted_outcome
+from random_streams import derive_seed
+from scenario import compile_scenario
+from streaming_stats import Welford
+
+# Tilt scores in OUTCOME_ORDER (Triumph, Clean Success, Setback, Failure, Catastrophe)
+PC_ATTACK_SCORES = (2.0, 1.0, 0.0, 0.0, 0.0)
+PC_DEFENSE_SCORES = (1.0, 1.0, 0.0, 0.0, -1.0)
+
+DEFAULT_TILT = 1.0
+TILT_CANDIDATES = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0)
+
+class ImportanceSampler(random.Random):
+    """
+    A random stream whose roll outcomes are drawn from the tilted distributions.
+
+    Attributes:
+        theta (float): Tilt strength (0 is plain Monte Carlo).
+        log_weight (float): Log likelihood ratio of the outcomes drawn so far.
+    """
+    def __init__(self, seed: int, theta: float = DEFAULT_TILT):
+        """Initializes the stream.
+
+        Args:
+            seed: Seed of the underlying generator.
+            theta: Tilt strength.
+        """
+        self.theta = theta
+        self.log_weight = 0.0
+        super().__init__(seed)
+
+    def _pc_attack(self, expertise, aptitude, dt, boon_stacks, bane_stacks, rng=None) -> Outcome:
+        outcome, log_ratio = sample_tilted_outcome(expertise, aptitude, dt, boon_stacks, bane_stacks,
+                                                   PC_ATTACK_SCORES, self.theta, rng=self)
+        self.log_weight += log_ratio
+        return outcome
+
+    def _pc_defense(self, expertise, aptitude, dt, boon_stacks, bane_stacks, rng=None) -> Outcome:
+        outcome, log_ratio = sample_tilted_outcome(expertise, aptitude, dt, boon_stacks, bane_stacks,
+                                                   PC_DEFENSE_SCORES, self.theta, rng=self)
+        self.log_weight += log_ratio
+        return outcome
+
+    def outcome_samplers(self):
+        """Tilted samplers for PC attacks and NPC attacks (see ``mechanics.outcome_samplers``)."""
+        return (self._pc_attack, self), (self._pc_defense, self)
+
+    @property
+    def likelihood_ratio(self) -> float:
+        """True over tilted probability of everything drawn so far."""
+        return math.exp(self.log_weight)
+
+class RareEventEstimate(NamedTuple):
+    """Importance-sampling estimate of a PC win probability.
+
+    Attributes:
+        probability: Unbiased estimate of the PC win probability.
+        standard_error: Standard error of the estimate.
+        battles: Battles simulated.
+        tilted_wins: PC wins among the tilted battles.
+        effective_sample_size: Kish effective sample size of the winning weights.
+        theta: Tilt strength used.
+    """
+    probability: float
+    standard_error: float
+    battles: int
+    tilted_wins: int
+    effective_sample_size: float
+    theta: float
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error over the estimate (inf when no win was observed)."""
+        return self.standard_error / self.probability if self.probability > 0 else math.inf
+
+def estimate_win_probability(config: Dict[str, Any], battles: int, seed: int, theta: float = DEFAULT_TILT,
+                             engine: str = "object") -> RareEventEstimate:
+    """Estimates the PC win probability of a scenario by importance sampling.
+
+    Args:
+        config: Scenario configuration.
+        battles: Number of tilted battles.
+        seed: Master seed; battle ``i`` draws from its own derived stream.
+        theta: Tilt strength (0 is plain Monte Carlo).
+        engine: "object" or "mass".
+
+    Returns:
+        RareEventEstimate: Estimate, standard error and diagnostics.
+    """
+    battle_fn = run_mass_battle if engine == "mass" else run_battle
+    scenario = compile_scenario(config)
+    weighted = Welford()
+    wins = 0
+    weight_sum = weight_sq_sum = 0.0
+    for i in range(battles):
+        rng = ImportanceSampler(derive_seed(seed, "importance", i + 1), theta)
+        _, _, winner = battle_fn(i + 1, scenario, rng=rng)
+        value = 0.0
+        if winner == "pcs":
+            wins += 1
+            value = rng.likelihood_ratio
+            weight_sum += value
+            weight_sq_sum += value * value
+        weighted.add(value)
+
+    n = weighted.n
+    return RareEventEstimate(
+        probability=weighted.mean,
+        standard_error=math.sqrt(weighted.variance / n) if n else 0.0,
+        battles=n,
+        tilted_wins=wins,
+        effective_sample_size=weight_sum * weight_sum / weight_sq_sum if weight_sq_sum else 0.0,
+        theta=theta,
+    )
+
+def choose_tilt(config: Dict[str, Any], seed: int, candidates: Sequence[float] = TILT_CANDIDATES,
+                pilot_battles: int = 200, engine: str = "object") -> float:
+    """Picks the tilt with the lowest relative error on short pilot runs.
+
+    Args:
+        config: Scenario configuration.
+        seed: Master seed of the pilot runs (kept apart from the main run's streams).
+        candidates: Tilt strengths to try.
+        pilot_battles: Battles per candidate.
+        engine: "object" or "mass".
+
+    Returns:
+        float: The chosen tilt strength.
+    """
+    best: Optional[Tuple[float, float]] = None
+    for theta in candidates:
+        pilot = estimate_win_probability(config, pilot_battles, derive_seed(seed, "pilot", theta), theta, engine)
+        if best is None or pilot.relative_error < best[0]:
+            best = (pilot.relative_error, theta)
+    return best[1]
@@ -1,24 +1,36 @@
 import logging
 import argparse
 import sys
-import json
+import math
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Mapping, Optional
 
 from battle_engine import run_battle
-from stats import get_stats_lines, get_regression_lines
-from constants import SCENARIO_FILE, RESULTS_FILE
-from exceptions import ConfigurationError
+from mass_engine import run_mass_battle
+from battle_trace import LoggingTraceSink
+from streaming_stats import MomentumRegression, RunLengthHistogram
+from random_streams import battle_rng, derive_seed, new_master_seed
+from stats import get_stats_lines, get_regression_lines, get_distribution_lines
+from constants import SCENARIO_FILE, RESULTS_FILE, PROFILE_FILE, BATTLE_LOG_FILE, RULES_VERSION
+from exceptions import ConfigurationError, SolverError
+from scenario import validate_scenario_config
+from replay import BattleLog, battle_seed, summarize
+from report_output import OutputTraceSink, ReportOutput
+from results_store import ResultsWriter
+from scenario_store import ScenarioStore
 
 # Configure Basic Logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger('battle_sim')
 
-def load_scenarios() -> Dict[str, Any]:
-    """Loads and parses the scenario configurations from JSON.
+def load_scenarios() -> Mapping[str, Any]:
+    """Opens the scenario configurations through their sidecar index.
+
+    Only the scenarios that are looked up get parsed.
 
     Returns:
-        A dictionary mapping scenario IDs to their configurations.
+        A mapping of scenario IDs to their configurations.
     """
     path = Path(SCENARIO_FILE)
     if not path.exists():
@@ -26,49 +38,14 @@ def load_scenarios() -> Dict[str, Any]:
         return {}
     
     try:
-        with path.open('r') as f:
-            data = json.load(f)
-        return {s['id']: s for s in data['scenarios']}
-    except (json.JSONDecodeError, KeyError) as e:
+        return ScenarioStore(path)
+    except ConfigurationError as e:
         logger.error(f"Error parsing {SCENARIO_FILE}: {e}")
         return {}
 
-def validate_scenario_config(config: Dict[str, Any]):
-    """Checks if the scenario configuration contains all required data.
-
-    Args:
-        config: The scenario configuration dictionary to validate.
-
-    Raises:
-        ConfigurationError: If required fields are missing or invalid.
-    """
-    required_keys = ['id', 'description', 'pcs', 'npcs', 'starting_momentum']
-    for key in required_keys:
-        if key not in config:
-            raise ConfigurationError(f"Missing required key '{key}' in scenario config.")
-
-    if not config['pcs']:
-        raise ConfigurationError("Scenario must have at least one PC.")
-    if not config['npcs']:
-        raise ConfigurationError("Scenario must have at least one NPC.")
-
-    # Validate PCs
-    for i, pc in enumerate(config['pcs']):
-        if 'name' not in pc:
-            raise ConfigurationError(f"PC at index {i} is missing a name.")
-
-    # Validate NPCs
-    for i, npc in enumerate(config['npcs']):
-        for field in ['name', 'hp', 'dt']:
-            if field not in npc:
-                raise ConfigurationError(f"NPC '{npc.get('name', i)}' is missing field '{field}'.")
-        if npc['hp'] <= 0:
-            raise ConfigurationError(f"NPC '{npc['name']}' must have HP > 0.")
-        if npc['dt'] < 0:
-            raise ConfigurationError(f"NPC '{npc['name']}' must have DT >= 0.")
-
-
-def simulation_loop(scenario_id: str, num_simulations: int, log_mode: str = "default"):
+def simulation_loop(scenario_id: str, num_simulations: int, log_mode: str = "default", engine: str = "object",
+                    seed: Optional[int] = None, store: Optional[str] = None, console: str = "all",
+                    compress: bool = False):
     """
     Run battle simulations.
     
@@ -78,7 +55,19 @@ def simulation_loop(scenario_id: str, num_simulations: int, log_mode: str = "def
         log_mode: Logging mode - "default", "short", or "verbose"
             - default: Full first battle details, then just final results
             - short: Only final results summary
-            - verbose: Full details for every battle
+            - verbose: Full first battle details, then a seed and summary
+              line per battle in the battle log, from which any battle can
+              be replayed (see ``replay_report``)
+        engine: Battle engine - "object" (one battle at a time), "mass"
+            (the same engine under its older name) or "batch" (vectorized
+            NumPy engine; emits no per-turn details, so in default mode the
+            first battle still runs on the object engine)
+        seed: Master seed. Battle N draws from its own stream derived from it,
+            so any battle can be reproduced. A random seed is used if None.
+        store: Directory to write per-battle records to (see ``results_store``), or None.
+        console: What is echoed to the console - "all" (battle details and
+            results), "results" or "none"; the results file gets everything
+        compress: Write the results file gzip-compressed (``simulation_results.txt.gz``)
     """
     scenarios = load_scenarios()
     
@@ -89,98 +78,362 @@ def simulation_loop(scenario_id: str, num_simulations: int, log_mode: str = "def
     scenario_config = scenarios[scenario_id]
 
     try:
-        validate_scenario_config(scenario_config)
+        # Validated and compiled once; every battle resets the compiled teams
+        scenario = validate_scenario_config(scenario_config)
     except ConfigurationError as e:
         logger.error(f"Invalid Scenario Configuration: {e}")
         return
 
+    if engine == "batch" and log_mode == "verbose":
+        logger.error("Verbose logging records per-battle seeds for replays; use the object or mass engine.")
+        return
+
     logger.info(f"Starting {num_simulations} Simulations for scenario: {scenario_config['description']}")
     logger.info(f"Logging mode: {log_mode}")
+
+    if seed is None:
+        seed = new_master_seed()
+    logger.info(f"Seed: {seed}")
     
-    total_pcs_runs = []
-    total_npcs_runs = []
-    battle_data = []
+    # Constant-memory accumulators: run-length counts and per-battle regression moments
+    pc_runs_hist = RunLengthHistogram()
+    npc_runs_hist = RunLengthHistogram()
+    regression = MomentumRegression()
     
     pcs_wins, npcs_wins = 0, 0
     
-    # Configure Root Logger and Handlers
-    root_logger = logging.getLogger()
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
-    
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter('%(message)s'))
-    root_logger.addHandler(console_handler)
-    
-    try:
-        file_handler = logging.FileHandler(RESULTS_FILE, mode='w', encoding='utf-8')
-        file_handler.setFormatter(logging.Formatter('%(message)s'))
-        root_logger.addHandler(file_handler)
+    # Battle details and results bypass logging: one buffered pipeline to the console and the results file
+    results_file = RESULTS_FILE + ".gz" if compress else RESULTS_FILE
+    # Every output is flushed and closed even if a battle raises
+    with ExitStack() as outputs:
+        try:
+            output = outputs.enter_context(ReportOutput(results_file, console=console, compress=compress))
         
-        # Write header to file
-        file_handler.stream.write(f"Scenario: {scenario_config['description']}\n")
-        file_handler.stream.write(f"Simulations: {num_simulations}\n")
-        file_handler.stream.write(f"Log Mode: {log_mode}\n\n")
-    except IOError as e:
-        logger.error(f"Failed to open results file: {e}")
-        return
+            # Write header to file
+            output.write_file(f"Scenario: {scenario_config['description']}\n")
+            output.write_file(f"Simulations: {num_simulations}\n")
+            output.write_file(f"Log Mode: {log_mode}\n")
+            output.write_file(f"Seed: {seed}\n\n")
+        except IOError as e:
+            logger.error(f"Failed to open results file: {e}")
+            return
     
-    for i in range(num_simulations):
-        # Set logging level based on mode
+        battle_fn = run_mass_battle if engine == "mass" else run_battle
+
+        writer = outputs.enter_context(ResultsWriter(store)) if store else None
+        battle_log = None
         if log_mode == "verbose":
-            # All battles get full debug
-            root_logger.setLevel(logging.DEBUG)
-        elif log_mode == "default" and i == 0:
-            # Only first battle gets debug
-            root_logger.setLevel(logging.DEBUG)
-        else:
-            # Short mode or default mode after first battle - suppress battle details
-            root_logger.setLevel(logging.WARNING)
+            battle_log = outputs.enter_context(BattleLog(BATTLE_LOG_FILE, scenario_id, seed, engine))
+        scenario_index = writer.scenario_index(scenario_config) if writer else 0
+
+        batch_results = []
+        if engine == "batch":
+            from batch_engine import run_battles_batch
+            # The first battle of default mode is traced by the object engine
+            batch_offset = 1 if log_mode == "default" and num_simulations > 0 else 0
+            batch_seed = derive_seed(seed, "batch")
+            batch_results, batch_hp = run_battles_batch(scenario_config, num_simulations - batch_offset, rng=batch_seed,
+                                                        return_hp=True)
+            batch_results[0:0] = [None] * batch_offset
+
+        # Battle details are rendered from trace events, only for the battles that are shown
+        text_trace = OutputTraceSink(output)
+
+        for i in range(num_simulations):
+            # verbose and default: only the first battle; short: none. Any other battle can be replayed from its seed.
+            traced = log_mode != "short" and i == 0
             
-        pcs_runs, npcs_runs, winner = run_battle(battle_id=i+1, scenario_config=scenario_config)
-        total_pcs_runs.extend(pcs_runs)
-        total_npcs_runs.extend(npcs_runs)
+            if batch_results and batch_results[i] is not None:
+                pcs_runs, npcs_runs, winner = batch_results[i]
+                if writer:
+                    batch_index = i - batch_offset
+                    writer.append(scenario_index, batch_seed, batch_index, pcs_runs, npcs_runs, winner,
+                                  batch_hp[batch_index].tolist())
+            else:
+                pcs_runs, npcs_runs, winner = battle_fn(battle_id=i+1, scenario_config=scenario, rng=battle_rng(seed, i+1),
+                                                        trace=text_trace if traced else None)
+                if writer:
+                    # The compiled teams hold the final HP until the next battle resets them
+                    writer.append(scenario_index, battle_seed(seed, i+1), i+1, pcs_runs, npcs_runs, winner,
+                                  scenario.pc_state.hp.tolist() + scenario.npc_state.hp.tolist())
+                if battle_log:
+                    battle_log.write(summarize(i+1, battle_seed(seed, i+1), pcs_runs, npcs_runs, winner))
+            pc_runs_hist.extend(pcs_runs)
+            npc_runs_hist.extend(npcs_runs)
         
-        # Collect detailed stats for regression
-        from statistics import mean
-        battle_data.append({
-            'winner': winner,
-            'pc_mean_run': mean(pcs_runs) if pcs_runs else 0,
-            'npc_mean_run': mean(npcs_runs) if npcs_runs else 0
-        })
+            # Collect detailed stats for regression
+            regression.add_runs(winner, pcs_runs, npcs_runs)
         
-        if winner == "pcs":
-            pcs_wins += 1
-        else:
-            npcs_wins += 1
+            if winner == "pcs":
+                pcs_wins += 1
+            else:
+                npcs_wins += 1
             
-        # Battle result line
-        battle_result = f"Battle {i+1}: Winner = {winner.upper()} | Running Score: PCs {pcs_wins} - NPCs {npcs_wins}"
-        
-        # Log based on mode (goes to both console and file when level permits)
-        if log_mode == "verbose":
-            root_logger.info(battle_result)
-        elif log_mode == "default" and i == 0:
-            root_logger.info(battle_result)
-        # short mode: don't log individual battles
+            # Battle result line (goes with the battle details), only for traced battles
+            if traced:
+                output.battle_lines([f"Battle {i+1}: Winner = {winner.upper()} | Running Score: PCs {pcs_wins} - NPCs {npcs_wins}"])
+                output.end_battle()
     
-    # Generate results summary - always show
-    root_logger.setLevel(logging.INFO)
-    root_logger.info("\n=== Simulation Results ===")
-    root_logger.info(f"Final Scorecard: PCs {pcs_wins} - NPCs {npcs_wins}")
-    for line in get_stats_lines("PC", total_pcs_runs):
-        root_logger.info(line)
-    for line in get_stats_lines("NPC", total_npcs_runs):
-        root_logger.info(line)
+        # Generate results summary - always show
+        output.results(["\n=== Simulation Results ===", f"Final Scorecard: PCs {pcs_wins} - NPCs {npcs_wins}"])
+        output.results(get_stats_lines("PC", pc_runs_hist))
+        output.results(get_stats_lines("NPC", npc_runs_hist))
         
-    # Regression Analysis
-    for line in get_regression_lines(battle_data):
-        root_logger.info(line)
+        # Regression Analysis
+        output.results(get_regression_lines(regression))
     
-    # Clean up file handler
-    file_handler.close()
-    root_logger.removeHandler(file_handler)
-    logger.info(f"\nResults written to {RESULTS_FILE}")
+    logger.info(f"\nResults written to {results_file}")
+    if writer:
+        logger.info(f"Per-battle records written to {store}")
+    if battle_log:
+        logger.info(f"Battle summaries written to {BATTLE_LOG_FILE}; replay battles with "
+                    f"'python main.py --replay --scenario {scenario_id} --battle N' or '--where \"winner=npcs npc_max_run>=10\"'")
+
+def exact_report(scenario_id: str):
+    """
+    Solve a scenario exactly with the Markov-chain solver and print the results.
+
+    Args:
+        scenario_id: ID of the scenario from scenarios.json
+    """
+    from solver import solve_scenario
+
+    scenarios = load_scenarios()
+
+    if scenario_id not in scenarios:
+        print(f"Scenario '{scenario_id}' not found in {SCENARIO_FILE}")
+        return
+
+    scenario_config = scenarios[scenario_id]
+
+    try:
+        validate_scenario_config(scenario_config)
+        solution = solve_scenario(scenario_config)
+    except ConfigurationError as e:
+        logger.error(f"Invalid Scenario Configuration: {e}")
+        return
+    except SolverError as e:
+        logger.error(f"Exact solution unavailable: {e}")
+        return
+
+    logger.info(f"Exact solution for scenario: {scenario_config['description']}")
+    logger.info("\n=== Exact Results ===")
+    logger.info(f"Win Probability: PCs {solution.pc_win_probability * 100:.4f}% - NPCs {(1 - solution.pc_win_probability) * 100:.4f}%")
+    logger.info(f"Expected Battle Length: {solution.expected_turns:.4f} turns")
+    logger.info(f"Solved States: {solution.states}")
+    for line in get_distribution_lines("PC", solution.pc_run_lengths):
+        logger.info(line)
+    for line in get_distribution_lines("NPC", solution.npc_run_lengths):
+        logger.info(line)
+
+def balance_report(scenario_id: str, parameter: str, target_win_rate: float, seed: Optional[int] = None,
+                   engine: str = "object"):
+    """
+    Search for the parameter value giving a target PC win rate and print the result.
+
+    Args:
+        scenario_id: ID of the scenario from scenarios.json
+        parameter: Parameter path to tune, e.g. "npcs[0].dt"
+        target_win_rate: Target PC win rate (0-1)
+        seed: Seed of the battle streams shared by every candidate value
+        engine: "object" or "mass"
+    """
+    from balance import solve_balance
+
+    scenarios = load_scenarios()
+
+    if scenario_id not in scenarios:
+        print(f"Scenario '{scenario_id}' not found in {SCENARIO_FILE}")
+        return
+
+    scenario_config = scenarios[scenario_id]
+
+    if seed is None:
+        seed = new_master_seed()
+
+    try:
+        validate_scenario_config(scenario_config)
+        result = solve_balance(scenario_config, parameter, target_win_rate, seed=seed, engine=engine)
+    except ConfigurationError as e:
+        logger.error(f"Invalid Balance Search: {e}")
+        return
+    except SolverError as e:
+        logger.error(f"No balanced value found: {e}")
+        return
+
+    low, high = result.interval
+    logger.info(f"Balance search for scenario: {scenario_config['description']}")
+    logger.info(f"Seed: {seed}")
+    logger.info("\n=== Balance Results ===")
+    logger.info(f"Target PC Win Rate: {target_win_rate * 100:.1f}%")
+    logger.info(f"Best {parameter}: {result.value} (PC win rate {result.win_rate * 100:.1f}%, 95% CI {low * 100:.1f}-{high * 100:.1f}%)")
+    if result.value_interval[0] != result.value_interval[1]:
+        logger.info(f"Values consistent with the target: {result.value_interval[0]}-{result.value_interval[1]}")
+    logger.info(f"Battles simulated: {result.runs}")
+    for value, (wins, runs) in result.evaluations.items():
+        logger.info(f"  {parameter} = {value:>3}: {wins / runs * 100:5.1f}% over {runs} battles")
+
+def compare_report(scenario_a: str, scenario_b: str, num_simulations: int, seed: Optional[int] = None,
+                   antithetic: bool = False, engine: str = "object"):
+    """
+    Compare the PC win rates of two scenarios on synchronized dice streams and print the result.
+
+    Args:
+        scenario_a: ID of the first scenario from scenarios.json
+        scenario_b: ID of the second scenario
+        num_simulations: Battles per scenario
+        seed: Master seed of the shared streams (random if None)
+        antithetic: Add a mirrored twin for every battle
+        engine: "object" or "mass"
+    """
+    from compare import compare_scenarios
+
+    scenarios = load_scenarios()
+
+    for scenario_id in (scenario_a, scenario_b):
+        if scenario_id not in scenarios:
+            print(f"Scenario '{scenario_id}' not found in {SCENARIO_FILE}")
+            return
+
+    try:
+        for scenario_id in (scenario_a, scenario_b):
+            validate_scenario_config(scenarios[scenario_id])
+    except ConfigurationError as e:
+        logger.error(f"Invalid Scenario Configuration: {e}")
+        return
+
+    if seed is None:
+        seed = new_master_seed()
+
+    result = compare_scenarios(scenarios[scenario_a], scenarios[scenario_b], num_simulations, seed,
+                               antithetic=antithetic, engine=engine)
+    low, high = result.interval
+    ind_low, ind_high = result.independent_interval
+    logger.info(f"Paired comparison: {scenario_a} (A) vs {scenario_b} (B)")
+    logger.info(f"Seed: {seed} | Battles per scenario: {result.battles}{' (antithetic pairs)' if antithetic else ''}")
+    logger.info("\n=== Comparison Results ===")
+    logger.info(f"PC Win Rate A: {result.win_rate_a * 100:.2f}%")
+    logger.info(f"PC Win Rate B: {result.win_rate_b * 100:.2f}%")
+    logger.info(f"Difference (A - B): {result.difference * 100:+.2f} points")
+    logger.info(f"  Paired 95% CI:      {low * 100:+.2f} to {high * 100:+.2f}")
+    logger.info(f"  Independent 95% CI: {ind_low * 100:+.2f} to {ind_high * 100:+.2f}")
+    if math.isinf(result.variance_reduction):
+        logger.info("  Both scenarios played out identically on every paired battle.")
+    else:
+        logger.info(f"  Variance reduction: {result.variance_reduction:.1f}x "
+                    f"(independent runs would need ~{result.variance_reduction * result.battles:.0f} battles per scenario)")
+
+def importance_report(scenario_id: str, num_simulations: int, seed: Optional[int] = None,
+                      tilt: Optional[float] = None, engine: str = "object"):
+    """
+    Estimate a (small) PC win probability by importance sampling and print the result.
+
+    Args:
+        scenario_id: ID of the scenario from scenarios.json
+        num_simulations: Number of tilted battles
+        seed: Master seed (random if None)
+        tilt: Tilt strength; chosen from pilot runs if None
+        engine: "object" or "mass"
+    """
+    from importance import choose_tilt, estimate_win_probability
+
+    scenarios = load_scenarios()
+
+    if scenario_id not in scenarios:
+        print(f"Scenario '{scenario_id}' not found in {SCENARIO_FILE}")
+        return
+
+    scenario_config = scenarios[scenario_id]
+
+    try:
+        validate_scenario_config(scenario_config)
+    except ConfigurationError as e:
+        logger.error(f"Invalid Scenario Configuration: {e}")
+        return
+
+    if seed is None:
+        seed = new_master_seed()
+    if tilt is None:
+        tilt = choose_tilt(scenario_config, seed, engine=engine)
+
+    estimate = estimate_win_probability(scenario_config, num_simulations, seed, theta=tilt, engine=engine)
+    logger.info(f"Importance sampling for scenario: {scenario_config['description']}")
+    logger.info(f"Seed: {seed} | Tilt: {tilt} | Battles: {estimate.battles}")
+    logger.info("\n=== Rare-Outcome Estimate ===")
+    logger.info(f"PC Win Probability: {estimate.probability:.4e} (standard error {estimate.standard_error:.2e})")
+    logger.info(f"Tilted battles won by PCs: {estimate.tilted_wins} (effective sample size {estimate.effective_sample_size:.1f})")
+    if estimate.effective_sample_size < 30:
+        logger.info("Warning: few effective samples; the standard error may be unreliable. Try another --tilt or more --runs.")
+
+def replay_report(scenario_id: str, battles: Optional[List[int]] = None, where: Optional[str] = None,
+                  num_simulations: int = 500, seed: Optional[int] = None, engine: str = "object", limit: int = 10):
+    """
+    Regenerate the turn-by-turn log of selected battles of a seeded run.
+
+    The seed, engine and summaries come from the battle log of the last
+    ``--log verbose`` run when it recorded the same scenario (and seed, if
+    one is given). Otherwise ``seed`` is required, and a query re-simulates
+    the run's battles without tracing to find the matches.
+
+    Args:
+        scenario_id: ID of the scenario from scenarios.json
+        battles: Battle numbers to replay
+        where: Summary query selecting battles to replay, e.g. "winner=npcs npc_max_run>=10"
+        num_simulations: Battles in the run, when a query has to re-simulate it
+        seed: Master seed of the run (read from the battle log if None)
+        engine: "object" or "mass" (read from the battle log if the seed is)
+        limit: Most battles matching the query to replay
+    """
+    from replay import iter_battle_log, parse_query, read_battle_log_header, replay_battle, simulate_summaries
+
+    scenarios = load_scenarios()
+
+    if scenario_id not in scenarios:
+        print(f"Scenario '{scenario_id}' not found in {SCENARIO_FILE}")
+        return
+
+    try:
+        scenario = validate_scenario_config(scenarios[scenario_id])
+        query = parse_query(where) if where else None
+    except ConfigurationError as e:
+        logger.error(f"Invalid Replay: {e}")
+        return
+
+    header = None
+    if Path(BATTLE_LOG_FILE).exists():
+        try:
+            header = read_battle_log_header(BATTLE_LOG_FILE)
+        except ConfigurationError as e:
+            logger.warning(f"Ignoring {BATTLE_LOG_FILE}: {e}")
+    # The log only describes this run if the scenario, seed and rules all match
+    if header and (header["scenario"] != scenario_id or header["rules_version"] != RULES_VERSION
+                   or (seed is not None and header["seed"] != seed)):
+        header = None
+    if seed is None:
+        if header is None:
+            logger.error(f"Replaying needs the --seed of the run, or a {BATTLE_LOG_FILE} from a "
+                         f"'--log verbose' run of {scenario_id}.")
+            return
+        seed, engine = header["seed"], header["engine"]
+
+    # (battle, stream seed, recorded summary or None)
+    selected = [(battle, battle_seed(seed, battle), None) for battle in battles or []]
+    if query:
+        source = iter_battle_log(BATTLE_LOG_FILE) if header else simulate_summaries(scenario, seed, num_simulations, engine)
+        matches = [summary for summary in source if query(summary)]
+        logger.info(f"{len(matches)} battle(s) match '{where}'"
+                    f"{f'; replaying the first {limit}' if len(matches) > limit else ''}")
+        selected.extend((summary.battle, summary.seed, summary) for summary in matches[:limit])
+
+    logger.info(f"Replaying scenario: {scenarios[scenario_id]['description']}")
+    logger.info(f"Seed: {seed}")
+    text_trace = LoggingTraceSink(logger)
+    for battle, stream_seed, recorded in selected:
+        summary = replay_battle(scenario, battle, stream_seed, engine, trace=text_trace)
+        logger.info(f"Battle {battle}: Winner = {summary.winner.upper()} | {summary.turns} turns | "
+                    f"Longest runs: PCs {summary.pc_max_run}, NPCs {summary.npc_max_run}\n")
+        if recorded is not None and summary != recorded:
+            logger.warning(f"Battle {battle} played out differently than recorded; the scenario changed since the run.")
 
 def main():
     parser = argparse.ArgumentParser(description="Jenness Battle Simulator")
@@ -189,11 +442,90 @@ def main():
     parser.add_argument("--runs", type=int, default=500, 
                         help="Number of simulations to run")
     parser.add_argument("--log", type=str, default="default", choices=["default", "short", "verbose"],
-                        help="Logging mode: default (1st battle full, then results), short (results only), verbose (all battles)")
+                        help="Logging mode: default (1st battle full, then results), short (results only), verbose (1st battle full, "
+                             "then results, plus every battle's seed and summary in battle_log.tsv for --replay/--where)")
+    parser.add_argument("--engine", type=str, default="object", choices=["object", "mass", "batch"],
+                        help="Battle engine: object (one battle at a time), mass (the same engine under its older name) "
+                             "or batch (vectorized, requires NumPy)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Master seed for reproducible runs (random if omitted)")
+    parser.add_argument("--exact", action="store_true",
+                        help="Solve the scenario exactly (Markov chain) instead of running simulations")
+    parser.add_argument("--balance", type=str, default=None, metavar="PARAMETER",
+                        help="Find the value of PARAMETER (e.g. 'npcs[0].dt', 'pcs[*].hp') giving --target-win-rate")
+    parser.add_argument("--target-win-rate", type=float, default=0.6,
+                        help="Target PC win rate for --balance (default 0.6)")
+    parser.add_argument("--compare", type=str, nargs=2, default=None, metavar=("A", "B"),
+                        help="Compare the PC win rates of scenarios A and B on synchronized dice streams")
+    parser.add_argument("--antithetic", action="store_true",
+                        help="With --compare, pair every battle with a mirrored-dice twin")
+    parser.add_argument("--importance", action="store_true",
+                        help="Estimate a tiny PC win probability by importance sampling (tilted dice)")
+    parser.add_argument("--tilt", type=float, default=None,
+                        help="Tilt strength for --importance (chosen from pilot runs if omitted)")
+    parser.add_argument("--store", type=str, default=None,
+                        help="Directory to write per-battle records to as memory-mappable .npy columns")
+    parser.add_argument("--console", type=str, default="all", choices=["all", "results", "none"],
+                        help="What to echo to the console: all (battle details and results), results, or none "
+                             f"(the {RESULTS_FILE} file always gets everything)")
+    parser.add_argument("--gzip", action="store_true",
+                        help=f"Write the results file gzip-compressed ({RESULTS_FILE}.gz)")
+    parser.add_argument("--replay", action="store_true",
+                        help="Regenerate the turn-by-turn log of the battles picked by --battle and/or --where, "
+                             "from the run's seed (read from the battle log of the last '--log verbose' run if --seed is omitted)")
+    parser.add_argument("--battle", type=int, nargs="+", default=None, metavar="N",
+                        help="Battle number(s) to --replay")
+    parser.add_argument("--where", type=str, default=None, metavar="QUERY",
+                        help="With --replay, replay the battles whose summary matches QUERY, e.g. 'winner=npcs npc_max_run>=10'")
+    parser.add_argument("--limit", type=int, default=10,
+                        help="Most battles matching --where to replay (default 10)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time the phases of the run and print a breakdown table")
+    parser.add_argument("--profile-out", type=str, default=PROFILE_FILE,
+                        help=f"Collapsed-stack file written by --profile, for flamegraph tools (default: {PROFILE_FILE})")
     
     args = parser.parse_args()
-    
-    simulation_loop(scenario_id=args.scenario, num_simulations=args.runs, log_mode=args.log)
+
+    if args.profile:
+        from profiling import PhaseProfiler
+        profiler = PhaseProfiler("main")
+        with profiler:
+            run_mode(args)
+        profiler.report(args.profile_out)
+    else:
+        run_mode(args)
+
+def run_mode(args: argparse.Namespace):
+    """Runs the mode selected on the command line."""
+    if args.exact:
+        exact_report(scenario_id=args.scenario)
+        return
+
+    if args.replay:
+        if not args.battle and not args.where:
+            logger.error("--replay needs --battle N or --where QUERY.")
+            return
+        replay_report(args.scenario, battles=args.battle, where=args.where, num_simulations=args.runs, seed=args.seed,
+                      engine="mass" if args.engine == "mass" else "object", limit=args.limit)
+        return
+
+    if args.importance:
+        importance_report(args.scenario, num_simulations=args.runs, seed=args.seed, tilt=args.tilt,
+                          engine="mass" if args.engine == "mass" else "object")
+        return
+
+    if args.compare:
+        compare_report(args.compare[0], args.compare[1], num_simulations=args.runs, seed=args.seed,
+                       antithetic=args.antithetic, engine="mass" if args.engine == "mass" else "object")
+        return
+
+    if args.balance:
+        balance_report(scenario_id=args.scenario, parameter=args.balance, target_win_rate=args.target_win_rate,
+                       seed=args.seed, engine="mass" if args.engine == "mass" else "object")
+        return
+
+    simulation_loop(scenario_id=args.scenario, num_simulations=args.runs, log_mode=args.log, engine=args.engine, seed=args.seed,
+                    store=args.store, console=args.console, compress=args.gzip)
 
 if __name__ == "__main__":
     main()
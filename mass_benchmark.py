@@ -0,0 +1,76 @@
+"""Scaling benchmark for mass battles.
+
+Times ``run_battle`` against ``run_mass_battle`` on warband/army scenarios of
+growing size (1 PC for every 10 NPCs) and prints the cost per turn, which
+should stay flat as the armies grow. Both names now run the same loop (see
+``mass_engine``), so the speedup column should stay close to 1x.
+
+Usage:
+    python mass_benchmark.py --sizes 110 1100 11000 --battles 3
+"""
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+
+from battle_engine import run_battle
+from mass_engine import run_mass_battle
+from random_streams import battle_rng
+from scenario import compile_scenario
+
+DEFAULT_SIZES = [11, 110, 550, 1100, 5500, 11000]
+
+def army_scenario(total: int) -> Dict[str, Any]:
+    """Builds a scenario with ``total`` combatants, one PC for every ten NPCs."""
+    pc_count = max(1, total // 11)
+    npc_count = max(1, total - pc_count)
+    return {
+        "id": f"army_{pc_count}v{npc_count}",
+        "description": f"Mass battle: {pc_count} PCs vs {npc_count} NPCs",
+        "starting_momentum": "pcs",
+        "pcs": [{"name": f"PC {i+1}", "hp": 4, "aptitude": 5, "expertise_attack": i % 5 == 0} for i in range(pc_count)],
+        "npcs": [{"name": f"NPC {i+1}", "hp": 1, "dt": 10 + i % 6} for i in range(npc_count)],
+    }
+
+def time_engine(engine, scenario, battles: int, seed: int) -> Dict[str, float]:
+    """Runs ``battles`` battles and returns the total time, turns and time per turn."""
+    turns = 0
+    start = time.perf_counter()
+    for i in range(battles):
+        pcs_runs, npcs_runs, _ = engine(i + 1, scenario, rng=battle_rng(seed, i + 1))
+        turns += sum(pcs_runs) + sum(npcs_runs)
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'turns': turns, 'us_per_turn': 1e6 * elapsed / max(turns, 1)}
+
+def run_scaling(sizes: List[int], battles: int = 3, seed: int = 0, max_object_size: Optional[int] = 1100):
+    """Prints a scaling table of both engines over the given army sizes.
+
+    Args:
+        sizes: Total combatant counts to benchmark.
+        battles: Battles per size and engine.
+        seed: Master seed; both engines replay the same battles.
+        max_object_size: Largest size also run under the object engine name, None for no limit.
+    """
+    print(f"{'Combatants':>10} | {'Turns/battle':>12} | {'mass us/turn':>12} | {'object us/turn':>14} | {'speedup':>7}")
+    print("-" * 68)
+    for size in sizes:
+        scenario = compile_scenario(army_scenario(size))
+        # Warm the outcome-table caches so neither engine is charged for them
+        time_engine(run_mass_battle, scenario, battles, seed)
+        mass = time_engine(run_mass_battle, scenario, battles, seed)
+        if max_object_size is None or size <= max_object_size:
+            obj = time_engine(run_battle, scenario, battles, seed)
+            object_cell = f"{obj['us_per_turn']:>14.2f}"
+            speedup_cell = f"{obj['seconds'] / mass['seconds']:>6.1f}x"
+        else:
+            object_cell, speedup_cell = f"{'skipped':>14}", f"{'-':>7}"
+        print(f"{size:>10} | {mass['turns'] / battles:>12.0f} | {mass['us_per_turn']:>12.2f} | {object_cell} | {speedup_cell}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mass-battle scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Total combatants per battle")
+    parser.add_argument("--battles", type=int, default=3, help="Battles per size")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed")
+    parser.add_argument("--max-object-size", type=int, default=1100,
+                        help="Largest size also timed under the object engine name")
+    args = parser.parse_args()
+    run_scaling(args.sizes, battles=args.battles, seed=args.seed, max_object_size=args.max_object_size)
@@ -0,0 +1,25 @@
+"""Battle engine for mass battles (hundreds or thousands of combatants per side).
+
+``run_mass_battle`` used to be a separate loop with incremental bookkeeping,
+written when ``run_battle`` still rescanned the teams every turn. That
+bookkeeping now lives in ``run_battle`` itself, so every turn is O(1) or
+O(log n) on either name:
+
+- ``team_state.ActorScheduler`` keeps a living count per team for the win
+  check and a linked list of living members in actor priority order, whose
+  cursor is the "not yet acted in this run" queue (the run is exhausted, and
+  friction starts, when the cursor runs off the end);
+- the strategies' targeting indexes (see ``strategies``): a Fenwick tree over
+  the living flags for random targeting and a monotone pointer into the DT
+  order for lowest-DT targeting.
+
+Function-style targeting strategies still work, but are called through
+``select_target`` on the combatant views and cost O(team size) per turn.
+
+The ``mass`` engine name is kept for the command-line options, battle logs
+and benchmarks that refer to it.
+"""
+from battle_engine import run_battle
+
+# Same loop and same draws as ``run_battle`` (see the module docstring)
+run_mass_battle = run_battle
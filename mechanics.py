@@ -1,6 +1,10 @@
+import math
 import random
+from bisect import bisect_right
 from enum import Enum
-from typing import Tuple, Protocol, runtime_checkable
+from fractions import Fraction
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple, Protocol, runtime_checkable
 
 @runtime_checkable
 class Combatant(Protocol):
@@ -18,23 +22,25 @@ class Outcome(Enum):
     FAILURE = "Failure"
     CATASTROPHE = "Catastrophe"
 
-def roll_d20(expertise: bool = False) -> int:
+def roll_d20(expertise: bool = False, rng: Optional[random.Random] = None) -> int:
     """
     Rolls a d20. If expertise is True, rolls 2d20 and keeps the highest.
     
     Args:
         expertise (bool): If True, grant advantage (2d20kh).
+        rng (random.Random, optional): Random stream to draw from (global stream if None).
         
     Returns:
         int: The result of the roll.
     """
+    rng = rng or random
     if expertise:
-        r1 = random.randint(1, 20)
-        r2 = random.randint(1, 20)
+        r1 = rng.randint(1, 20)
+        r2 = rng.randint(1, 20)
         return max(r1, r2)
-    return random.randint(1, 20)
+    return rng.randint(1, 20)
 
-def roll_boon(stacks: int = 1) -> int:
+def roll_boon(stacks: int = 1, rng: Optional[random.Random] = None) -> int:
     """
     Rolls a boon die based on number of stacks.
     
@@ -48,6 +54,7 @@ def roll_boon(stacks: int = 1) -> int:
     
     Args:
         stacks (int): The number of boon stacks accumulated.
+        rng (random.Random, optional): Random stream to draw from (global stream if None).
     
     Returns:
         int: Result.
@@ -57,9 +64,9 @@ def roll_boon(stacks: int = 1) -> int:
     
     from constants import BOON_BANE_DICE
     sides = BOON_BANE_DICE.get(min(stacks, 5), 12)
-    return random.randint(1, sides)
+    return (rng or random).randint(1, sides)
 
-def roll_bane(stacks: int) -> int:
+def roll_bane(stacks: int, rng: Optional[random.Random] = None) -> int:
     """
     Rolls a bane die based on number of stacks.
     
@@ -72,6 +79,7 @@ def roll_bane(stacks: int) -> int:
     
     Args:
         stacks (int): The number of bane stacks accumulated.
+        rng (random.Random, optional): Random stream to draw from (global stream if None).
         
     Returns:
         int: The result of the bane die roll. Returns 0 if stacks <= 0.
@@ -81,7 +89,7 @@ def roll_bane(stacks: int) -> int:
     
     from constants import BOON_BANE_DICE
     sides = BOON_BANE_DICE.get(min(stacks, 5), 12)
-    return random.randint(1, sides)
+    return (rng or random).randint(1, sides)
 
 def calculate_outcome(roll_total: int, dt: int) -> Outcome:
     """
@@ -111,7 +119,8 @@ def calculate_outcome(roll_total: int, dt: int) -> Outcome:
     else:
         return Outcome.FAILURE
 
-def resolve_roll(expertise: bool, aptitude: int, bane_stacks: int, dt: int, boon_stacks: int = 1) -> Tuple[int, bool, Outcome, int, int, int]:
+def resolve_roll(expertise: bool, aptitude: int, bane_stacks: int, dt: int, boon_stacks: int = 1,
+                 rng: Optional[random.Random] = None) -> Tuple[int, bool, Outcome, int, int, int]:
     """
     Performs the full resolution mechanics: 
     1. Roll d20 (or 2d20kh if expert).
@@ -126,6 +135,7 @@ def resolve_roll(expertise: bool, aptitude: int, bane_stacks: int, dt: int, boon
         bane_stacks (int): Number of bane stacks.
         dt (int): Difficulty Threshold.
         boon_stacks (int): Number of boon stacks (default 1 for PCs).
+        rng (random.Random, optional): Random stream to draw from (global stream if None).
         
     Returns:
         Tuple containing:
@@ -136,19 +146,19 @@ def resolve_roll(expertise: bool, aptitude: int, bane_stacks: int, dt: int, boon
         - boon_roll (int): The raw boon roll result (0 if net was banes).
         - bane_roll (int): The raw bane roll result (0 if net was boons).
     """
-    die_roll = roll_d20(expertise=expertise)
+    die_roll = roll_d20(expertise=expertise, rng=rng)
     
     # Boons and banes cancel out - compute net value
     net_stacks = boon_stacks - bane_stacks
     
     if net_stacks > 0:
         # Net boons
-        boon_roll = roll_boon(net_stacks)
+        boon_roll = roll_boon(net_stacks, rng=rng)
         bane_roll = 0
     elif net_stacks < 0:
         # Net banes
         boon_roll = 0
-        bane_roll = roll_bane(abs(net_stacks))
+        bane_roll = roll_bane(abs(net_stacks), rng=rng)
     else:
         # Cancel out completely
         boon_roll = 0
@@ -166,3 +176,211 @@ def resolve_roll(expertise: bool, aptitude: int, bane_stacks: int, dt: int, boon
         
     return total, die_roll == 20, outcome, die_roll, boon_roll, bane_roll
 
+
+# Fixed order used by the outcome probability tables
+OUTCOME_ORDER = (Outcome.TRIUMPH, Outcome.CLEAN_SUCCESS, Outcome.SETBACK, Outcome.FAILURE, Outcome.CATASTROPHE)
+
+@lru_cache(maxsize=None)
+def _outcome_table(expertise: bool, margin: int, net_stacks: int) -> Tuple[Tuple[Fraction, ...], Tuple[float, ...]]:
+    """
+    Builds the exact outcome probabilities and cumulative distribution for one roll.
+
+    The result only depends on whether the d20 has advantage, the aptitude minus
+    DT margin and the net boon/bane stacks (capped at the largest die), which
+    keeps the cache small.
+
+    Args:
+        expertise (bool): If True, the d20 is rolled as 2d20kh.
+        margin (int): Aptitude minus DT.
+        net_stacks (int): Boon stacks minus bane stacks, clamped to [-5, 5].
+
+    Returns:
+        Tuple of the exact probabilities (in OUTCOME_ORDER) and the float CDF.
+    """
+    from constants import BOON_BANE_DICE
+
+    if expertise:
+        # P(max of 2d20 == k) = (k^2 - (k-1)^2) / 400
+        d20_weights = {k: Fraction(2 * k - 1, 400) for k in range(1, 21)}
+    else:
+        d20_weights = {k: Fraction(1, 20) for k in range(1, 21)}
+
+    if net_stacks == 0:
+        modifiers = {0: Fraction(1)}
+    else:
+        sides = BOON_BANE_DICE[abs(net_stacks)]
+        sign = 1 if net_stacks > 0 else -1
+        modifiers = {sign * face: Fraction(1, sides) for face in range(1, sides + 1)}
+
+    probs = dict.fromkeys(OUTCOME_ORDER, Fraction(0))
+    for die_roll, p_die in d20_weights.items():
+        if die_roll == 20:
+            probs[Outcome.TRIUMPH] += p_die
+            continue
+        for modifier, p_mod in modifiers.items():
+            # Outcome thresholds are relative to DT, so evaluate against DT 0
+            probs[calculate_outcome(die_roll + margin + modifier, 0)] += p_die * p_mod
+
+    exact = tuple(probs[o] for o in OUTCOME_ORDER)
+    cdf = []
+    running = Fraction(0)
+    for p in exact:
+        running += p
+        cdf.append(float(running))
+    cdf[-1] = 1.0
+    return exact, tuple(cdf)
+
+def _table_key(expertise: bool, aptitude: int, dt: int, boon_stacks: int, bane_stacks: int) -> Tuple[bool, int, int]:
+    """Canonicalizes roll inputs into the cache key of ``_outcome_table``."""
+    net_stacks = max(-5, min(5, boon_stacks - bane_stacks))
+    return bool(expertise), aptitude - dt, net_stacks
+
+def outcome_distribution(expertise: bool, aptitude: int, dt: int, boon_stacks: int = 1, bane_stacks: int = 0) -> Dict[Outcome, float]:
+    """
+    Exact outcome probabilities of ``resolve_roll`` for the given inputs.
+
+    Args:
+        expertise (bool): If True, use advantageous d20 roll.
+        aptitude (int): Base bonus to add.
+        dt (int): Difficulty Threshold.
+        boon_stacks (int): Number of boon stacks (default 1 for PCs).
+        bane_stacks (int): Number of bane stacks.
+
+    Returns:
+        Dict[Outcome, float]: Probability of each outcome; the values sum to 1.
+    """
+    exact, _ = _outcome_table(*_table_key(expertise, aptitude, dt, boon_stacks, bane_stacks))
+    return {outcome: float(p) for outcome, p in zip(OUTCOME_ORDER, exact)}
+
+def sample_outcome(expertise: bool, aptitude: int, dt: int, boon_stacks: int = 1, bane_stacks: int = 0,
+                   rng: Optional[random.Random] = None) -> Outcome:
+    """
+    Draws a roll outcome from the cached distribution with a single uniform draw.
+
+    Equivalent in distribution to ``resolve_roll(...)[2]`` but skips the
+    individual dice, for callers that only need the outcome.
+
+    Args:
+        expertise (bool): If True, use advantageous d20 roll.
+        aptitude (int): Base bonus to add.
+        dt (int): Difficulty Threshold.
+        boon_stacks (int): Number of boon stacks (default 1 for PCs).
+        bane_stacks (int): Number of bane stacks.
+        rng (random.Random, optional): Random stream to draw from (global stream if None).
+
+    Returns:
+        Outcome: The sampled result enum.
+    """
+    _, cdf = _outcome_table(*_table_key(expertise, aptitude, dt, boon_stacks, bane_stacks))
+    return OUTCOME_ORDER[bisect_right(cdf, (rng or random).random())]
+
+def outcome_samplers(rng: Optional[random.Random]) -> Tuple[Tuple[Callable, Optional[random.Random]], Tuple[Callable, Optional[random.Random]]]:
+    """
+    The ``(sampler, stream)`` pairs an engine draws PC attack and NPC attack outcomes with.
+
+    Streams may customize outcome sampling by providing an ``outcome_samplers()``
+    method (see ``random_streams.RoleStreams`` and ``importance.ImportanceSampler``);
+    any other stream draws both with ``sample_outcome`` on itself. Each sampler
+    is called as ``sampler(expertise, aptitude, dt, boon_stacks, bane_stacks, rng=stream)``.
+    """
+    custom = getattr(rng, 'outcome_samplers', None)
+    if custom is not None:
+        return custom()
+    return (sample_outcome, rng), (sample_outcome, rng)
+
+@lru_cache(maxsize=None)
+def _tilted_table(expertise: bool, margin: int, net_stacks: int, scores: Tuple[float, ...],
+                  theta: float) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    """Exponentially tilted CDF ``p_o * exp(theta * score_o)`` and the log likelihood ratio of each outcome."""
+    exact, _ = _outcome_table(expertise, margin, net_stacks)
+    weights = [float(p) * math.exp(theta * score) for p, score in zip(exact, scores)]
+    total = sum(weights)
+    cdf, log_ratios, running = [], [], 0.0
+    for p, w in zip(exact, weights):
+        running += w / total
+        cdf.append(running)
+        # log(p / p_tilted); outcomes with p == 0 are never drawn
+        log_ratios.append(math.log(total) - theta * scores[len(cdf) - 1] if p else 0.0)
+    cdf[-1] = 1.0
+    return tuple(cdf), tuple(log_ratios)
+
+def sample_tilted_outcome(expertise: bool, aptitude: int, dt: int, boon_stacks: int, bane_stacks: int,
+                          scores: Tuple[float, ...], theta: float,
+                          rng: Optional[random.Random] = None) -> Tuple[Outcome, float]:
+    """
+    Draws a roll outcome from an exponentially tilted distribution, for importance sampling.
+
+    Args:
+        expertise (bool): If True, use advantageous d20 roll.
+        aptitude (int): Base bonus to add.
+        dt (int): Difficulty Threshold.
+        boon_stacks (int): Number of boon stacks.
+        bane_stacks (int): Number of bane stacks.
+        scores: Tilt score of each outcome, in OUTCOME_ORDER.
+        theta: Tilt strength; 0 samples the true distribution.
+        rng (random.Random, optional): Random stream to draw from (global stream if None).
+
+    Returns:
+        (outcome, log of true over tilted probability of that outcome).
+    """
+    cdf, log_ratios = _tilted_table(*_table_key(expertise, aptitude, dt, boon_stacks, bane_stacks), scores, theta)
+    i = bisect_right(cdf, (rng or random).random())
+    return OUTCOME_ORDER[i], log_ratios[i]
+
+@lru_cache(maxsize=None)
+def _roll_breakdowns(expertise: bool, margin: int, net_stacks: int) -> Dict[Outcome, Tuple[Tuple[Tuple[int, int, int], ...], Tuple[int, ...]]]:
+    """
+    Enumerates the dice behind each outcome of one roll.
+
+    Args:
+        expertise (bool): If True, the d20 is rolled as 2d20kh.
+        margin (int): Aptitude minus DT.
+        net_stacks (int): Boon stacks minus bane stacks, clamped to [-5, 5].
+
+    Returns:
+        Per outcome, the ``(d20, boon_roll, bane_roll)`` combinations that produce
+        it and their cumulative integer weights.
+    """
+    from constants import BOON_BANE_DICE
+
+    faces = [0] if net_stacks == 0 else list(range(1, BOON_BANE_DICE[abs(net_stacks)] + 1))
+    combos = {outcome: ([], []) for outcome in OUTCOME_ORDER}
+    for die_roll in range(1, 21):
+        # Every boon/bane face is equally likely, so only the kept d20 is weighted
+        weight = 2 * die_roll - 1 if expertise else 1
+        for face in faces:
+            boon_roll, bane_roll = (face, 0) if net_stacks > 0 else (0, face)
+            if die_roll == 20:
+                outcome = Outcome.TRIUMPH
+            else:
+                outcome = calculate_outcome(die_roll + margin + boon_roll - bane_roll, 0)
+            rolls, cumulative = combos[outcome]
+            rolls.append((die_roll, boon_roll, bane_roll))
+            cumulative.append((cumulative[-1] if cumulative else 0) + weight)
+    return {outcome: (tuple(rolls), tuple(cumulative)) for outcome, (rolls, cumulative) in combos.items()}
+
+def explain_roll(expertise: bool, aptitude: int, dt: int, boon_stacks: int, bane_stacks: int, outcome: Outcome,
+                 rng: Optional[random.Random] = None) -> Tuple[int, int, int]:
+    """
+    Draws the dice of a roll conditioned on an outcome already drawn by ``sample_outcome``.
+
+    Drawing the outcome first and the dice second gives exactly the joint
+    distribution of ``resolve_roll``, while the battle itself only consumes the
+    single uniform of ``sample_outcome``. Tracing a battle with a separate
+    ``rng`` here therefore never changes how it plays out.
+
+    Args:
+        expertise (bool): If True, use advantageous d20 roll.
+        aptitude (int): Base bonus to add.
+        dt (int): Difficulty Threshold.
+        boon_stacks (int): Number of boon stacks.
+        bane_stacks (int): Number of bane stacks.
+        outcome (Outcome): The outcome to explain.
+        rng (random.Random, optional): Random stream to draw from (global stream if None).
+
+    Returns:
+        Tuple[int, int, int]: The kept d20, the boon roll and the bane roll.
+    """
+    rolls, cumulative = _roll_breakdowns(*_table_key(expertise, aptitude, dt, boon_stacks, bane_stacks))[outcome]
+    pick = (rng or random).random() * cumulative[-1]
+    return rolls[bisect_right(cumulative, pick)]
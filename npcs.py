@@ -1,12 +1,16 @@
 import logging
-from typing import Any
+from typing import Any, Optional
 from mechanics import Combatant
 from strategies import random_strategy
+from team_state import TeamState, column_property, flag_property
 
 logger = logging.getLogger(__name__)
 
 class NPC:
     """Represents a Non-Player Character (Enemy).
+
+    An NPC is a thin view onto one row of a TeamState; the attributes below are
+    read from and written to that team's columns.
     
     Attributes:
         name: The display name of the NPC.
@@ -16,7 +20,11 @@ class NPC:
         expertise_attack: If True, imposes a Bane on PC Defense rolls.
         expertise_defense: If True, imposes a Bane on PC Attack rolls.
         targeting_strategy: Function to select a target from a list of enemies.
+        team: The team storage this NPC lives in.
+        index: The NPC's integer ID within its team.
     """
+    __slots__ = ('_team', '_index')
+
     def __init__(
         self, 
         name: str, 
@@ -25,6 +33,7 @@ class NPC:
         expertise_attack: bool = False, 
         expertise_defense: bool = False, 
         targeting_strategy: Any = random_strategy,
+        team: Optional[TeamState] = None,
         **kwargs
     ):
         """Initializes an NPC.
@@ -36,14 +45,34 @@ class NPC:
             expertise_attack: Whether the NPC has attack expertise.
             expertise_defense: Whether the NPC has defense expertise.
             targeting_strategy: Strategy function for targeting.
+            team: Team storage to add this NPC to (a private one-member team if None).
         """
-        self.name = name
-        self.hp = hp
-        self.max_hp = hp
-        self.dt = dt
-        self.expertise_attack = expertise_attack or kwargs.get('exp_atk', False)
-        self.expertise_defense = expertise_defense or kwargs.get('exp_def', False)
-        self.targeting_strategy = targeting_strategy
+        self._team = team if team is not None else TeamState(has_dt=True)
+        self._index = self._team.append(
+            name=name,
+            hp=hp,
+            aptitude=0,
+            dt=dt,
+            expertise_attack=expertise_attack or kwargs.get('exp_atk', False),
+            expertise_defense=expertise_defense or kwargs.get('exp_def', False),
+            targeting_strategy=targeting_strategy,
+        )
+
+    name = column_property('names', "The display name of the NPC.")
+    hp = column_property('hp', "Current Hit Points.")
+    max_hp = column_property('max_hp', "Maximum Hit Points.")
+    dt = column_property('dt', "Difficulty Threshold players must beat.", invalidates=True)
+    expertise_attack = flag_property('exp_atk', "If True, imposes a Bane on PC Defense rolls.", invalidates=True)
+    expertise_defense = flag_property('exp_def', "If True, imposes a Bane on PC Attack rolls.", invalidates=True)
+    targeting_strategy = column_property('strategies', "Function to select a target from a list of enemies.")
+
+    @property
+    def team(self) -> TeamState:
+        return self._team
+
+    @property
+    def index(self) -> int:
+        return self._index
 
     def take_damage(self, amount: int):
         """
@@ -54,7 +83,8 @@ class NPC:
         """
         self.hp -= amount
         if self.hp < 0: self.hp = 0
-        logger.debug(f"{self.name} takes {amount} damage. HP: {self.hp}")
+        # Lazy arguments: no string is built unless debug logging is on
+        logger.debug("%s takes %d damage. HP: %d", self.name, amount, self.hp)
 
     def is_alive(self) -> bool:
         """
@@ -1,8 +1,10 @@
 from typing import Any, Optional, Tuple
 import logging
-from mechanics import resolve_roll, Outcome, Combatant
+import random
+from mechanics import sample_outcome, Outcome, Combatant
 from strategies import lowest_dt_strategy
 from constants import DEFAULT_PC_HP, DEFAULT_APTITUDE, CRITICAL_DAMAGE, MIN_DAMAGE
+from team_state import TeamState, column_property, flag_property
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +12,9 @@ class PC:
     """
     Represents a Player Character.
 
+    A PC is a thin view onto one row of a TeamState; the attributes below are
+    read from and written to that team's columns.
+
     Attributes:
         name (str): The name of the PC.
         hp (int): Current Hit Points.
@@ -18,7 +23,11 @@ class PC:
         expertise_attack (bool): If True, grants 2d20kh on Attack rolls.
         expertise_defense (bool): If True, grants 2d20kh on Defense rolls.
         targeting_strategy (callable): Function to select a target from a list of enemies.
+        team (TeamState): The team storage this PC lives in.
+        index (int): The PC's integer ID within its team.
     """
+    __slots__ = ('_team', '_index')
+
     def __init__(
         self, 
         name: str, 
@@ -27,6 +36,7 @@ class PC:
         expertise_attack: bool = False, 
         expertise_defense: bool = False, 
         targeting_strategy: Any = lowest_dt_strategy,
+        team: Optional[TeamState] = None,
         **kwargs  # Ignore extra keys from JSON
     ):
         """Initializes a PC with health, aptitude, and expertise settings.
@@ -38,45 +48,60 @@ class PC:
             expertise_attack: If True, grants advantage on attack rolls.
             expertise_defense: If True, grants advantage on defense rolls.
             targeting_strategy: Function used to select targets.
+            team: Team storage to add this PC to (a private one-member team if None).
         """
-        self.name = name
-        self.hp = hp if hp is not None else DEFAULT_PC_HP
-        self.max_hp = self.hp
-        self.aptitude = aptitude if aptitude is not None else DEFAULT_APTITUDE
-        self.expertise_attack = expertise_attack or kwargs.get('exp_atk', False)
-        self.expertise_defense = expertise_defense or kwargs.get('exp_def', False)
-        self.targeting_strategy = targeting_strategy
-
-    def make_attack(self, target: Any, friction_banes: int) -> tuple[int, Outcome]:
+        self._team = team if team is not None else TeamState()
+        self._index = self._team.append(
+            name=name,
+            hp=hp if hp is not None else DEFAULT_PC_HP,
+            aptitude=aptitude if aptitude is not None else DEFAULT_APTITUDE,
+            dt=0,
+            expertise_attack=expertise_attack or kwargs.get('exp_atk', False),
+            expertise_defense=expertise_defense or kwargs.get('exp_def', False),
+            targeting_strategy=targeting_strategy,
+        )
+
+    name = column_property('names', "The name of the PC.")
+    hp = column_property('hp', "Current Hit Points.")
+    max_hp = column_property('max_hp', "Maximum Hit Points.")
+    aptitude = column_property('aptitude', "Base bonus added to rolls.", invalidates=True)
+    expertise_attack = flag_property('exp_atk', "If True, grants 2d20kh on Attack rolls.", invalidates=True)
+    expertise_defense = flag_property('exp_def', "If True, grants 2d20kh on Defense rolls.", invalidates=True)
+    targeting_strategy = column_property('strategies', "Function to select a target from a list of enemies.")
+
+    @property
+    def team(self) -> TeamState:
+        return self._team
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    def make_attack(self, target: Any, friction_banes: int, rng: Optional[random.Random] = None) -> tuple[int, Outcome]:
         """
         PC makes an attack roll against a target.
 
         Args:
             target (Any): The enemy entity being attacked. Must have a 'dt' attribute.
             friction_banes (int): Number of banes accumulated due to friction/momentum.
+            rng (random.Random, optional): Random stream to draw from (global stream if None).
 
         Returns:
             tuple[int, Outcome]: A tuple containing the damage dealt (int) and the Outcome enum.
         """
-        logger.debug(f"{self.name} attacks {target.name}!")
-        
         # Determine Bane Stacks
         bane_stacks = friction_banes
         if getattr(target, 'expertise_defense', False):
              bane_stacks += 1
-             logger.debug(f"  -> Added Bane for Target Defense Expertise (Total Banes: {bane_stacks})")
-        
-        # Roll Attack
-        total, nat20, outcome, die_roll, boon_roll, bane_roll = resolve_roll(
-            expertise=self.expertise_attack, 
-            aptitude=self.aptitude, 
-            bane_stacks=bane_stacks, 
-            dt=target.dt
+
+        outcome = sample_outcome(
+            expertise=self.expertise_attack,
+            aptitude=self.aptitude,
+            dt=target.dt,
+            bane_stacks=bane_stacks,
+            rng=rng
         )
-        
-        logger.debug(f"  -> Attack Roll: {die_roll} (d20) + {self.aptitude} (Apt) + {boon_roll} (Boon) - {bane_roll} (Bane) = {total}")
-        logger.debug(f"  -> vs DT {target.dt}: {outcome.value}")
-        
+
         damage = 0
         if outcome == Outcome.TRIUMPH:
             damage = CRITICAL_DAMAGE
@@ -85,13 +110,14 @@ class PC:
         
         return damage, outcome
 
-    def defend_attack(self, attacker: Any, friction_boons: int = 0) -> Outcome:
+    def defend_attack(self, attacker: Any, friction_boons: int = 0, rng: Optional[random.Random] = None) -> Outcome:
          """
          PC rolls to defend against an incoming attack.
 
          Args:
              attacker (Any): The entity attacking the PC. Must have a 'dt' attribute.
              friction_boons (int): Number of boons accumulated due to friction (when NPCs have momentum).
+             rng (random.Random, optional): Random stream to draw from (global stream if None).
 
          Returns:
              Outcome: The result of the defense roll.
@@ -102,24 +128,18 @@ class PC:
          
          if getattr(attacker, 'expertise_attack', False):
              bane_stacks += 1
-             logger.debug(f"  -> Added Bane for Attacker Attack Expertise (Total Banes: {bane_stacks})")
          
          # Friction is applied as boons when defending (NPCs have momentum)
          boon_stacks = 1 + friction_boons  # Base 1 boon + friction boons
-             
-         # Resolve Defense Roll
-         total, nat20, outcome, die_roll, boon_roll, bane_roll = resolve_roll(
-             expertise=self.expertise_defense, 
-             aptitude=self.aptitude, 
-             bane_stacks=bane_stacks, 
+
+         return sample_outcome(
+             expertise=self.expertise_defense,
+             aptitude=self.aptitude,
              dt=attacker_dt,
-             boon_stacks=boon_stacks
+             boon_stacks=boon_stacks,
+             bane_stacks=bane_stacks,
+             rng=rng
          )
-         
-         logger.debug(f"{self.name} defends against {attacker.name}!")
-         logger.debug(f"  -> Defense Roll: {die_roll} (d20) + {self.aptitude} (Apt) + {boon_roll} (Boon, stacks={boon_stacks}) - {bane_roll} (Bane) = {total}")
-         logger.debug(f"  -> vs DT {attacker_dt}: {outcome.value}")
-         return outcome
 
     def take_damage(self, amount: int):
         """
@@ -130,7 +150,8 @@ class PC:
         """
         self.hp -= amount
         if self.hp < 0: self.hp = 0
-        logger.debug(f"{self.name} takes {amount} damage. HP: {self.hp}")
+        # Lazy arguments: no string is built unless debug logging is on
+        logger.debug("%s takes %d damage. HP: %d", self.name, amount, self.hp)
 
     def is_alive(self) -> bool:
         """
@@ -0,0 +1,298 @@
+"""Engine throughput benchmark suite with a tracked baseline.
+
+``generate_benchmarks.py`` measures game balance; this module measures speed.
+Every case runs a fixed, seeded set of battles of one representative shape on
+one engine and records:
+
+- ``battles_per_sec``: battles simulated per second (best of the repeats),
+- ``us_per_turn``: wall time per turn in microseconds,
+- ``peak_kib``: peak memory allocated during one run (``tracemalloc``, on a
+  separate untimed pass so tracing does not skew the timings).
+
+The ``stats`` cases time the statistics pipeline instead: folding battle
+results into the run-length histograms and regression moments and rendering
+the report lines.
+
+Usage:
+    python perf_benchmark.py --save perf_baseline.json
+    python perf_benchmark.py --compare perf_baseline.json --threshold 0.15
+
+``--compare`` exits with status 1 if any case got slower (or hungrier) than
+the baseline by more than the threshold. Baselines are machine-specific:
+record one before and compare after a change on the same machine.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from battle_engine import run_battle
+from exceptions import ConfigurationError
+from mass_benchmark import army_scenario
+from mass_engine import run_mass_battle
+from random_streams import battle_rng, derive_seed
+from scenario import compile_scenario
+from stats import get_regression_lines, get_stats_lines
+from streaming_stats import MomentumRegression, RunLengthHistogram
+
+try:
+    import numpy  # noqa: F401
+    HAVE_NUMPY = True
+except ImportError:  # pragma: no cover - exercised only without numpy
+    HAVE_NUMPY = False
+
+BASELINE_FORMAT = 1
+
+# Fraction by which a metric may get worse before it counts as a regression
+DEFAULT_THRESHOLD = 0.10
+
+ENGINES = ("object", "mass", "batch", "stats")
+
+# Metrics and whether a higher value is better
+METRICS = {"battles_per_sec": True, "us_per_turn": False, "peak_kib": False}
+
+def _team(prefix: str, count: int, **stats: Any) -> List[Dict[str, Any]]:
+    return [dict(name=f"{prefix} {i+1}", **stats) for i in range(count)]
+
+def _shape(shape_id: str, pcs: List[Dict[str, Any]], npcs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"id": shape_id, "description": f"Benchmark shape {shape_id}", "starting_momentum": "pcs",
+            "pcs": pcs, "npcs": npcs}
+
+def benchmark_shapes() -> Dict[str, Tuple[Dict[str, Any], int]]:
+    """Returns the benchmark shapes as ``{shape: (scenario config, default battles)}``.
+
+    Battle counts are chosen so every case takes a fraction of a second on the
+    object engine.
+    """
+    return {
+        "1v1_high_hp": (_shape("1v1_high_hp", _team("PC", 1, hp=30, aptitude=5), _team("NPC", 1, hp=30, dt=15)), 1000),
+        "5v5": (_shape("5v5", _team("PC", 5, hp=4, aptitude=5), _team("NPC", 5, hp=4, dt=15)), 1000),
+        "1v15": (_shape("1v15", _team("PC", 1, hp=10, aptitude=5), _team("NPC", 15, hp=1, dt=12)), 2000),
+        "5v15": (_shape("5v15", _team("PC", 5, hp=4, aptitude=5), _team("NPC", 15, hp=1, dt=14)), 1000),
+        "mass": (army_scenario(1100), 10),
+    }
+
+class CaseResult(NamedTuple):
+    """Measurements of one benchmark case.
+
+    Attributes:
+        battles: Battles per run.
+        turns: Turns per run.
+        seconds: Best wall time over the repeats.
+        battles_per_sec: Battles per second of the best run.
+        us_per_turn: Microseconds per turn of the best run.
+        peak_kib: Peak traced allocation of one run, in KiB.
+    """
+    battles: int
+    turns: int
+    seconds: float
+    battles_per_sec: float
+    us_per_turn: float
+    peak_kib: float
+
+class Regression(NamedTuple):
+    """A metric that got worse than the baseline by more than the threshold."""
+    case: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change from the baseline (positive is larger)."""
+        return self.current / self.baseline - 1.0 if self.baseline else 0.0
+
+def _battle_runner(engine: str, config: Dict[str, Any], battles: int, seed: int) -> Callable[[], List[Any]]:
+    """Returns a function that plays the case's battles and returns their ``(pcs_runs, npcs_runs, winner)``."""
+    if engine == "batch":
+        from batch_engine import run_battles_batch
+        scenario = compile_scenario(config)
+        return lambda: run_battles_batch(scenario, battles, rng=derive_seed(seed, "batch"))
+    battle_fn = run_mass_battle if engine == "mass" else run_battle
+    scenario = compile_scenario(config)
+    return lambda: [battle_fn(i + 1, scenario, rng=battle_rng(seed, i + 1)) for i in range(battles)]
+
+def _stats_runner(results: Sequence[Any]) -> Callable[[], List[str]]:
+    """Returns a function that runs the reporting pipeline of ``main.simulation_loop`` over ``results``."""
+    def run() -> List[str]:
+        pc_hist, npc_hist, regression = RunLengthHistogram(), RunLengthHistogram(), MomentumRegression()
+        for pcs_runs, npcs_runs, winner in results:
+            pc_hist.extend(pcs_runs)
+            npc_hist.extend(npcs_runs)
+            regression.add_runs(winner, pcs_runs, npcs_runs)
+        return get_stats_lines("PC", pc_hist) + get_stats_lines("NPC", npc_hist) + get_regression_lines(regression)
+    return run
+
+def measure(run: Callable[[], Any], battles: int, turns: int, repeats: int) -> CaseResult:
+    """Times ``run`` (best of ``repeats``), then measures its peak allocation on one more pass.
+
+    Args:
+        run: The work of one case.
+        battles: Battles covered by one call of ``run``.
+        turns: Turns covered by one call of ``run``.
+        repeats: Timed calls; the fastest counts.
+
+    Returns:
+        CaseResult: The case's measurements.
+    """
+    best = float("inf")
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return CaseResult(
+        battles=battles,
+        turns=turns,
+        seconds=best,
+        battles_per_sec=battles / best if best > 0 else float("inf"),
+        us_per_turn=1e6 * best / max(turns, 1),
+        peak_kib=peak / 1024,
+    )
+
+def run_suite(engines: Sequence[str] = ENGINES, shapes: Optional[Sequence[str]] = None, scale: float = 1.0,
+              repeats: int = 5, seed: int = 0) -> Dict[str, CaseResult]:
+    """Runs every (engine, shape) case of the suite.
+
+    Args:
+        engines: Engines to benchmark; "stats" times the statistics pipeline
+            over the object engine's results. "batch" is skipped without NumPy.
+        shapes: Shapes to run (all of ``benchmark_shapes()`` if None).
+        scale: Multiplier on each shape's default battle count.
+        repeats: Timed repeats per case.
+        seed: Master seed; every engine plays the same seeded battles.
+
+    Returns:
+        Dict[str, CaseResult]: Results keyed by ``"engine/shape"``.
+    """
+    available = benchmark_shapes()
+    shapes = list(available) if shapes is None else list(shapes)
+    for name in shapes:
+        if name not in available:
+            raise ConfigurationError(f"Unknown benchmark shape '{name}' (choose from {', '.join(available)})")
+    for engine in engines:
+        if engine not in ENGINES:
+            raise ConfigurationError(f"Unknown benchmark engine '{engine}' (choose from {', '.join(ENGINES)})")
+
+    results: Dict[str, CaseResult] = {}
+    for name in shapes:
+        config, default_battles = available[name]
+        battles = max(1, round(default_battles * scale))
+        # The object engine's results feed the stats cases and count the turns of every engine
+        played = _battle_runner("object", config, battles, seed)()
+        turns = sum(sum(pcs_runs) + sum(npcs_runs) for pcs_runs, npcs_runs, _ in played)
+        for engine in engines:
+            if engine == "batch" and not HAVE_NUMPY:
+                continue
+            if engine == "stats":
+                run = _stats_runner(played)
+                case_turns = turns
+            else:
+                run = _battle_runner(engine, config, battles, seed)
+                if engine == "batch":
+                    # The batch engine draws its own streams, so its turn count differs
+                    case_turns = sum(sum(p) + sum(n) for p, n, _ in run())
+                else:
+                    # Warm the outcome-table caches so no case is charged for them
+                    run()
+                    case_turns = turns
+            results[f"{engine}/{name}"] = measure(run, battles, case_turns, repeats)
+    return results
+
+def save_baseline(path: str, results: Dict[str, CaseResult]):
+    """Writes suite results as a JSON baseline, with the interpreter and machine they were taken on."""
+    baseline = {
+        "format": BASELINE_FORMAT,
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cases": {case: result._asdict() for case, result in sorted(results.items())},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+
+def load_baseline(path: str) -> Dict[str, CaseResult]:
+    """Reads a baseline written by ``save_baseline``."""
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("format") != BASELINE_FORMAT:
+        raise ConfigurationError(f"{path} is not a version {BASELINE_FORMAT} benchmark baseline")
+    return {case: CaseResult(**values) for case, values in baseline["cases"].items()}
+
+def compare_results(baseline: Dict[str, CaseResult], current: Dict[str, CaseResult],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Regression]:
+    """Lists the metrics of cases present in both runs that got worse by more than ``threshold``.
+
+    Args:
+        baseline: Results of the reference run.
+        current: Results of the run under test.
+        threshold: Allowed relative slowdown (or memory growth), e.g. 0.1 for 10%.
+
+    Returns:
+        List[Regression]: The regressions, in case order.
+    """
+    regressions = []
+    for case in sorted(set(baseline) & set(current)):
+        for metric, higher_is_better in METRICS.items():
+            old, new = getattr(baseline[case], metric), getattr(current[case], metric)
+            worse = new < old * (1 - threshold) if higher_is_better else new > old * (1 + threshold)
+            if worse:
+                regressions.append(Regression(case, metric, old, new))
+    return regressions
+
+def format_results(results: Dict[str, CaseResult], baseline: Optional[Dict[str, CaseResult]] = None) -> List[str]:
+    """Renders the results as a table, with the throughput change against ``baseline`` if given."""
+    lines = [f"{'Case':<22} | {'Battles':>7} | {'Battles/s':>10} | {'us/turn':>8} | {'Peak KiB':>9} | {'vs base':>7}",
+             "-" * 80]
+    for case, r in sorted(results.items()):
+        change = ""
+        if baseline and case in baseline and baseline[case].battles_per_sec:
+            change = f"{r.battles_per_sec / baseline[case].battles_per_sec - 1:+.1%}"
+        lines.append(f"{case:<22} | {r.battles:>7} | {r.battles_per_sec:>10.1f} | {r.us_per_turn:>8.2f} | "
+                     f"{r.peak_kib:>9.1f} | {change:>7}")
+    return lines
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Engine throughput benchmark suite")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES, help="Engines to benchmark")
+    parser.add_argument("--shapes", nargs="+", default=None, choices=list(benchmark_shapes()),
+                        help="Scenario shapes to benchmark (default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier on each shape's battle count")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repeats per case (the fastest counts)")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed")
+    parser.add_argument("--save", metavar="PATH", help="Write the results to a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown flagged as a regression by --compare (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    results = run_suite(args.engines, args.shapes, scale=args.scale, repeats=args.repeats, seed=args.seed)
+    for line in format_results(results, baseline):
+        print(line)
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\nBaseline written to {args.save}")
+
+    if baseline is not None:
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for r in regressions:
+                print(f"  {r.case} {r.metric}: {r.baseline:.2f} -> {r.current:.2f} ({r.change:+.1%})")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Per-phase profiling of simulation runs.
+
+``PhaseProfiler`` times where a run spends its time: scenario build, the
+phases of the battle loop (win check, actor select, target select, roll,
+damage, and the momentum bookkeeping left over in the loop itself), stats
+accumulation and report rendering.
+
+Nothing in the engines knows about it. While a profiler is active (``with
+profiler:``), the functions and methods that implement each phase are
+replaced by timing wrappers, everywhere they are bound. They are restored on
+exit, so profiling costs nothing when it is off. Every wrapper adds a timer
+call around the work it measures, so a profiled run is slower than a plain
+one, and the cheapest phases are inflated the most.
+
+Phases nest: a roll inside a battle is recorded under ``battle;roll``. A
+phase's self time (its total minus its children) is what the collapsed-stack
+output attributes to it, and the battle's self time is reported as
+``momentum_bookkeeping``. ``write_collapsed`` writes the
+``frame;frame;frame count`` lines (count in microseconds) read by
+flamegraph.pl, speedscope and inferno.
+"""
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import mechanics
+from exceptions import SimulatorError
+from streaming_stats import MomentumRegression, RunLengthHistogram
+from team_state import ActorScheduler
+
+# Self time of these phases is reported as a child phase of its own
+SELF_LABELS = {"battle": "momentum_bookkeeping"}
+
+def _module_hooks() -> List[Tuple[Callable, str]]:
+    """(function, phase) pairs, instrumented in every module that binds the function."""
+    import battle_engine
+    import scenario
+    import stats
+    hooks = [
+        (scenario.compile_scenario, "scenario_build"),
+        (scenario.validate_scenario_config, "scenario_build"),
+        (battle_engine.run_battle, "battle"),
+        (battle_engine._target_id, "target_select"),
+        (stats.get_stats_lines, "report"),
+        (stats.get_regression_lines, "report"),
+        (stats.get_distribution_lines, "report"),
+    ]
+    try:
+        import batch_engine
+        hooks.append((batch_engine.run_battles_batch, "battle"))
+    except ImportError:  # pragma: no cover - batch_engine itself imports without numpy
+        pass
+    # ``python bulk_run.py --profile`` runs bulk_run as __main__
+    for name in ("bulk_run", "__main__"):
+        module = sys.modules.get(name)
+        if module is not None and Path(getattr(module, "__file__", None) or "").name == "bulk_run.py":
+            hooks.append((module.write_report, "report"))
+    return hooks
+
+# (class, method, phase)
+METHOD_HOOKS = [
+    (ActorScheduler, "any_alive", "win_check"),
+    (ActorScheduler, "take_damage", "damage"),
+    (ActorScheduler, "next_actor", "actor_select"),
+    (RunLengthHistogram, "extend", "stats"),
+    (MomentumRegression, "add_runs", "stats"),
+    (MomentumRegression, "merge", "stats"),
+]
+
+class PhaseProfiler:
+    """
+    Collects per-phase wall time and call counts while active.
+
+    Attributes:
+        root (str): Name of the outermost frame (e.g. the program name).
+        calls (Dict[Tuple[str, ...], int]): Calls per phase path.
+        total (Dict[Tuple[str, ...], float]): Seconds per phase path, children included.
+        self_time (Dict[Tuple[str, ...], float]): Seconds per phase path, children excluded.
+        wall (float): Wall time of the profiled block.
+        overhead (float): Calibrated seconds a timed call adds to its parent phase.
+    """
+    def __init__(self, root: str = "run"):
+        """Initializes an empty profile.
+
+        Args:
+            root: Name of the outermost frame.
+        """
+        self.root = root
+        self.calls: Dict[Tuple[str, ...], int] = defaultdict(int)
+        self.total: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self.self_time: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self.wall = 0.0
+        self.overhead = 0.0
+        # Open phases as [path, seconds spent in children]
+        self._stack: List[List[Any]] = []
+        self._patches: List[Tuple[Any, str, Any]] = []
+        self._start = 0.0
+
+    def _wrap(self, fn: Callable, phase: str) -> Callable:
+        """Returns ``fn`` timed as ``phase`` (calls made from inside the same phase are not split out)."""
+        stack, calls, total, self_time = self._stack, self.calls, self.total, self.self_time
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            parent = stack[-1] if stack else None
+            if parent is not None and parent[0][-1] == phase:
+                return fn(*args, **kwargs)
+            frame = [parent[0] + (phase,) if parent is not None else (phase,), 0.0]
+            stack.append(frame)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                path = frame[0]
+                calls[path] += 1
+                total[path] += elapsed
+                self_time[path] += elapsed - frame[1]
+                if parent is not None:
+                    parent[1] += elapsed
+
+        timed.__wrapped__ = fn
+        return timed
+
+    def _timed_samplers(self, outcome_samplers: Callable) -> Callable:
+        """Wraps ``mechanics.outcome_samplers`` so the samplers it resolves are timed as ``roll``."""
+        def timed_outcome_samplers(rng=None):
+            (pc_sample, pc_rolls), (npc_sample, npc_rolls) = outcome_samplers(rng)
+            return (self._wrap(pc_sample, "roll"), pc_rolls), (self._wrap(npc_sample, "roll"), npc_rolls)
+        return timed_outcome_samplers
+
+    @staticmethod
+    def _calibrate(calls: int = 10000, trials: int = 5) -> float:
+        """Measures the seconds a timed call adds to the self time of its parent phase (median of the trials)."""
+        noop = lambda: None
+
+        def bare():
+            for _ in range(calls):
+                noop()
+
+        estimates = []
+        for _ in range(trials):
+            probe = PhaseProfiler()
+            timed_noop = probe._wrap(noop, "child")
+
+            def timed():
+                for _ in range(calls):
+                    timed_noop()
+
+            start = time.perf_counter()
+            bare()
+            baseline = time.perf_counter() - start
+            probe._wrap(timed, "parent")()
+            estimates.append(max(probe.self_time[("parent",)] - baseline, 0.0) / calls)
+        return sorted(estimates)[trials // 2]
+
+    def _patch(self, owner: Any, name: str, replacement: Any):
+        self._patches.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def __enter__(self) -> "PhaseProfiler":
+        if self._patches:
+            raise SimulatorError("This profiler is already active.")
+        self.overhead = self._calibrate()
+        replacements = {id(fn): (fn, self._wrap(fn, phase)) for fn, phase in _module_hooks()}
+        replacements[id(mechanics.outcome_samplers)] = (mechanics.outcome_samplers,
+                                                        self._timed_samplers(mechanics.outcome_samplers))
+        # Rebind each hooked function in every module that imported it
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, "__dict__", None)
+            if not namespace:
+                continue
+            for name, value in list(namespace.items()):
+                if callable(value) and id(value) in replacements and replacements[id(value)][0] is value:
+                    self._patch(module, name, replacements[id(value)][1])
+        for cls, name, phase in METHOD_HOOKS:
+            self._patch(cls, name, self._wrap(cls.__dict__[name], phase))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall += time.perf_counter() - self._start
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+        self._patches.clear()
+        self._stack.clear()
+
+    def _frames(self) -> List[Tuple[Tuple[str, ...], float]]:
+        """Self time per full stack (root first), with the relabelled self times split out."""
+        frames = []
+        child_calls: Dict[Tuple[str, ...], int] = defaultdict(int)
+        for path, calls in self.calls.items():
+            child_calls[path[:-1]] += calls
+        for path, seconds in self.self_time.items():
+            # The timer work around each child call lands in the parent's self time
+            seconds = max(seconds - self.overhead * child_calls[path], 0.0)
+            label = SELF_LABELS.get(path[-1])
+            if label and any(len(p) > len(path) and p[:len(path)] == path for p in self.total):
+                path = path + (label,)
+            frames.append(((self.root,) + path, seconds))
+        outside = self.wall - sum(seconds for path, seconds in self.total.items() if len(path) == 1)
+        outside -= self.overhead * child_calls[()]
+        frames.append(((self.root,), max(outside, 0.0)))
+        return frames
+
+    def lines(self) -> List[str]:
+        """Renders the breakdown table: one row per phase path, with calls, total and self time."""
+        timed_calls = sum(self.calls.values())
+        # Percentages are of the wall time without the timers' own overhead
+        wall = max(self.wall - self.overhead * timed_calls, 0.0) or 1.0
+
+        def row(name: str, calls: Any, total: float, own: float) -> str:
+            per_call = f"{1e6 * total / calls:.2f}" if calls else ""
+            return (f"{name:<34} | {calls or '':>10} | {total:>9.3f} | {own:>9.3f} | "
+                    f"{100 * own / wall:>5.1f}% | {per_call:>8}")
+
+        lines = ["\n=== Profile ===",
+                 f"{'Phase':<34} | {'Calls':>10} | {'Total s':>9} | {'Self s':>9} | {'Self %':>6} | {'us/call':>8}",
+                 "-" * 92]
+        own = {stack[1:]: seconds for stack, seconds in self._frames()}
+        for path in sorted(set(self.total) | set(own)):
+            if not path:
+                continue
+            name = "  " * (len(path) - 1) + path[-1]
+            if path in self.total:
+                lines.append(row(name, self.calls[path], self.total[path], own.get(path, 0.0)))
+            else:
+                # Relabelled self time of the parent phase
+                lines.append(row(name, None, own[path], own[path]))
+        lines.append(row("(outside any phase)", None, own[()], own[()]))
+        lines.append(f"Wall time: {self.wall:.3f}s, of which about {self.overhead * timed_calls:.3f}s is timer overhead "
+                     f"({1e6 * self.overhead:.2f} us per timed call, subtracted from the self times)")
+        return lines
+
+    def write_collapsed(self, path: str):
+        """Writes the profile as collapsed stacks (``root;phase;phase microseconds`` per line)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(self._frames()):
+                micros = int(round(seconds * 1e6))
+                if micros > 0:
+                    f.write(f"{';'.join(stack)} {micros}\n")
+
+    def report(self, collapsed_path: Optional[str] = None):
+        """Prints the breakdown table and optionally writes the collapsed stacks."""
+        for line in self.lines():
+            print(line)
+        if collapsed_path:
+            self.write_collapsed(collapsed_path)
+            print(f"Collapsed stacks written to {collapsed_path}")
@@ -0,0 +1,93 @@
+"""Seedable random number streams for the simulator.
+
+Every function from ``run_battle`` down accepts an explicit ``rng`` object with
+the ``random.Random`` interface (``random``, ``randint``, ``choice``). This
+module builds those objects:
+
+- ``derive_seed`` turns a master seed plus stream keys (scenario, chunk,
+  battle index...) into an independent 64-bit seed.
+- ``battle_rng`` jumps straight to the stream of one battle, so any battle of
+  a seeded run can be reproduced on its own.
+- ``spawn`` creates a list of independent child streams, e.g. one per worker.
+- ``RoleStreams`` gives roll outcomes and target picks separate streams, so
+  two scenario variants replaying it see the same dice in the same roles
+  (common random numbers), optionally mirrored (antithetic).
+"""
+import hashlib
+import random
+from typing import Any, List, Optional, Sequence
+
+# Largest value of random(); ``_MIRROR - u`` maps the uniforms onto themselves in reverse
+_MIRROR = 1.0 - 2.0 ** -53
+
+def derive_seed(master_seed: int, *keys: Any) -> int:
+    """Derives an independent 64-bit seed for a sub-stream from a master seed and stream keys."""
+    material = repr((master_seed,) + keys).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(material).digest()[:8], "big")
+
+def new_master_seed() -> int:
+    """Draws a fresh master seed from the OS entropy pool, for runs without ``--seed``."""
+    return random.SystemRandom().randrange(2**32)
+
+def make_rng(seed: Optional[int] = None) -> random.Random:
+    """Creates a stream."""
+    return random.Random(seed)
+
+class MirroredRandom(random.Random):
+    """A ``random.Random`` whose ``random()`` returns the mirror ``1 - u`` of each underlying draw."""
+    def random(self) -> float:
+        return _MIRROR - super().random()
+
+class RoleStreams(random.Random):
+    """
+    A ``random.Random`` that draws each role of randomness from its own stream.
+
+    The engines draw one uniform per roll outcome and one per random target
+    pick. PC attack rolls, NPC attack rolls (PC defense rolls) and target
+    picks each get a separate stream, so the n-th PC attack of a battle uses
+    the same uniform in two scenario variants even after their momentum or
+    targeting has diverged. With ``antithetic``, every uniform ``u`` is
+    replaced by its mirror ``1 - u``.
+
+    Attributes:
+        pc_rolls (random.Random): Stream of PC attack roll outcomes.
+        npc_rolls (random.Random): Stream of NPC attack roll outcomes.
+        targets (random.Random): Stream of random target picks (``choice``).
+    """
+    def __init__(self, seed: int, antithetic: bool = False):
+        """Initializes the role streams.
+
+        Args:
+            seed: Seed from which the per-role streams are derived.
+            antithetic: Mirror every draw.
+        """
+        stream = MirroredRandom if antithetic else random.Random
+        self.antithetic = antithetic
+        self.pc_rolls = stream(derive_seed(seed, "pc_rolls"))
+        self.npc_rolls = stream(derive_seed(seed, "npc_rolls"))
+        self.targets = stream(derive_seed(seed, "targets"))
+        super().__init__(seed)
+
+    def random(self) -> float:
+        """Draws from a stream of its own, for any other use."""
+        u = super().random()
+        return _MIRROR - u if self.antithetic else u
+
+    def choice(self, seq: Sequence[Any]) -> Any:
+        """Picks from the target stream."""
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[int(self.targets.random() * len(seq))]
+
+    def outcome_samplers(self):
+        """PC and NPC attack outcomes are drawn from their role streams (see ``mechanics.outcome_samplers``)."""
+        from mechanics import sample_outcome
+        return (sample_outcome, self.pc_rolls), (sample_outcome, self.npc_rolls)
+
+def battle_rng(master_seed: int, battle_index: int) -> random.Random:
+    """Jumps directly to the stream of one battle of a seeded run."""
+    return make_rng(derive_seed(master_seed, "battle", battle_index))
+
+def spawn(master_seed: int, n: int) -> List[random.Random]:
+    """Creates ``n`` independent, reproducible child streams (e.g. one per worker)."""
+    return [make_rng(derive_seed(master_seed, "spawn", i)) for i in range(n)]
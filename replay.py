@@ -0,0 +1,221 @@
+"""Battle summaries and on-demand replays.
+
+A seeded run is deterministic: battle N draws every die from
+``battle_rng(seed, N)``, and tracing a battle does not change how it plays
+out (see ``battle_trace.explain_rng``). So a run does not need to log every
+turn of every battle. It records one ``BattleSummary`` per battle (the
+battle's stream seed, winner, length and longest runs) in a battle log, and
+the turn-by-turn log of any battle is regenerated later with
+``replay_battle``.
+
+The battle log is a tab-separated file. Its first line is a ``#`` comment
+holding the run's scenario, master seed, engine and rules version as JSON,
+then comes a column header line, then one line per battle.
+
+``parse_query`` turns a filter such as ``"winner=npcs npc_max_run>=10"``
+into a predicate over summaries, so only the battles of interest are
+replayed.
+"""
+import json
+import operator
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from battle_engine import run_battle
+from battle_trace import TraceSink
+from constants import RULES_VERSION
+from exceptions import ConfigurationError
+from mass_engine import run_mass_battle
+from random_streams import derive_seed, make_rng
+from scenario import CompiledScenario
+
+BATTLE_LOG_FORMAT = 1
+
+class BattleSummary(NamedTuple):
+    """Everything a battle log keeps about one battle.
+
+    Attributes:
+        battle: Battle number within the run (from 1).
+        seed: Seed of the battle's random stream (``derive_seed(master, "battle", battle)``).
+        winner: "pcs" or "npcs".
+        turns: Total turns.
+        pc_runs: Number of PC momentum runs.
+        npc_runs: Number of NPC momentum runs.
+        pc_max_run: Longest PC run.
+        npc_max_run: Longest NPC run.
+    """
+    battle: int
+    seed: int
+    winner: str
+    turns: int
+    pc_runs: int
+    npc_runs: int
+    pc_max_run: int
+    npc_max_run: int
+
+# Comparison operators of a query, longest first so ">=" is not read as ">"
+QUERY_OPERATORS = [
+    (">=", operator.ge),
+    ("<=", operator.le),
+    ("!=", operator.ne),
+    ("==", operator.eq),
+    (">", operator.gt),
+    ("<", operator.lt),
+    ("=", operator.eq),
+]
+
+def battle_seed(master_seed: int, battle: int) -> int:
+    """Seed of battle ``battle``'s stream in a run (the stream ``battle_rng`` returns)."""
+    return derive_seed(master_seed, "battle", battle)
+
+def summarize(battle: int, seed: int, pcs_runs: Sequence[int], npcs_runs: Sequence[int], winner: str) -> BattleSummary:
+    """Builds the summary of one battle result."""
+    return BattleSummary(
+        battle=battle,
+        seed=seed,
+        winner=winner,
+        turns=sum(pcs_runs) + sum(npcs_runs),
+        pc_runs=len(pcs_runs),
+        npc_runs=len(npcs_runs),
+        pc_max_run=max(pcs_runs, default=0),
+        npc_max_run=max(npcs_runs, default=0),
+    )
+
+def replay_battle(scenario: CompiledScenario, battle: int, seed: int, engine: str = "object",
+                  trace: Optional[TraceSink] = None) -> BattleSummary:
+    """Plays one battle again from its stream seed.
+
+    Args:
+        scenario: The compiled scenario of the run.
+        battle: Battle number (only used as the battle ID of the trace).
+        seed: Seed of the battle's stream (``BattleSummary.seed``).
+        engine: "object" or "mass"; both play the same battle.
+        trace: Sink receiving the turn-by-turn events.
+
+    Returns:
+        The battle's summary, identical to the one recorded by the run.
+    """
+    battle_fn = run_mass_battle if engine == "mass" else run_battle
+    pcs_runs, npcs_runs, winner = battle_fn(battle, scenario, rng=make_rng(seed), trace=trace)
+    return summarize(battle, seed, pcs_runs, npcs_runs, winner)
+
+def simulate_summaries(scenario: CompiledScenario, master_seed: int, runs: int,
+                       engine: str = "object") -> Iterator[BattleSummary]:
+    """Re-runs battles 1 to ``runs`` of a seeded run without tracing and yields their summaries."""
+    for battle in range(1, runs + 1):
+        yield replay_battle(scenario, battle, battle_seed(master_seed, battle), engine)
+
+class BattleLog:
+    """
+    Writes the battle summaries of a run, one tab-separated line per battle.
+
+    Lines are written in batches of ``batch`` battles. Use as a context
+    manager, or call ``close()``.
+    """
+    def __init__(self, path: str, scenario_id: str, master_seed: int, engine: str, batch: int = 1000):
+        """Creates (or truncates) a battle log and writes its header.
+
+        Args:
+            path: Log file.
+            scenario_id: ID of the simulated scenario.
+            master_seed: Master seed of the run.
+            engine: Engine the battles ran on.
+            batch: Battles whose lines are written together.
+        """
+        self.path = Path(path)
+        header = {"format": BATTLE_LOG_FORMAT, "scenario": scenario_id, "seed": master_seed, "engine": engine,
+                  "rules_version": RULES_VERSION}
+        self._file = self.path.open("w", encoding="utf-8")
+        self._file.write(f"# {json.dumps(header)}\n")
+        self._file.write("\t".join(BattleSummary._fields) + "\n")
+        self._batch = max(1, batch)
+        self._pending: List[str] = []
+
+    def write(self, summary: BattleSummary):
+        """Appends one battle."""
+        self._pending.append("\t".join(map(str, summary)))
+        if len(self._pending) >= self._batch:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._file.write("\n".join(self._pending) + "\n")
+            self._pending = []
+
+    def close(self):
+        if not self._file.closed:
+            self._flush()
+            self._file.close()
+
+    def __enter__(self) -> "BattleLog":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_battle_log_header(path: str) -> Dict[str, Any]:
+    """Reads the header of a battle log (scenario, seed, engine, rules_version).
+
+    Raises:
+        ConfigurationError: If the file is not a battle log.
+    """
+    with Path(path).open("r", encoding="utf-8") as f:
+        first = f.readline()
+    try:
+        header = json.loads(first[1:]) if first.startswith("#") else None
+    except json.JSONDecodeError:
+        header = None
+    if not isinstance(header, dict) or header.get("format") != BATTLE_LOG_FORMAT:
+        raise ConfigurationError(f"{path} is not a battle log.")
+    return header
+
+def iter_battle_log(path: str) -> Iterator[BattleSummary]:
+    """Streams the summaries of a battle log, in battle order."""
+    with Path(path).open("r", encoding="utf-8") as f:
+        # Header and column names
+        f.readline()
+        f.readline()
+        for line in f:
+            battle, seed, winner, *counts = line.rstrip("\n").split("\t")
+            yield BattleSummary(int(battle), int(seed), winner, *map(int, counts))
+
+def parse_query(text: str) -> Callable[[BattleSummary], bool]:
+    """Compiles a battle filter into a predicate over summaries.
+
+    A query is a list of conditions separated by spaces or commas, all of
+    which must hold, e.g. ``"winner=npcs npc_max_run>=10"``. A condition
+    compares a ``BattleSummary`` field with a value using ``=``, ``!=``,
+    ``<``, ``<=``, ``>`` or ``>=``.
+
+    Args:
+        text: The query.
+
+    Returns:
+        A function returning True for the battles that match.
+
+    Raises:
+        ConfigurationError: If a condition names an unknown field or has a malformed value.
+    """
+    conditions: List[Tuple[int, Callable[[Any, Any], bool], Any]] = []
+    for term in text.replace(",", " ").split():
+        for symbol, compare in QUERY_OPERATORS:
+            field, found, raw = term.partition(symbol)
+            if found:
+                break
+        else:
+            raise ConfigurationError(f"Query condition '{term}' has no comparison (use =, !=, <, <=, > or >=).")
+        if field not in BattleSummary._fields:
+            raise ConfigurationError(f"Unknown battle field '{field}' in query; use one of {', '.join(BattleSummary._fields)}.")
+        if field == "winner":
+            value: Any = raw.lower()
+            if value not in ("pcs", "npcs"):
+                raise ConfigurationError(f"Query value for winner must be 'pcs' or 'npcs', not '{raw}'.")
+        else:
+            try:
+                value = int(raw)
+            except ValueError:
+                raise ConfigurationError(f"Query value for {field} must be an integer, not '{raw}'.") from None
+        conditions.append((BattleSummary._fields.index(field), compare, value))
+    if not conditions:
+        raise ConfigurationError("Empty battle query.")
+    return lambda summary: all(compare(summary[i], value) for i, compare, value in conditions)
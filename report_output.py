@@ -0,0 +1,139 @@
+"""Buffered text output of a simulation run.
+
+``main.simulation_loop`` used to send every line of its output through the
+logging module, to a console handler and a file handler. Each record then
+paid for building a ``LogRecord``, formatting it and flushing both streams.
+``ReportOutput`` writes the same lines with plain buffered writes instead:
+
+- The results file gets every line, through a large write buffer. It can be
+  gzip-compressed.
+- The console policy decides separately what is echoed to the console:
+  everything (``"all"``), only the results summary (``"results"``) or
+  nothing (``"none"``).
+- Battle detail lines are held back and written once every
+  ``battle_batch`` battles. The lines are joined into one write per stream.
+
+The uncompressed file has the same content as the logging-based output.
+"""
+import gzip
+import sys
+from typing import Iterable, List, Optional, TextIO
+
+from battle_trace import TraceFormatter, TurnEvent
+from exceptions import ConfigurationError
+
+CONSOLE_POLICIES = ("all", "results", "none")
+
+# Bytes buffered before the results file is written to
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Battles whose detail lines are written together
+DEFAULT_BATTLE_BATCH = 100
+
+class ReportOutput:
+    """
+    Writes a run's battle details and results to the console and a results file.
+
+    Use as a context manager, or call ``close()`` to write out the buffers.
+
+    Attributes:
+        path (str): The results file.
+        console (str): Console policy, one of ``CONSOLE_POLICIES``.
+    """
+    def __init__(self, path: str, console: str = "all", compress: bool = False,
+                 battle_batch: int = DEFAULT_BATTLE_BATCH, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 console_stream: Optional[TextIO] = None):
+        """Opens (or truncates) the results file.
+
+        Args:
+            path: Results file.
+            console: "all" (battle details and results), "results" or "none".
+            compress: Write the file gzip-compressed.
+            battle_batch: Battles whose detail lines are written together.
+            buffer_size: Write buffer of the results file, in bytes.
+            console_stream: Console stream (standard error if None, like a logging ``StreamHandler``).
+
+        Raises:
+            ConfigurationError: If the console policy is unknown.
+            OSError: If the results file cannot be opened.
+        """
+        if console not in CONSOLE_POLICIES:
+            raise ConfigurationError(f"Unknown console policy '{console}'; use one of {', '.join(CONSOLE_POLICIES)}.")
+        self.path = path
+        self.console = console
+        self._battle_batch = max(1, battle_batch)
+        self._console = console_stream or sys.stderr
+        if compress:
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8", buffering=buffer_size)
+        self._battle_lines: List[str] = []
+        self._battles = 0
+
+    def write_file(self, text: str):
+        """Writes raw text to the results file only (e.g. its header)."""
+        self._file.write(text)
+
+    def _write(self, lines: List[str], to_console: bool):
+        if not lines:
+            return
+        text = "\n".join(lines) + "\n"
+        self._file.write(text)
+        if to_console:
+            self._console.write(text)
+
+    def battle_lines(self, lines: Iterable[str]):
+        """Queues detail lines of the current battle."""
+        self._battle_lines.extend(lines)
+
+    def end_battle(self):
+        """Marks the end of a battle's detail lines; writes them out every ``battle_batch`` battles."""
+        self._battles += 1
+        if self._battles % self._battle_batch == 0:
+            self.flush_battles()
+
+    def flush_battles(self):
+        """Writes out the queued battle detail lines."""
+        self._write(self._battle_lines, self.console == "all")
+        self._battle_lines = []
+
+    def results(self, lines: Iterable[str]):
+        """Writes results lines, after any queued battle details."""
+        self.flush_battles()
+        self._write(list(lines), self.console != "none")
+
+    def close(self):
+        """Writes out everything and closes the results file."""
+        if self._file.closed:
+            return
+        self.flush_battles()
+        self._file.close()
+        self._console.flush()
+
+    def __enter__(self) -> "ReportOutput":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class OutputTraceSink:
+    """Trace sink that renders battles with a ``TraceFormatter`` into a ``ReportOutput``."""
+    def __init__(self, output: ReportOutput):
+        """Initializes the sink.
+
+        Args:
+            output: Output receiving the battle detail lines.
+        """
+        self.output = output
+        self.formatter: Optional[TraceFormatter] = None
+
+    def battle_start(self, battle_id: int, scenario):
+        if self.formatter is None or self.formatter.scenario is not scenario:
+            self.formatter = TraceFormatter(scenario)
+        self.output.battle_lines(self.formatter.battle_start(battle_id))
+
+    def turn(self, event: TurnEvent):
+        self.output.battle_lines(self.formatter.turn(event))
+
+    def battle_end(self, winner: str):
+        self.output.battle_lines(self.formatter.battle_end(winner))
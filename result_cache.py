@@ -0,0 +1,150 @@
+"""Content-addressed on-disk cache of simulation results.
+
+``bulk_run`` splits every scenario into fixed chunks of battles, and each
+chunk is fully determined by the scenario, the engine, the rules, the master
+seed, the chunk index and its battle count. This cache stores the mergeable
+summary statistics of every simulated chunk, so rerunning a sweep only
+simulates chunks it has not seen: an unchanged scenario is read back, an
+edited one gets a new key, and asking for more runs only simulates the
+additional chunks.
+
+Entries live in one JSON file per scenario key:
+
+    <cache dir>/<sha256 of canonical config + engine + rules version + seed>.json
+
+Bumping ``constants.RULES_VERSION`` changes every key, so results of older
+rules are never reused (and are eventually evicted). When the directory grows
+beyond its size budget, the least recently used entries are deleted.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from constants import CACHE_DIR, RULES_VERSION
+from streaming_stats import MomentumRegression
+
+logger = logging.getLogger(__name__)
+
+# Version of the entry file layout
+CACHE_FORMAT = 1
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def scenario_key(config: Dict[str, Any], engine: str, seed: int) -> str:
+    """Content hash identifying the results of one scenario under one engine, rules version and seed."""
+    material = {
+        "config": config,
+        "engine": engine,
+        "rules_version": RULES_VERSION,
+        "format": CACHE_FORMAT,
+        "seed": seed,
+    }
+    canonical = json.dumps(material, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """
+    Per-chunk cache of battle summaries, backed by a directory of JSON files.
+
+    Lookups are served from entries loaded in memory; new chunks are written
+    back on ``flush()``.
+
+    Attributes:
+        directory (Path): Cache directory.
+        max_bytes (int): Size budget of the directory; LRU entries beyond it are evicted.
+        hits (int): Chunks served from the cache.
+        misses (int): Chunks that had to be simulated.
+    """
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Opens (and creates if needed) a cache directory.
+
+        Args:
+            directory: Cache directory.
+            max_bytes: Size budget of the directory.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = set()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {"chunks": {}}
+            path = self._path(key)
+            if path.exists():
+                try:
+                    with path.open("r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                    # Mark the entry as recently used for eviction
+                    os.utime(path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable cache entry {path.name}: {e}")
+                    entry = {"chunks": {}}
+            self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def _chunk_id(chunk: int, count: int) -> str:
+        return f"{chunk}:{count}"
+
+    def get(self, key: str, chunk: int, count: int) -> Optional[MomentumRegression]:
+        """Returns the cached summary of one chunk, or None on a miss.
+
+        Args:
+            key: Scenario key from ``scenario_key``.
+            chunk: Chunk index within the scenario.
+            count: Number of battles in the chunk.
+        """
+        state = self._entry(key)["chunks"].get(self._chunk_id(chunk, count))
+        if state is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return MomentumRegression.from_state(state)
+
+    def put(self, key: str, chunk: int, count: int, summary: MomentumRegression):
+        """Stores the summary of one chunk (written to disk on ``flush()``)."""
+        self._entry(key)["chunks"][self._chunk_id(chunk, count)] = summary.to_state()
+        self._dirty.add(key)
+
+    def flush(self):
+        """Writes new chunks to disk, then evicts least recently used entries over the size budget."""
+        for key in sorted(self._dirty):
+            path = self._path(key)
+            tmp_path = path.with_suffix(".tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(self._entries[key], f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        self._dirty.clear()
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the directory fits ``max_bytes``."""
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            self._entries.pop(path.stem, None)
+            total -= size
+
+    def stats(self) -> Tuple[int, int]:
+        """(hits, misses) since the cache was opened."""
+        return self.hits, self.misses
@@ -0,0 +1,306 @@
+"""Columnar on-disk store of per-battle results.
+
+A store is a directory with one NumPy ``.npy`` file per column plus a
+``meta.json`` describing the scenarios:
+
+    scenario       int32   index into meta["scenarios"]
+    seed           uint64  seed of the random stream the battle was drawn from
+    battle         int64   battle index within that stream / run
+    winner         int8    1 if the PCs won, 0 otherwise
+    turns          int32   total turns (sum of all run lengths)
+    pc_run_sum     int32   sum of PC run lengths
+    pc_run_count   int32   number of PC runs
+    npc_run_sum    int32   sum of NPC run lengths
+    npc_run_count  int32   number of NPC runs
+    hp_offset      int64   start of the battle's final HP values in ``hp``
+    hp             int16   final HP per combatant (PCs then NPCs), all battles back to back
+
+``ResultsWriter`` appends records with the standard library only: columns
+are streamed to disk as raw little-endian values behind a fixed-size ``.npy``
+header whose shape is patched on ``close()``. ``ResultsStore`` memory-maps
+the columns (requires NumPy) and recomputes report statistics with
+vectorized passes, so tens of millions of stored battles can be analyzed
+again without re-simulating.
+"""
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from exceptions import SimulatorError
+from streaming_stats import Covariance, MomentumRegression
+
+STORE_FORMAT = 1
+
+# Column name -> (array typecode, .npy dtype descriptor without byte order)
+COLUMNS = {
+    'scenario': ('i', 'i4'),
+    'seed': ('Q', 'u8'),
+    'battle': ('q', 'i8'),
+    'winner': ('b', 'i1'),
+    'turns': ('i', 'i4'),
+    'pc_run_sum': ('i', 'i4'),
+    'pc_run_count': ('i', 'i4'),
+    'npc_run_sum': ('i', 'i4'),
+    'npc_run_count': ('i', 'i4'),
+    'hp_offset': ('q', 'i8'),
+    'hp': ('h', 'i2'),
+}
+
+# Total size of the .npy header written by ResultsWriter (a multiple of 64)
+_HEADER_SIZE = 128
+
+# Records buffered in memory before they are appended to the column files
+_FLUSH_ROWS = 65536
+
+def _npy_header(descr: str, length: int) -> bytes:
+    """A version 1.0 ``.npy`` header for a 1-D array, padded to ``_HEADER_SIZE`` bytes."""
+    order = '|' if descr.endswith('1') else ('<' if sys.byteorder == 'little' else '>')
+    text = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (order + descr, length)
+    prefix = b'\x93NUMPY\x01\x00'
+    body_size = _HEADER_SIZE - len(prefix) - 2
+    body = text.ljust(body_size - 1) + '\n'
+    return prefix + body_size.to_bytes(2, 'little') + body.encode('latin1')
+
+def battle_record(pcs_runs: Sequence[int], npcs_runs: Sequence[int], winner: str) -> Dict[str, int]:
+    """The per-battle summary columns of one battle result (everything but ids, seed and HP)."""
+    pc_sum, npc_sum = sum(pcs_runs), sum(npcs_runs)
+    return {
+        'winner': 1 if winner == 'pcs' else 0,
+        'turns': pc_sum + npc_sum,
+        'pc_run_sum': pc_sum,
+        'pc_run_count': len(pcs_runs),
+        'npc_run_sum': npc_sum,
+        'npc_run_count': len(npcs_runs),
+    }
+
+class ChunkRecords:
+    """
+    Column buffers of a batch of battle records, cheap to pickle between processes.
+
+    Attributes:
+        columns (Dict[str, array]): One buffer per column except ``scenario`` and ``hp_offset``.
+    """
+    def __init__(self):
+        self.columns = {name: array(code) for name, (code, _) in COLUMNS.items()
+                        if name not in ('scenario', 'hp_offset')}
+
+    def __len__(self) -> int:
+        return len(self.columns['winner'])
+
+    def add(self, seed: int, battle: int, pcs_runs: Sequence[int], npcs_runs: Sequence[int], winner: str,
+            final_hp: Sequence[int]):
+        """Adds one battle."""
+        columns = self.columns
+        columns['seed'].append(seed)
+        columns['battle'].append(battle)
+        for name, value in battle_record(pcs_runs, npcs_runs, winner).items():
+            columns[name].append(value)
+        columns['hp'].extend(final_hp)
+
+class ResultsWriter:
+    """
+    Appends battle records to a store directory.
+
+    Use as a context manager, or call ``close()`` to finalize the files.
+    """
+    def __init__(self, directory: str):
+        """Creates (or truncates) a store.
+
+        Args:
+            directory: Store directory.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.scenarios: List[Dict[str, Any]] = []
+        self._scenario_ids: Dict[str, int] = {}
+        self._rows = 0
+        self._hp_values = 0
+        self._lengths = dict.fromkeys(COLUMNS, 0)
+        self._buffers = {name: array(code) for name, (code, _) in COLUMNS.items()}
+        self._files = {}
+        for name, (_, descr) in COLUMNS.items():
+            f = (self.directory / f"{name}.npy").open('wb')
+            f.write(_npy_header(descr, 0))
+            self._files[name] = f
+
+    def scenario_index(self, config: Dict[str, Any]) -> int:
+        """Registers a scenario (by ID) and returns its index in the ``scenario`` column."""
+        sid = config.get('id')
+        if sid not in self._scenario_ids:
+            self._scenario_ids[sid] = len(self.scenarios)
+            self.scenarios.append({
+                'id': sid,
+                'pcs': len(config.get('pcs', [])),
+                'npcs': len(config.get('npcs', [])),
+                'config': config,
+            })
+        return self._scenario_ids[sid]
+
+    def append(self, scenario: int, seed: int, battle: int, pcs_runs: Sequence[int], npcs_runs: Sequence[int],
+               winner: str, final_hp: Sequence[int]):
+        """Appends one battle.
+
+        Args:
+            scenario: Index from ``scenario_index``.
+            seed: Seed of the stream the battle was drawn from.
+            battle: Battle index within that stream or run.
+            pcs_runs: PC run lengths.
+            npcs_runs: NPC run lengths.
+            winner: "pcs" or "npcs".
+            final_hp: Final HP of every PC, then every NPC.
+        """
+        buffers = self._buffers
+        buffers['scenario'].append(scenario)
+        buffers['seed'].append(seed)
+        buffers['battle'].append(battle)
+        for name, value in battle_record(pcs_runs, npcs_runs, winner).items():
+            buffers[name].append(value)
+        buffers['hp_offset'].append(self._hp_values)
+        buffers['hp'].extend(final_hp)
+        self._hp_values += len(final_hp)
+        self._rows += 1
+        if len(buffers['winner']) >= _FLUSH_ROWS:
+            self._flush()
+
+    def extend(self, scenario: int, records: ChunkRecords):
+        """Appends a batch of battles of one scenario."""
+        buffers = self._buffers
+        rows = len(records)
+        per_battle = len(records.columns['hp']) // rows if rows else 0
+        buffers['scenario'].extend([scenario] * rows)
+        buffers['hp_offset'].extend(range(self._hp_values, self._hp_values + rows * per_battle, per_battle or 1))
+        for name, values in records.columns.items():
+            buffers[name].extend(values)
+        self._hp_values += len(records.columns['hp'])
+        self._rows += rows
+        if len(buffers['winner']) >= _FLUSH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        for name, buffer in self._buffers.items():
+            if sys.byteorder != 'little' and buffer.itemsize > 1:
+                buffer.byteswap()
+            buffer.tofile(self._files[name])
+            self._lengths[name] += len(buffer)
+            del buffer[:]
+
+    def close(self):
+        """Writes the remaining records, the final column lengths and ``meta.json``."""
+        if not self._files:
+            return
+        self._flush()
+        for name, (_, descr) in COLUMNS.items():
+            f = self._files[name]
+            f.seek(0)
+            f.write(_npy_header(descr, self._lengths[name]))
+            f.close()
+        self._files = {}
+        meta = {'format': STORE_FORMAT, 'rows': self._rows, 'scenarios': self.scenarios}
+        with (self.directory / "meta.json").open('w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=1)
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _moments(x: "np.ndarray", y: "np.ndarray") -> Covariance:
+    """Two-pass co-moments of x and y, packed into a Covariance accumulator."""
+    cov = Covariance()
+    n = int(x.size)
+    if n == 0:
+        return cov
+    mean_x, mean_y = float(x.mean()), float(y.mean())
+    dx, dy = x - mean_x, y - mean_y
+    for moments, mean, deviations in ((cov.x, mean_x, dx), (cov.y, mean_y, dy)):
+        moments.n, moments.mean, moments.m2 = n, mean, float(np.dot(deviations, deviations))
+    cov.c = float(np.dot(dx, dy))
+    return cov
+
+class ResultsStore:
+    """
+    Memory-mapped read access to a store directory.
+
+    Attributes:
+        directory (Path): Store directory.
+        scenarios (List[dict]): Scenario metadata (id, team sizes and config) by index.
+        columns (Dict[str, numpy.memmap]): Memory-mapped columns.
+    """
+    def __init__(self, directory: str):
+        """Opens a store.
+
+        Args:
+            directory: Store directory written by ``ResultsWriter``.
+
+        Raises:
+            SimulatorError: If NumPy is missing or the directory is not a store.
+        """
+        if np is None:
+            raise SimulatorError("Reading a results store requires NumPy (pip install numpy).")
+        self.directory = Path(directory)
+        meta_path = self.directory / "meta.json"
+        if not meta_path.exists():
+            raise SimulatorError(f"{directory} is not a results store (missing meta.json).")
+        with meta_path.open('r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.scenarios: List[Dict[str, Any]] = meta['scenarios']
+        self.columns = {name: np.load(self.directory / f"{name}.npy", mmap_mode='r') for name in COLUMNS}
+
+    def __len__(self) -> int:
+        return int(self.columns['winner'].shape[0])
+
+    def __getitem__(self, name: str) -> "np.ndarray":
+        return self.columns[name]
+
+    def scenario_index(self, sid: str) -> int:
+        """Index of a scenario ID in the ``scenario`` column."""
+        for i, scenario in enumerate(self.scenarios):
+            if scenario['id'] == sid:
+                return i
+        raise KeyError(sid)
+
+    def final_hp(self, row: int) -> "np.ndarray":
+        """Final HP of every combatant (PCs then NPCs) of one stored battle."""
+        scenario = self.scenarios[int(self.columns['scenario'][row])]
+        start = int(self.columns['hp_offset'][row])
+        return self.columns['hp'][start:start + scenario['pcs'] + scenario['npcs']]
+
+    def regression(self, rows: Optional["np.ndarray"] = None) -> MomentumRegression:
+        """Recomputes the regression accumulator of ``stats.get_regression_lines`` from stored battles.
+
+        Args:
+            rows: Boolean mask or indices of the battles to include (all if None).
+        """
+        c = self.columns
+        select = (lambda col: col) if rows is None else (lambda col: col[rows])
+        winner = select(c['winner']).astype(np.float64)
+        pc_count, npc_count = select(c['pc_run_count']), select(c['npc_run_count'])
+        # A side without runs has a mean run length of 0, as in the live reports
+        pc_mean = np.divide(select(c['pc_run_sum']), pc_count, out=np.zeros(winner.shape), where=pc_count > 0)
+        npc_mean = np.divide(select(c['npc_run_sum']), npc_count, out=np.zeros(winner.shape), where=npc_count > 0)
+
+        summary = MomentumRegression()
+        summary.battles = int(winner.size)
+        summary.pc_wins = int(winner.sum())
+        summary.pc = _moments(pc_mean, winner)
+        summary.npc = _moments(npc_mean, winner)
+        summary.diff = _moments(pc_mean - npc_mean, winner)
+        return summary
+
+    def scenario_summaries(self) -> Dict[str, MomentumRegression]:
+        """Per-scenario regression accumulators, for scenarios that have stored battles."""
+        scenario_col = self.columns['scenario']
+        summaries = {}
+        for index, scenario in enumerate(self.scenarios):
+            mask = scenario_col == index
+            if mask.any():
+                summaries[scenario['id']] = self.regression(mask)
+        return summaries
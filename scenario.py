@@ -0,0 +1,136 @@
+"""Scenario validation and compilation.
+
+A scenario is validated and compiled once; every battle then reuses the same
+combatant objects and only restores their HP with ``reset()``.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
+
+from exceptions import ConfigurationError
+from pcs import PC
+from npcs import NPC
+from team_state import ActorScheduler, TeamState
+
+# (expertise, aptitude, dt, base banes) of the PC roll for one attacker/target pair
+MatchupEntry = Tuple[bool, int, int, int]
+
+class CompiledScenario:
+    """
+    A scenario compiled into reusable combatants and precomputed roll inputs.
+
+    Attributes:
+        config (dict): The source scenario configuration.
+        scenario_id (str): Scenario ID.
+        description (str): Scenario description.
+        starting_momentum (str): "pcs" or "npcs".
+        pc_templates (tuple): Frozen PC configurations.
+        npc_templates (tuple): Frozen NPC configurations.
+        pc_state (TeamState): Column storage of the PC team, indexed by PC ID.
+        npc_state (TeamState): Column storage of the NPC team, indexed by NPC ID.
+        pcs (List[PC]): PC views onto ``pc_state``, reused across battles.
+        npcs (List[NPC]): NPC views onto ``npc_state``, reused across battles.
+        pc_scheduler (ActorScheduler): Actor queue of the PC team.
+        npc_scheduler (ActorScheduler): Actor queue of the NPC team.
+        pc_attack (tuple): ``pc_attack[i][j]`` holds the attack roll inputs for PC i attacking NPC j.
+        npc_attack (tuple): ``npc_attack[j][i]`` holds the defense roll inputs for PC i defending against NPC j.
+    """
+    def __init__(self, config: Dict[str, Any]):
+        """Builds the teams and matchup tables for a scenario configuration.
+
+        Args:
+            config: The scenario configuration dictionary.
+        """
+        self.config = config
+        self.scenario_id = config.get("id")
+        self.description = config.get("description", "")
+        self.starting_momentum = config.get("starting_momentum", "pcs")
+        self.pc_templates: Tuple[Mapping[str, Any], ...] = tuple(MappingProxyType(dict(p)) for p in config.get("pcs", []))
+        self.npc_templates: Tuple[Mapping[str, Any], ...] = tuple(MappingProxyType(dict(n)) for n in config.get("npcs", []))
+
+        self.pc_state = TeamState()
+        self.npc_state = TeamState(has_dt=True)
+        self.pcs: List[PC] = [PC(**p, team=self.pc_state) for p in self.pc_templates]
+        self.npcs: List[NPC] = [NPC(**n, team=self.npc_state) for n in self.npc_templates]
+        self.pc_scheduler = ActorScheduler(self.pc_state)
+        self.npc_scheduler = ActorScheduler(self.npc_state)
+
+        self._build_matchups()
+
+    def _build_matchups(self):
+        """Builds the matchup tables from the current roll inputs of both teams."""
+        # PC attacks: attacker's expertise and aptitude vs the target's DT, +1 bane for defense experts
+        self.pc_attack: Tuple[Tuple[MatchupEntry, ...], ...] = tuple(
+            tuple((pc.expertise_attack, pc.aptitude, npc.dt, int(npc.expertise_defense)) for npc in self.npcs)
+            for pc in self.pcs
+        )
+        # NPC attacks: the PC defends with its own expertise and aptitude vs the attacker's DT,
+        # +1 bane for attack experts
+        self.npc_attack: Tuple[Tuple[MatchupEntry, ...], ...] = tuple(
+            tuple((pc.expertise_defense, pc.aptitude, npc.dt, int(npc.expertise_attack)) for pc in self.pcs)
+            for npc in self.npcs
+        )
+        self._revisions = (self.pc_state.revision, self.npc_state.revision)
+
+    def reset(self):
+        """Restores every combatant to full HP in place for the next battle.
+
+        Roll inputs changed through the ``pcs``/``npcs`` views since the last
+        battle (aptitude, DT, expertise) are picked up here: the matchup
+        tables are rebuilt and the schedulers re-read the actor order.
+        """
+        if self._revisions != (self.pc_state.revision, self.npc_state.revision):
+            self._build_matchups()
+        self.pc_state.reset()
+        self.npc_state.reset()
+        self.pc_scheduler.reset()
+        self.npc_scheduler.reset()
+
+def compile_scenario(config: Dict[str, Any]) -> CompiledScenario:
+    """Compiles a scenario configuration without validating it.
+
+    Args:
+        config: The scenario configuration dictionary.
+
+    Returns:
+        The compiled scenario.
+    """
+    return CompiledScenario(config)
+
+def validate_scenario_config(config: Dict[str, Any]) -> CompiledScenario:
+    """Checks if the scenario configuration contains all required data and compiles it.
+
+    Args:
+        config: The scenario configuration dictionary to validate.
+
+    Returns:
+        The compiled scenario, ready to be passed to ``run_battle`` for every battle.
+
+    Raises:
+        ConfigurationError: If required fields are missing or invalid.
+    """
+    required_keys = ['id', 'description', 'pcs', 'npcs', 'starting_momentum']
+    for key in required_keys:
+        if key not in config:
+            raise ConfigurationError(f"Missing required key '{key}' in scenario config.")
+
+    if not config['pcs']:
+        raise ConfigurationError("Scenario must have at least one PC.")
+    if not config['npcs']:
+        raise ConfigurationError("Scenario must have at least one NPC.")
+
+    # Validate PCs
+    for i, pc in enumerate(config['pcs']):
+        if 'name' not in pc:
+            raise ConfigurationError(f"PC at index {i} is missing a name.")
+
+    # Validate NPCs
+    for i, npc in enumerate(config['npcs']):
+        for field in ['name', 'hp', 'dt']:
+            if field not in npc:
+                raise ConfigurationError(f"NPC '{npc.get('name', i)}' is missing field '{field}'.")
+        if npc['hp'] <= 0:
+            raise ConfigurationError(f"NPC '{npc['name']}' must have HP > 0.")
+        if npc['dt'] < 0:
+            raise ConfigurationError(f"NPC '{npc['name']}' must have DT >= 0.")
+
+    return compile_scenario(config)
@@ -0,0 +1,304 @@
+"""Indexed access to scenario files.
+
+Scenario files hold ``{"scenarios": [{...}, {...}, ...]}``. Generated sweeps
+can have tens of thousands of entries, and parsing the whole file to run one
+scenario dominates the CLI's start-up time. This module offers two ways to
+avoid that:
+
+- ``iter_scenarios`` streams a file scenario by scenario. It parses one
+  entry at a time from a buffered reader, so memory does not grow with the
+  file.
+- ``ScenarioStore`` is a read-only mapping from scenario ID to config. The
+  first time it opens a file it streams it once and writes a sidecar index
+  (``<file>.idx``). The index records, for each ID, the byte offset and length
+  of the entry and a SHA-256 of its bytes. Looking up a scenario then reads
+  and parses only that entry.
+
+The index stores the source file's size, modification time and SHA-256. If
+the size or time changes, the file is re-hashed: an unchanged hash only
+refreshes the recorded time, any other change rebuilds the index.
+"""
+import codecs
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+INDEX_SUFFIX = ".idx"
+
+# Bytes read per refill of the streaming parser
+READ_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+class _JsonReader:
+    """
+    Pull parser over a UTF-8 JSON byte stream that decodes one value at a time.
+
+    Tracks the byte offset of the read position, so decoded values can be
+    located in the file. An optional hash object sees every byte read.
+    """
+    def __init__(self, f: BinaryIO, name: str, digest: Optional[Any] = None):
+        self._f = f
+        self._name = name
+        self._digest = digest
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        # Byte offset in the file of self._buffer[self._pos]
+        self.offset = 0
+
+    def _fill(self) -> bool:
+        """Reads more of the file into the buffer; False at end of file."""
+        if self._eof:
+            return False
+        data = self._f.read(READ_SIZE)
+        if self._digest is not None:
+            self._digest.update(data)
+        self._eof = not data
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(data, final=self._eof)
+        self._pos = 0
+        return True
+
+    def _advance(self, end: int):
+        self.offset += len(self._buffer[self._pos:end].encode("utf-8"))
+        self._pos = end
+
+    def error(self, message: str) -> ConfigurationError:
+        return ConfigurationError(f"{self._name}: {message} at byte {self.offset}")
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character ('' at end of file)."""
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._advance(pos)
+            if pos < len(buffer) or not self._fill():
+                return buffer[pos] if pos < len(buffer) else ""
+
+    def take(self, expected: str) -> str:
+        """Consumes the next character, which must be one of ``expected``."""
+        char = self.peek()
+        if not char or char not in expected:
+            raise self.error(f"expected one of {expected!r}, found {char or 'end of file'!r}")
+        self._advance(self._pos + 1)
+        return char
+
+    def value(self) -> Tuple[Any, int, str]:
+        """Decodes the next JSON value and returns it with its byte offset and source text."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # An incomplete value at the end of the buffer needs more input
+                if not self._fill():
+                    raise self.error(f"invalid JSON ({e.msg})") from None
+                continue
+            # A number running into the end of the buffer may continue in the next read
+            if end == len(self._buffer) and not self._eof and not isinstance(value, (dict, list, str)):
+                self._fill()
+                continue
+            start, text = self.offset, self._buffer[self._pos:end]
+            self._advance(end)
+            return value, start, text
+
+def _scan(f: BinaryIO, name: str, digest: Optional[Any] = None) -> Iterator[Tuple[Dict[str, Any], int, str]]:
+    """Yields ``(config, byte offset, source text)`` for every entry of a scenario file's ``scenarios`` array."""
+    reader = _JsonReader(f, name, digest)
+    reader.take("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key, _, _ = reader.value()
+        reader.take(":")
+        if key == "scenarios":
+            reader.take("[")
+            if reader.peek() == "]":
+                reader.take("]")
+            else:
+                while True:
+                    config, offset, text = reader.value()
+                    if not isinstance(config, dict) or "id" not in config:
+                        raise reader.error("scenario entries must be objects with an 'id'")
+                    yield config, offset, text
+                    if reader.take(",]") == "]":
+                        break
+        else:
+            reader.value()
+        if reader.take(",}") == "}":
+            # Reading to the end also lets the digest cover the whole file
+            if reader.peek():
+                raise reader.error("unexpected data after the top-level object")
+            return
+
+def iter_scenarios(path: str) -> Iterator[Dict[str, Any]]:
+    """Streams the scenario configs of a file one at a time, in file order.
+
+    Args:
+        path: Scenario file (``{"scenarios": [...]}``).
+
+    Raises:
+        ConfigurationError: If the file is not a valid scenario file.
+    """
+    with open(path, "rb") as f:
+        for config, _, _ in _scan(f, str(path)):
+            yield config
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ScenarioStore(Mapping):
+    """
+    Read-only mapping of scenario ID to config, backed by a sidecar index.
+
+    Iteration yields the IDs in file order. If an ID appears more than once,
+    the last entry wins.
+
+    Attributes:
+        path (Path): The scenario file.
+        index_path (Path): The sidecar index file.
+        source_hash (str): SHA-256 of the scenario file the index describes.
+    """
+    def __init__(self, path: str, index_path: Optional[str] = None):
+        """Opens a scenario file, loading its index or building it.
+
+        Args:
+            path: Scenario file.
+            index_path: Sidecar index location (``<path>.idx`` by default).
+
+        Raises:
+            ConfigurationError: If the file is missing or not a valid scenario file.
+        """
+        self.path = Path(path)
+        self.index_path = Path(index_path) if index_path else self.path.with_name(self.path.name + INDEX_SUFFIX)
+        self.source_hash = ""
+        self._stat: Tuple[int, int] = (-1, -1)
+        self._entries: Dict[str, Tuple[int, int, str]] = {}
+        self._load()
+
+    def _source_stat(self) -> Tuple[int, int]:
+        try:
+            stat = self.path.stat()
+        except OSError as e:
+            raise ConfigurationError(f"Cannot read scenario file {self.path}: {e}") from None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load(self):
+        """Loads the sidecar index if it still describes the file, or rebuilds it."""
+        stat = self._source_stat()
+        index = self._read_index()
+        if index is not None:
+            if (index["size"], index["mtime_ns"]) == stat:
+                self._use(index, stat)
+                return
+            if index["hash"] == _file_hash(self.path):
+                # Touched but unchanged: keep the entries, record the new time
+                self._use(index, stat)
+                self._write_index()
+                return
+        self.rebuild()
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        try:
+            with self.index_path.open("r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable scenario index {self.index_path}: {e}")
+            return None
+        return index if index.get("format") == INDEX_FORMAT else None
+
+    def _use(self, index: Dict[str, Any], stat: Tuple[int, int]):
+        self.source_hash = index["hash"]
+        self._entries = {sid: (offset, length, digest) for sid, offset, length, digest in index["scenarios"]}
+        self._stat = stat
+
+    def rebuild(self):
+        """Streams the scenario file once and rewrites the index."""
+        stat = self._source_stat()
+        digest = hashlib.sha256()
+        entries: Dict[str, Tuple[int, int, str]] = {}
+        with self.path.open("rb") as f:
+            for config, offset, text in _scan(f, str(self.path), digest):
+                raw = text.encode("utf-8")
+                entries.pop(config["id"], None)
+                entries[config["id"]] = (offset, len(raw), hashlib.sha256(raw).hexdigest())
+        self._entries = entries
+        self.source_hash = digest.hexdigest()
+        self._stat = stat
+        self._write_index()
+
+    def _write_index(self):
+        index = {
+            "format": INDEX_FORMAT,
+            "size": self._stat[0],
+            "mtime_ns": self._stat[1],
+            "hash": self.source_hash,
+            "scenarios": [[sid, offset, length, digest] for sid, (offset, length, digest) in self._entries.items()],
+        }
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            # The in-memory index still works; only the next start-up pays for the scan again
+            logger.warning(f"Could not write scenario index {self.index_path}: {e}")
+
+    def _refresh(self):
+        """Reloads the index if the scenario file changed since it was read."""
+        if self._source_stat() != self._stat:
+            self._load()
+
+    def __getitem__(self, scenario_id: str) -> Dict[str, Any]:
+        self._refresh()
+        offset, length, _ = self._entries[scenario_id]
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            raw = f.read(length)
+        try:
+            config = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            config = None
+        if not isinstance(config, dict) or config.get("id") != scenario_id:
+            # Edited within the same size and timestamp: fall back to a fresh index
+            self.rebuild()
+            offset, length, _ = self._entries[scenario_id]
+            with self.path.open("rb") as f:
+                f.seek(offset)
+                config = json.loads(f.read(length).decode("utf-8"))
+        return config
+
+    def __contains__(self, scenario_id: object) -> bool:
+        self._refresh()
+        return scenario_id in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        self._refresh()
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._entries)
+
+    def content_hash(self, scenario_id: str) -> str:
+        """SHA-256 of a scenario's bytes in the file."""
+        self._refresh()
+        return self._entries[scenario_id][2]
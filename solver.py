@@ -0,0 +1,270 @@
+"""Exact Markov-chain solver for small battle scenarios.
+
+A battle is an absorbing Markov chain. Its state at the start of a turn is the
+HP of every combatant, which side has momentum, how many members of the active
+team have acted in the current run and the friction stacks:
+
+- The active team never takes damage during its own run, so the members that
+  have acted are always the first ``acted`` living members in actor priority
+  order (attack experts first, then team order), exactly as ``select_actor``
+  picks them.
+- Friction is active exactly when every living active member has acted, and the
+  current run length is ``acted + friction_stacks``.
+
+Every turn either deals damage (strictly lowering total HP) or shifts momentum
+without damage. The only cycle is therefore between the two fresh-run states
+at the same HP, which is solved in closed form; everything else is memoized
+dynamic programming over states with lower HP.
+"""
+import functools
+import json
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from constants import DEFAULT_PC_HP, DEFAULT_APTITUDE, CRITICAL_DAMAGE, STANDARD_DAMAGE, MIN_DAMAGE
+from exceptions import SolverError
+from mechanics import Outcome, outcome_distribution
+
+HpVector = Tuple[int, ...]
+
+class ExactSolution(NamedTuple):
+    """Exact results for a scenario.
+
+    Attributes:
+        pc_win_probability: Probability that the PCs win.
+        expected_turns: Expected number of turns in a battle.
+        expected_pc_runs: Expected number of PC runs per battle, by run length.
+        expected_npc_runs: Expected number of NPC runs per battle, by run length.
+        pc_run_lengths: Distribution of PC run lengths pooled over battles
+            (the limit of the Monte Carlo run-length histogram).
+        npc_run_lengths: Distribution of NPC run lengths pooled over battles.
+        states: Number of solved states.
+    """
+    pc_win_probability: float
+    expected_turns: float
+    expected_pc_runs: Dict[int, float]
+    expected_npc_runs: Dict[int, float]
+    pc_run_lengths: Dict[int, float]
+    npc_run_lengths: Dict[int, float]
+    states: int
+
+class _Value:
+    """Expected future rewards of a state: win probability, turns and run counts."""
+    __slots__ = ('win', 'turns', 'pc_runs', 'npc_runs')
+
+    def __init__(self):
+        self.win = 0.0
+        self.turns = 0.0
+        self.pc_runs: Dict[int, float] = {}
+        self.npc_runs: Dict[int, float] = {}
+
+    def add(self, other: "_Value", weight: float):
+        """Adds ``weight * other`` in place."""
+        self.win += weight * other.win
+        self.turns += weight * other.turns
+        for length, count in other.pc_runs.items():
+            self.pc_runs[length] = self.pc_runs.get(length, 0.0) + weight * count
+        for length, count in other.npc_runs.items():
+            self.npc_runs[length] = self.npc_runs.get(length, 0.0) + weight * count
+
+    def add_run(self, pcs_run: bool, length: int, weight: float):
+        """Records an expected completed run."""
+        runs = self.pc_runs if pcs_run else self.npc_runs
+        runs[length] = runs.get(length, 0.0) + weight
+
+    def scaled(self, weight: float) -> "_Value":
+        """Returns ``weight * self`` as a new value."""
+        result = _Value()
+        result.add(self, weight)
+        return result
+
+def _priority_order(exp_atk: List[bool]) -> Tuple[int, ...]:
+    """Actor priority used by ``select_actor``: attack experts first, then the rest, in team order."""
+    return tuple([i for i, e in enumerate(exp_atk) if e] + [i for i, e in enumerate(exp_atk) if not e])
+
+class _Solver:
+    """Memoized value iteration over the battle state space of one scenario."""
+
+    def __init__(self, scenario_config: Dict[str, Any], max_states: int):
+        pcs = scenario_config.get("pcs", [])
+        npcs = scenario_config.get("npcs", [])
+        self.pc_hp = tuple(p['hp'] if p.get('hp') is not None else DEFAULT_PC_HP for p in pcs)
+        self.pc_apt = tuple(p['aptitude'] if p.get('aptitude') is not None else DEFAULT_APTITUDE for p in pcs)
+        pc_exp_atk = [bool(p.get('expertise_attack', False) or p.get('exp_atk', False)) for p in pcs]
+        self.pc_exp_atk = tuple(pc_exp_atk)
+        self.pc_exp_def = tuple(bool(p.get('expertise_defense', False) or p.get('exp_def', False)) for p in pcs)
+        self.pc_order = _priority_order(pc_exp_atk)
+
+        self.npc_hp = tuple(n['hp'] for n in npcs)
+        self.npc_dt = tuple(n['dt'] for n in npcs)
+        npc_exp_atk = [bool(n.get('expertise_attack', False) or n.get('exp_atk', False)) for n in npcs]
+        self.npc_exp_atk = tuple(npc_exp_atk)
+        self.npc_exp_def = tuple(bool(n.get('expertise_defense', False) or n.get('exp_def', False)) for n in npcs)
+        self.npc_order = _priority_order(npc_exp_atk)
+        # lowest_dt_strategy: lowest DT, first in team order on ties
+        self.npc_dt_order = tuple(sorted(range(len(npcs)), key=lambda i: self.npc_dt[i]))
+
+        self.max_states = max_states
+        self.memo: Dict[Tuple, _Value] = {}
+        self.fresh_memo: Dict[Tuple[HpVector, HpVector], Tuple[_Value, _Value]] = {}
+
+    def _remember(self, key: Tuple, value: _Value) -> _Value:
+        if len(self.memo) >= self.max_states:
+            raise SolverError(f"State space exceeds {self.max_states} states; use Monte Carlo for this scenario.")
+        self.memo[key] = value
+        return value
+
+    def _expand(self, pc_hp: HpVector, npc_hp: HpVector, pcs_turn: bool, acted: int, stacks: int) -> Tuple[_Value, float]:
+        """
+        Expands one turn from a state.
+
+        Returns:
+            The expected rewards of every transition except the continuation after a
+            momentum shift, and the probability of that shift (which always leads to
+            the other side's fresh run at the same HP).
+        """
+        if pcs_turn:
+            own_hp, order = pc_hp, self.pc_order
+        else:
+            own_hp, order = npc_hp, self.npc_order
+        living = [i for i in order if own_hp[i] > 0]
+        # Acted members are the first `acted` living members in priority order
+        actor = living[acted] if acted < len(living) else living[0]
+        friction_active = acted == len(living)
+        friction_count = stacks + 1 if friction_active else 0
+        next_acted = acted if friction_active else acted + 1
+        next_stacks = friction_count
+        run_length = acted + stacks + 1
+
+        result = _Value()
+        result.turns = 1.0
+        if pcs_turn:
+            target = next(i for i in self.npc_dt_order if npc_hp[i] > 0)
+            dist = outcome_distribution(
+                self.pc_exp_atk[actor], self.pc_apt[actor], self.npc_dt[target],
+                boon_stacks=1, bane_stacks=friction_count + self.npc_exp_def[target]
+            )
+            hits = ((dist[Outcome.TRIUMPH], CRITICAL_DAMAGE), (dist[Outcome.CLEAN_SUCCESS], MIN_DAMAGE))
+            shift = dist[Outcome.SETBACK] + dist[Outcome.FAILURE] + dist[Outcome.CATASTROPHE]
+            for p, damage in hits:
+                if p == 0.0:
+                    continue
+                new_npc_hp = npc_hp[:target] + (max(npc_hp[target] - damage, 0),) + npc_hp[target + 1:]
+                if not any(new_npc_hp):
+                    result.win += p
+                    result.add_run(True, run_length, p)
+                else:
+                    result.add(self.value(pc_hp, new_npc_hp, True, next_acted, next_stacks), p)
+            result.add_run(True, run_length, shift)
+        else:
+            targets = [i for i in range(len(pc_hp)) if pc_hp[i] > 0]
+            shift = 0.0
+            for target in targets:
+                dist = outcome_distribution(
+                    self.pc_exp_def[target], self.pc_apt[target], self.npc_dt[actor],
+                    boon_stacks=1 + friction_count, bane_stacks=self.npc_exp_atk[actor]
+                )
+                pick = 1.0 / len(targets)
+                hits = ((dist[Outcome.CATASTROPHE], CRITICAL_DAMAGE),
+                        (dist[Outcome.FAILURE] + dist[Outcome.SETBACK], STANDARD_DAMAGE))
+                shift += pick * (dist[Outcome.CLEAN_SUCCESS] + dist[Outcome.TRIUMPH])
+                for p, damage in hits:
+                    if p == 0.0:
+                        continue
+                    new_pc_hp = pc_hp[:target] + (max(pc_hp[target] - damage, 0),) + pc_hp[target + 1:]
+                    if not any(new_pc_hp):
+                        result.add_run(False, run_length, pick * p)
+                    else:
+                        result.add(self.value(new_pc_hp, npc_hp, False, next_acted, next_stacks), pick * p)
+            result.add_run(False, run_length, shift)
+        return result, shift
+
+    def fresh(self, pc_hp: HpVector, npc_hp: HpVector) -> Tuple[_Value, _Value]:
+        """Solves the two fresh-run states (PC and NPC momentum) at one HP vector."""
+        key = (pc_hp, npc_hp)
+        if key in self.fresh_memo:
+            return self.fresh_memo[key]
+        # F_p = B_p + q_p F_n and F_n = B_n + q_n F_p
+        b_p, q_p = self._expand(pc_hp, npc_hp, True, 0, 0)
+        b_n, q_n = self._expand(pc_hp, npc_hp, False, 0, 0)
+        f_p = b_p.scaled(1.0)
+        f_p.add(b_n, q_p)
+        f_p = f_p.scaled(1.0 / (1.0 - q_p * q_n))
+        f_n = b_n.scaled(1.0)
+        f_n.add(f_p, q_n)
+        self.fresh_memo[key] = (f_p, f_n)
+        self._remember((pc_hp, npc_hp, True, 0, 0), f_p)
+        self._remember((pc_hp, npc_hp, False, 0, 0), f_n)
+        return f_p, f_n
+
+    def value(self, pc_hp: HpVector, npc_hp: HpVector, pcs_turn: bool, acted: int, stacks: int) -> _Value:
+        """Expected future rewards from the start of a turn in the given state."""
+        key = (pc_hp, npc_hp, pcs_turn, acted, stacks)
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+        if acted == 0 and stacks == 0:
+            f_p, f_n = self.fresh(pc_hp, npc_hp)
+            return f_p if pcs_turn else f_n
+        result, shift = self._expand(pc_hp, npc_hp, pcs_turn, acted, stacks)
+        f_p, f_n = self.fresh(pc_hp, npc_hp)
+        result.add(f_n if pcs_turn else f_p, shift)
+        return self._remember(key, result)
+
+def _normalize(counts: Dict[int, float]) -> Dict[int, float]:
+    total = sum(counts.values())
+    if total == 0:
+        return {}
+    return {length: counts[length] / total for length in sorted(counts)}
+
+# Solutions kept for repeated solves (e.g. a balance search revisiting a value)
+SOLUTION_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=SOLUTION_CACHE_SIZE)
+def _solve(cache_key: str, max_states: int) -> ExactSolution:
+    """Solves the scenario described by a ``solve_scenario`` cache key; memoized per key and state limit."""
+    pcs, npcs, starting_momentum = json.loads(cache_key)
+    scenario_config = {"pcs": pcs, "npcs": npcs, "starting_momentum": starting_momentum}
+    solver = _Solver(scenario_config, max_states)
+    start_pcs = starting_momentum == "pcs"
+    if not any(solver.pc_hp) or not any(solver.npc_hp):
+        value = _Value()
+        value.win = 1.0 if any(solver.pc_hp) else 0.0
+    else:
+        try:
+            value = solver.value(solver.pc_hp, solver.npc_hp, start_pcs, 0, 0)
+        except RecursionError as e:
+            raise SolverError("Scenario HP pools are too deep to solve exactly; use Monte Carlo.") from e
+
+    return ExactSolution(
+        pc_win_probability=value.win,
+        expected_turns=value.turns,
+        expected_pc_runs=dict(sorted(value.pc_runs.items())),
+        expected_npc_runs=dict(sorted(value.npc_runs.items())),
+        pc_run_lengths=_normalize(value.pc_runs),
+        npc_run_lengths=_normalize(value.npc_runs),
+        states=len(solver.memo),
+    )
+
+def solve_scenario(scenario_config: Dict[str, Any], max_states: int = 500_000) -> ExactSolution:
+    """
+    Solves a scenario exactly instead of sampling it.
+
+    Assumes the default targeting strategies (PCs attack the lowest DT, NPCs
+    pick a random living PC), which is what scenario files configure.
+
+    Args:
+        scenario_config (dict): Configuration dictionary defining teams and settings.
+        max_states (int): Upper bound on solved states before giving up.
+
+    Returns:
+        ExactSolution: Exact win probability, expected battle length and run-length distributions.
+
+    Raises:
+        SolverError: If the state space is too large to solve.
+    """
+    # Only the teams and the starting side affect the solution
+    cache_key = json.dumps(
+        [scenario_config.get("pcs", []), scenario_config.get("npcs", []), scenario_config.get("starting_momentum", "pcs")],
+        sort_keys=True
+    )
+    return _solve(cache_key, max_states)
@@ -1,24 +1,29 @@
-import statistics
-from typing import List, Dict, Tuple
-from collections import Counter
+from typing import List, Dict, Iterable, Union
 
-def get_histogram_lines(name: str, data: List[int], max_bar_width: int = 40) -> List[str]:
+from streaming_stats import MomentumRegression, RunLengthHistogram
+
+RunLengths = Union[Iterable[int], RunLengthHistogram]
+BattleSummaries = Union[Iterable[Dict], MomentumRegression]
+
+def get_histogram_lines(name: str, data: RunLengths, max_bar_width: int = 40) -> List[str]:
     """Generates a text-based histogram distribution for run lengths.
 
     Args:
         name: Label for the data (e.g., 'PC').
-        data: List of run lengths.
+        data: Run lengths, as a list or a RunLengthHistogram.
         max_bar_width: Maximum character width for the histogram bars.
 
     Returns:
         A list of formatted strings representing the histogram.
     """
     lines = []
+    if not isinstance(data, RunLengthHistogram):
+        data = RunLengthHistogram(data)
     if not data:
         return lines
     
-    counts = Counter(data)
-    max_val = max(counts.keys())
+    counts = data.counts
+    max_val = data.max
     max_count = max(counts.values())
     
     lines.append(f"\n--- {name} Run Length Histogram ---")
@@ -32,11 +37,40 @@ def get_histogram_lines(name: str, data: List[int], max_bar_width: int = 40) ->
     
     return lines
 
-def get_regression_lines(battle_data: List[Dict]) -> List[str]:
+def get_distribution_lines(name: str, distribution: Dict[int, float], max_bar_width: int = 40) -> List[str]:
+    """Generates a text-based histogram for an exact run-length distribution.
+
+    Args:
+        name: Label for the data (e.g., 'PC').
+        distribution: Probability of each run length.
+        max_bar_width: Maximum character width for the histogram bars.
+
+    Returns:
+        A list of formatted strings representing the distribution.
+    """
+    lines = []
+    if not distribution:
+        return lines
+
+    max_val = max(distribution.keys())
+    max_prob = max(distribution.values())
+
+    lines.append(f"\n--- {name} Run Length Distribution (Exact) ---")
+
+    for length in range(1, max_val + 1):
+        prob = distribution.get(length, 0.0)
+        bar_length = int((prob / max_prob) * max_bar_width) if max_prob > 0 else 0
+        bar = "█" * bar_length
+        lines.append(f"{length:2d}: {bar:<{max_bar_width}} ({prob * 100:8.4f}%)")
+
+    return lines
+
+def get_regression_lines(battle_data: BattleSummaries) -> List[str]:
     """Performs regression analysis to determine momentum impact on victory.
 
     Args:
-        battle_data: List of dictionaries containing battle summary data.
+        battle_data: Per-battle summary dicts, or a MomentumRegression that
+            accumulated them.
 
     Returns:
         A list of formatted strings describing the regression analysis.
@@ -44,61 +78,24 @@ def get_regression_lines(battle_data: List[Dict]) -> List[str]:
     lines = []
     lines.append("\n=== Regression Analysis: Run Length vs Win ===")
     
+    if not isinstance(battle_data, MomentumRegression):
+        battle_data = MomentumRegression(battle_data)
+
     if len(battle_data) < 10:
         lines.append("Insufficient data for regression (need at least 10 battles)")
         return lines
     
-    # Extract data
-    pc_wins = [1 if b['winner'] == 'pcs' else 0 for b in battle_data]
-    pc_mean_runs = [b['pc_mean_run'] for b in battle_data]
-    npc_mean_runs = [b['npc_mean_run'] for b in battle_data]
-    
-    # Simple correlation calculation (Pearson)
-    def pearson_correlation(x: List[float], y: List[float]) -> float:
-        n = len(x)
-        if n == 0:
-            return 0.0
-        mean_x = sum(x) / n
-        mean_y = sum(y) / n
-        
-        numerator = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y))
-        denom_x = sum((xi - mean_x) ** 2 for xi in x) ** 0.5
-        denom_y = sum((yi - mean_y) ** 2 for yi in y) ** 0.5
-        
-        if denom_x == 0 or denom_y == 0:
-            return 0.0
-        return numerator / (denom_x * denom_y)
-    
-    # Simple linear regression (slope and intercept)
-    def linear_regression(x: List[float], y: List[float]) -> Tuple[float, float]:
-        n = len(x)
-        if n == 0:
-            return 0.0, 0.0
-        mean_x = sum(x) / n
-        mean_y = sum(y) / n
-        
-        numerator = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y))
-        denominator = sum((xi - mean_x) ** 2 for xi in x)
-        
-        if denominator == 0:
-            return 0.0, mean_y
-        
-        slope = numerator / denominator
-        intercept = mean_y - slope * mean_x
-        return slope, intercept
-    
     # Correlation: PC mean run vs PC win
-    corr_pc = pearson_correlation(pc_mean_runs, pc_wins)
-    slope_pc, intercept_pc = linear_regression(pc_mean_runs, pc_wins)
+    corr_pc = battle_data.pc.pearson()
+    slope_pc, intercept_pc = battle_data.pc.linear_fit()
     
     # Correlation: NPC mean run vs PC win (should be negative)
-    corr_npc = pearson_correlation(npc_mean_runs, pc_wins)
-    slope_npc, intercept_npc = linear_regression(npc_mean_runs, pc_wins)
+    corr_npc = battle_data.npc.pearson()
+    slope_npc, intercept_npc = battle_data.npc.linear_fit()
     
     # Correlation: Run length difference vs PC win
-    run_diff = [p - n for p, n in zip(pc_mean_runs, npc_mean_runs)]
-    corr_diff = pearson_correlation(run_diff, pc_wins)
-    slope_diff, intercept_diff = linear_regression(run_diff, pc_wins)
+    corr_diff = battle_data.diff.pearson()
+    slope_diff, intercept_diff = battle_data.diff.linear_fit()
     
     lines.append("\nPC Mean Run Length vs PC Win:")
     lines.append(f"  Correlation (r): {corr_pc:+.4f}")
@@ -128,38 +125,30 @@ def get_regression_lines(battle_data: List[Dict]) -> List[str]:
     
     return lines
 
-def get_stats_lines(name: str, data: List[int]) -> List[str]:
+def get_stats_lines(name: str, data: RunLengths) -> List[str]:
     """Calculates summary statistics and gathers histogram lines.
 
     Args:
         name: Label for the data (e.g., 'PC').
-        data: List of run lengths.
+        data: Run lengths, as a list or a RunLengthHistogram.
 
     Returns:
         A list of formatted strings representing the full stats report for the side.
     """
     lines = []
+    if not isinstance(data, RunLengthHistogram):
+        data = RunLengthHistogram(data)
     if not data:
         lines.append(f"{name}: No data collected.")
         return lines
         
-    _min = min(data)
-    _max = max(data)
-    _mean = statistics.mean(data)
-    _median = statistics.median(data)
-    
-    # Calculate IQR
-    try:
-        qs = statistics.quantiles(data, n=4)
-        q1 = qs[0]
-        q3 = qs[2]
-    except AttributeError:
-        # Fallback
-        sorted_data = sorted(data)
-        n = len(sorted_data)
-        q1 = sorted_data[int(n * 0.25)]
-        q3 = sorted_data[int(n * 0.75)]
-        
+    _min = data.min
+    _max = data.max
+    _mean = data.mean
+    _median = data.median()
+    
+    # Calculate IQR (exact, from the counts)
+    q1, _, q3 = data.quantiles(n=4)
     _iqr = q3 - q1
     
     lines.append(f"\n--- {name} Run Length Stats ---")
@@ -1,42 +1,222 @@
+"""Targeting strategies.
+
+A strategy picks the enemy an actor attacks. The built-in strategies are
+``TargetingStrategy`` objects. Called like a function, ``strategy(actor,
+enemy_team, rng=rng)``, they scan the combatant list. The engines instead
+``bind`` each strategy to the enemy team once per battle, which builds a
+``TargetIndex`` over the team columns. The index answers every pick in O(1)
+or O(log n) and is told about each death through ``on_death``.
+
+Any plain function ``strategy(actor, enemy_team)`` still works as a
+strategy; the engines call it through ``select_target`` with the combatant
+views, at O(team size) per attack. A function that also accepts an ``rng``
+keyword is passed the battle's random stream, so its picks are reproducible.
+"""
+import functools
+import inspect
 import random
-from typing import List, Optional
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
 from mechanics import Combatant
+from team_state import TeamState
+
+class TargetIndex(ABC):
+    """Per-battle state of one strategy against one enemy team."""
+    @abstractmethod
+    def choose(self, rng: Optional[random.Random] = None) -> Optional[int]:
+        """Returns the ID of the next target, or None if no enemy is alive."""
+        raise NotImplementedError
+
+    def on_death(self, index: int):
+        """Records that enemy ``index`` just died."""
 
-def random_strategy(actor: Combatant, enemy_team: List[Combatant]) -> Optional[Combatant]:
+class LivingIndex(TargetIndex):
     """
-    Randomly selects a target from the living enemies.
-    
-    Args:
-        actor (Any): The entity acting.
-        enemy_team (List[Any]): List of enemy entities.
-        
-    Returns:
-        Optional[Any]: The selected target, or None.
+    Uniform pick among the living enemies, in O(log n).
+
+    A Fenwick tree over the living flags finds the k-th living member in team
+    order, so ``choose`` draws exactly like ``rng.choice`` over the list of
+    living members.
+
+    Attributes:
+        alive (int): Number of living enemies.
+    """
+    __slots__ = ('alive', '_tree', '_top_bit')
+
+    def __init__(self, enemies: TeamState):
+        """Builds the tree from the enemies' current HP in O(n).
+
+        Args:
+            enemies: The team being targeted.
+        """
+        hp = enemies.hp
+        size = len(hp)
+        tree = array('i', [0] * (size + 1))
+        for i in range(1, size + 1):
+            tree[i] = 1 if hp[i - 1] > 0 else 0
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._top_bit = 1 << (size.bit_length() - 1) if size else 0
+        self.alive = sum(1 for h in hp if h > 0)
+
+    def kth_living(self, k: int) -> int:
+        """The ``k``-th (0-based) living member in team order."""
+        tree, position, step = self._tree, 0, self._top_bit
+        while step:
+            probe = position + step
+            if probe < len(tree) and tree[probe] <= k:
+                position = probe
+                k -= tree[probe]
+            step >>= 1
+        return position
+
+    def choose(self, rng: Optional[random.Random] = None) -> Optional[int]:
+        if not self.alive:
+            return None
+        # choice() over a range draws exactly like choice() over the list of living members
+        return self.kth_living((rng or random).choice(range(self.alive)))
+
+    def on_death(self, index: int):
+        self.alive -= 1
+        tree, position = self._tree, index + 1
+        while position < len(tree):
+            tree[position] -= 1
+            position += position & -position
+
+class LowestDtIndex(TargetIndex):
+    """Living enemy with the lowest DT (team order on ties), in amortized O(1).
+
+    A pointer walks the team's DT order; members never come back to life, so it
+    only moves forward.
     """
-    living_enemies = [e for e in enemy_team if e.is_alive()]
-    if not living_enemies:
-        return None
-    return random.choice(living_enemies)
+    __slots__ = ('_order', '_hp', '_pos')
+
+    def __init__(self, enemies: TeamState):
+        """Starts the pointer at the lowest DT.
+
+        Args:
+            enemies: The team being targeted (its HP column is read live).
+        """
+        self._order = enemies.dt_order
+        self._hp = enemies.hp
+        self._pos = 0
+
+    def choose(self, rng: Optional[random.Random] = None) -> Optional[int]:
+        order, hp, pos = self._order, self._hp, self._pos
+        while pos < len(order) and hp[order[pos]] <= 0:
+            pos += 1
+        self._pos = pos
+        return order[pos] if pos < len(order) else None
 
-def lowest_dt_strategy(actor: Combatant, enemy_team: List[Combatant]) -> Optional[Combatant]:
+class TargetingStrategy(ABC):
     """
-    Selects the enemy with the lowest Difficulty Threshold (DT).
-    
+    Base class of the indexed strategies.
+
+    Subclasses implement ``bind`` for the engines and ``__call__`` for the
+    function-style interface.
+    """
+    @abstractmethod
+    def bind(self, enemies: TeamState) -> TargetIndex:
+        """Builds this strategy's index over an enemy team at the start of a battle."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __call__(self, actor: Combatant, enemy_team: List[Combatant],
+                 rng: Optional[random.Random] = None) -> Optional[Combatant]:
+        raise NotImplementedError
+
+class RandomStrategy(TargetingStrategy):
+    """Attacks a uniformly random living enemy."""
+    def bind(self, enemies: TeamState) -> TargetIndex:
+        return LivingIndex(enemies)
+
+    def __call__(self, actor: Combatant, enemy_team: List[Combatant],
+                 rng: Optional[random.Random] = None) -> Optional[Combatant]:
+        """
+        Randomly selects a target from the living enemies.
+
+        Args:
+            actor (Any): The entity acting.
+            enemy_team (List[Any]): List of enemy entities.
+            rng (random.Random, optional): Random stream to draw from (global stream if None).
+
+        Returns:
+            Optional[Any]: The selected target, or None.
+        """
+        living_enemies = [e for e in enemy_team if e.is_alive()]
+        if not living_enemies:
+            return None
+        return (rng or random).choice(living_enemies)
+
+class LowestDtStrategy(TargetingStrategy):
+    """Attacks the living enemy with the lowest DT; against enemies without a DT, a random one."""
+    def bind(self, enemies: TeamState) -> TargetIndex:
+        return LowestDtIndex(enemies) if enemies.has_dt else LivingIndex(enemies)
+
+    def __call__(self, actor: Combatant, enemy_team: List[Combatant],
+                 rng: Optional[random.Random] = None) -> Optional[Combatant]:
+        """
+        Selects the enemy with the lowest Difficulty Threshold (DT).
+
+        Args:
+            actor (Any): The entity acting.
+            enemy_team (List[Any]): List of enemy entities.
+            rng (random.Random, optional): Random stream for the fallback pick (global stream if None).
+
+        Returns:
+            Optional[Any]: The selected target, or None.
+        """
+        living_enemies = [e for e in enemy_team if e.is_alive()]
+        if not living_enemies:
+            return None
+
+        # Check if enemy has DT
+        candidates = [e for e in living_enemies if hasattr(e, 'dt')]
+        if not candidates:
+            # If no candidates have 'dt', fall back to random selection from all living enemies
+            return (rng or random).choice(living_enemies)
+
+        return min(candidates, key=lambda x: x.dt)
+
+@functools.lru_cache(maxsize=256)
+def takes_rng(strategy: Any) -> bool:
+    """True if a function-style strategy accepts the ``rng`` keyword (checked once per strategy)."""
+    try:
+        parameters = inspect.signature(strategy).parameters.values()
+    except (TypeError, ValueError):
+        # No introspectable signature (some builtins): assume the classic two-argument form
+        return False
+    return any(p.name == "rng" or p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+random_strategy = RandomStrategy()
+lowest_dt_strategy = LowestDtStrategy()
+
+def bind_strategies(strategies: Sequence[Any], enemies: TeamState) -> Tuple[List[Optional[TargetIndex]], List[TargetIndex]]:
+    """Binds a team's strategies to the enemy team at the start of a battle.
+
+    Members sharing a strategy object share its index.
+
     Args:
-        actor (Any): The entity acting.
-        enemy_team (List[Any]): List of enemy entities.
-        
+        strategies: Targeting strategy of each member.
+        enemies: The team they target.
+
     Returns:
-        Optional[Any]: The selected target, or None.
+        The index of each member (None for function-style strategies) and the
+        distinct indexes, which must all be told about every enemy death.
     """
-    living_enemies = [e for e in enemy_team if e.is_alive()]
-    if not living_enemies:
-        return None
-    
-    # Check if enemy has DT
-    candidates = [e for e in living_enemies if hasattr(e, 'dt')]
-    if not candidates:
-        # If no candidates have 'dt', fall back to random selection from all living enemies
-        return random.choice(living_enemies)
-        
-    return min(candidates, key=lambda x: x.dt)
+    bound: Dict[int, TargetIndex] = {}
+    per_member: List[Optional[TargetIndex]] = []
+    for strategy in strategies:
+        if isinstance(strategy, TargetingStrategy):
+            index = bound.get(id(strategy))
+            if index is None:
+                index = bound[id(strategy)] = strategy.bind(enemies)
+            per_member.append(index)
+        else:
+            per_member.append(None)
+    return per_member, list(bound.values())
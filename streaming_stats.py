@@ -0,0 +1,292 @@
+"""Streaming, constant-memory statistics accumulators.
+
+These replace the per-run and per-battle lists that the reports used to keep:
+
+- ``RunLengthHistogram`` counts run lengths by value. Because run lengths are
+  small integers, the counts give exact order statistics (median, quartiles)
+  in O(max run length) memory.
+- ``Welford`` keeps a running mean and variance.
+- ``MomentumRegression`` keeps running co-moments of the per-battle mean run
+  lengths against the PC win indicator, enough for the Pearson correlations
+  and least-squares fits of the regression report.
+
+Every accumulator can be merged with another of its kind, so chunks of
+battles can be summarized independently and combined.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+class _Accumulator:
+    """Base class giving accumulators value equality and a JSON-friendly state over their slots."""
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serializable state (JSON types only) from which ``from_state`` rebuilds an equal accumulator."""
+        state = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, _Accumulator):
+                value = value.to_state()
+            elif isinstance(value, dict):
+                value = sorted(value.items())
+            state[name] = value
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "_Accumulator":
+        """Rebuilds an accumulator from ``to_state`` output."""
+        accumulator = cls()
+        for name in cls.__slots__:
+            default = getattr(accumulator, name)
+            value = state[name]
+            if isinstance(default, _Accumulator):
+                value = type(default).from_state(value)
+            elif isinstance(default, dict):
+                value = {k: v for k, v in value}
+            setattr(accumulator, name, value)
+        return accumulator
+
+class RunLengthHistogram(_Accumulator):
+    """
+    Integer-keyed counts of run lengths.
+
+    Attributes:
+        counts (Dict[int, int]): Number of runs of each length.
+        count (int): Total number of runs.
+        total (int): Sum of all run lengths.
+    """
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self, data: Optional[Iterable[int]] = None):
+        """Creates a histogram, optionally filled from existing run lengths.
+
+        Args:
+            data: Run lengths to add.
+        """
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        if data is not None:
+            self.extend(data)
+
+    def add(self, length: int, times: int = 1):
+        """Counts ``times`` runs of ``length``."""
+        self.counts[length] = self.counts.get(length, 0) + times
+        self.count += times
+        self.total += length * times
+
+    def extend(self, lengths: Iterable[int]):
+        """Counts every run length of an iterable (e.g. one battle's runs)."""
+        counts = self.counts
+        for length in lengths:
+            counts[length] = counts.get(length, 0) + 1
+            self.count += 1
+            self.total += length
+
+    def merge(self, other: "RunLengthHistogram"):
+        """Adds the counts of another histogram to this one."""
+        for length, times in other.counts.items():
+            self.add(length, times)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    @property
+    def min(self) -> int:
+        return min(self.counts)
+
+    @property
+    def max(self) -> int:
+        return max(self.counts)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+
+    def _sorted(self) -> Iterator[Tuple[int, int]]:
+        return iter(sorted(self.counts.items()))
+
+    def order_statistic(self, k: int) -> int:
+        """The ``k``-th smallest run length (0-based), as ``sorted(data)[k]``."""
+        seen = 0
+        for length, times in self._sorted():
+            seen += times
+            if k < seen:
+                return length
+        raise IndexError("order statistic out of range")
+
+    def median(self) -> float:
+        """Median with the same convention as ``statistics.median``."""
+        n = self.count
+        if n % 2 == 1:
+            return self.order_statistic(n // 2)
+        return (self.order_statistic(n // 2 - 1) + self.order_statistic(n // 2)) / 2
+
+    def quantiles(self, n: int = 4) -> List[float]:
+        """Cut points with the same results as ``statistics.quantiles(data, n=n)`` (exclusive method).
+
+        A single run yields that run length for every cut point.
+        """
+        ld = self.count
+        if ld == 1:
+            return [float(self.order_statistic(0))] * (n - 1)
+        m = ld + 1
+        result = []
+        for i in range(1, n):
+            j = i * m // n
+            j = 1 if j < 1 else ld - 1 if j > ld - 1 else j
+            delta = i * m - j * n
+            result.append((self.order_statistic(j - 1) * (n - delta) + self.order_statistic(j) * delta) / n)
+        return result
+
+class Welford(_Accumulator):
+    """
+    Running mean and variance (Welford's algorithm).
+
+    Attributes:
+        n (int): Number of values seen.
+        mean (float): Running mean.
+        m2 (float): Sum of squared deviations from the mean.
+    """
+    __slots__ = ('n', 'mean', 'm2')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x: float):
+        """Adds one value."""
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other: "Welford"):
+        """Combines another accumulator into this one (Chan et al.)."""
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 for fewer than two values)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+class Covariance(_Accumulator):
+    """
+    Running co-moments of a pair of variables, for Pearson r and a linear fit.
+
+    Attributes:
+        x (Welford): Running moments of the predictor.
+        y (Welford): Running moments of the response.
+        c (float): Sum of cross deviations ``(x - mean_x) * (y - mean_y)``.
+    """
+    __slots__ = ('x', 'y', 'c')
+
+    def __init__(self):
+        self.x = Welford()
+        self.y = Welford()
+        self.c = 0.0
+
+    def add(self, x: float, y: float):
+        """Adds one (x, y) observation."""
+        dx = x - self.x.mean
+        self.x.add(x)
+        self.y.add(y)
+        self.c += dx * (y - self.y.mean)
+
+    def merge(self, other: "Covariance"):
+        """Combines another accumulator into this one."""
+        n_a, n_b = self.x.n, other.x.n
+        if n_b == 0:
+            return
+        dx = other.x.mean - self.x.mean
+        dy = other.y.mean - self.y.mean
+        self.c += other.c + dx * dy * n_a * n_b / (n_a + n_b)
+        self.x.merge(other.x)
+        self.y.merge(other.y)
+
+    def pearson(self) -> float:
+        """Pearson correlation (0 if either variable is constant or there is no data)."""
+        denom = (self.x.m2 * self.y.m2) ** 0.5
+        if self.x.n == 0 or self.x.m2 == 0 or self.y.m2 == 0:
+            return 0.0
+        return self.c / denom
+
+    def linear_fit(self) -> Tuple[float, float]:
+        """Least-squares ``(slope, intercept)`` of y on x; ``(0, mean_y)`` if x is constant."""
+        if self.x.n == 0:
+            return 0.0, 0.0
+        if self.x.m2 == 0:
+            return 0.0, self.y.mean
+        slope = self.c / self.x.m2
+        return slope, self.y.mean - slope * self.x.mean
+
+class MomentumRegression(_Accumulator):
+    """
+    Per-battle momentum statistics for the regression report.
+
+    Tracks the PC win indicator against the PC mean run length, the NPC mean
+    run length and their difference.
+
+    Attributes:
+        battles (int): Number of battles added.
+        pc_wins (int): Number of PC wins.
+        pc (Covariance): PC mean run vs PC win.
+        npc (Covariance): NPC mean run vs PC win.
+        diff (Covariance): (PC - NPC) mean run vs PC win.
+    """
+    __slots__ = ('battles', 'pc_wins', 'pc', 'npc', 'diff')
+
+    def __init__(self, battle_data: Optional[Iterable[Dict]] = None):
+        """Creates an accumulator, optionally filled from per-battle summary dicts.
+
+        Args:
+            battle_data: Dicts with 'winner', 'pc_mean_run' and 'npc_mean_run'.
+        """
+        self.battles = 0
+        self.pc_wins = 0
+        self.pc = Covariance()
+        self.npc = Covariance()
+        self.diff = Covariance()
+        if battle_data is not None:
+            for b in battle_data:
+                self.add(b['winner'], b['pc_mean_run'], b['npc_mean_run'])
+
+    def add(self, winner: str, pc_mean_run: float, npc_mean_run: float):
+        """Adds one battle."""
+        pc_win = 1 if winner == 'pcs' else 0
+        self.battles += 1
+        self.pc_wins += pc_win
+        self.pc.add(pc_mean_run, pc_win)
+        self.npc.add(npc_mean_run, pc_win)
+        self.diff.add(pc_mean_run - npc_mean_run, pc_win)
+
+    def add_runs(self, winner: str, pcs_runs: List[int], npcs_runs: List[int]):
+        """Adds one battle from its run lengths (mean run is 0 for a side without runs)."""
+        self.add(winner,
+                 sum(pcs_runs) / len(pcs_runs) if pcs_runs else 0,
+                 sum(npcs_runs) / len(npcs_runs) if npcs_runs else 0)
+
+    def merge(self, other: "MomentumRegression"):
+        """Combines another accumulator into this one."""
+        self.battles += other.battles
+        self.pc_wins += other.pc_wins
+        self.pc.merge(other.pc)
+        self.npc.merge(other.npc)
+        self.diff.merge(other.diff)
+
+    def __len__(self) -> int:
+        return self.battles
@@ -0,0 +1,151 @@
+"""Lazy parameter sweeps over scenario axes.
+
+A ``Sweep`` describes a grid of scenarios by its axes (difficulty offsets,
+team sizes, HP, expertise flags, starting momentum) and yields one scenario
+config per grid cell on demand, so a sweep of 10^5 cells can be fed straight
+into ``bulk_run`` without being written to (and parsed back from) JSON.
+
+Scenario IDs follow the benchmark naming convention ``{pcs}v{npcs}_off{offset}``;
+every other axis adds a suffix only when it has more than one value, so a
+sweep over the default axes names its cells exactly like ``benchmarks.json``.
+"""
+import itertools
+import json
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from constants import DEFAULT_APTITUDE
+from exceptions import ConfigurationError
+
+# Expertise axis values -> (expertise_attack, expertise_defense)
+EXPERTISE = {
+    "none": (False, False),
+    "attack": (True, False),
+    "defense": (False, True),
+    "both": (True, True),
+}
+
+class Sweep:
+    """
+    A lazily enumerated grid of scenarios.
+
+    Attributes:
+        offsets (Sequence[int]): NPC DT minus PC aptitude.
+        pc_sizes (Sequence[int]): PC team sizes.
+        npc_sizes (Sequence[int]): NPC team sizes.
+        pc_hp (Sequence[int]): PC HP values.
+        npc_hp (Optional[Sequence[int]]): NPC HP values; None uses 1 HP mooks in
+            groups and a 10 HP solo NPC, as in the benchmark grid.
+        pc_expertise (Sequence[str]): PC expertise flags, keys of ``EXPERTISE``.
+        npc_expertise (Sequence[str]): NPC expertise flags, keys of ``EXPERTISE``.
+        starting_momentum (Sequence[str]): "pcs" and/or "npcs".
+        aptitude (int): PC aptitude; NPC DT is aptitude + offset.
+    """
+    def __init__(self, offsets: Sequence[int], pc_sizes: Sequence[int], npc_sizes: Sequence[int],
+                 pc_hp: Sequence[int] = (4,), npc_hp: Optional[Sequence[int]] = None,
+                 pc_expertise: Sequence[str] = ("none",), npc_expertise: Sequence[str] = ("none",),
+                 starting_momentum: Sequence[str] = ("pcs",), aptitude: int = DEFAULT_APTITUDE):
+        """Defines a sweep.
+
+        Raises:
+            ConfigurationError: If an axis is empty or holds an unknown value.
+        """
+        self.offsets = list(offsets)
+        self.pc_sizes = list(pc_sizes)
+        self.npc_sizes = list(npc_sizes)
+        self.pc_hp = list(pc_hp)
+        self.npc_hp = list(npc_hp) if npc_hp is not None else None
+        self.pc_expertise = list(pc_expertise)
+        self.npc_expertise = list(npc_expertise)
+        self.starting_momentum = list(starting_momentum)
+        self.aptitude = aptitude
+
+        for name, values in self._axes().items():
+            if not values:
+                raise ConfigurationError(f"Sweep axis '{name}' has no values.")
+        for flag in self.pc_expertise + self.npc_expertise:
+            if flag not in EXPERTISE:
+                raise ConfigurationError(f"Unknown expertise '{flag}' (expected one of {', '.join(EXPERTISE)}).")
+        for side in self.starting_momentum:
+            if side not in ("pcs", "npcs"):
+                raise ConfigurationError(f"Starting momentum must be 'pcs' or 'npcs', got '{side}'.")
+        if min(self.pc_sizes) < 1 or min(self.npc_sizes) < 1:
+            raise ConfigurationError("Team sizes must be at least 1.")
+
+    def _axes(self) -> Dict[str, list]:
+        """Axes in enumeration order (the last one varies fastest)."""
+        return {
+            "pc_sizes": self.pc_sizes,
+            "npc_sizes": self.npc_sizes,
+            "offsets": self.offsets,
+            "pc_hp": self.pc_hp,
+            "npc_hp": self.npc_hp if self.npc_hp is not None else [None],
+            "pc_expertise": self.pc_expertise,
+            "npc_expertise": self.npc_expertise,
+            "starting_momentum": self.starting_momentum,
+        }
+
+    def __len__(self) -> int:
+        size = 1
+        for values in self._axes().values():
+            size *= len(values)
+        return size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yields one scenario config per grid cell, building each only when requested."""
+        for cell in itertools.product(*self._axes().values()):
+            yield self.scenario(*cell)
+
+    def scenario(self, pc_count: int, npc_count: int, offset: int, pc_hp: int, npc_hp: Optional[int],
+                 pc_expertise: str, npc_expertise: str, starting_momentum: str) -> Dict[str, Any]:
+        """Builds the scenario config of one grid cell."""
+        apt = self.aptitude
+        dt = apt + offset
+        if npc_hp is None:
+            npc_hp = 1 if npc_count > 1 else 10
+
+        sid = f"{pc_count}v{npc_count}_off{offset}"
+        if len(self.pc_hp) > 1:
+            sid += f"_pchp{pc_hp}"
+        if self.npc_hp is not None and len(self.npc_hp) > 1:
+            sid += f"_npchp{npc_hp}"
+        if len(self.pc_expertise) > 1:
+            sid += f"_pcx{pc_expertise}"
+        if len(self.npc_expertise) > 1:
+            sid += f"_npcx{npc_expertise}"
+        if len(self.starting_momentum) > 1:
+            sid += f"_{starting_momentum}first"
+
+        pc_atk, pc_def = EXPERTISE[pc_expertise]
+        npc_atk, npc_def = EXPERTISE[npc_expertise]
+        pcs = [{"name": f"PC {i+1}", "hp": pc_hp, "aptitude": apt} for i in range(pc_count)]
+        npcs = [{"name": f"NPC {i+1}", "hp": npc_hp, "dt": dt} for i in range(npc_count)]
+        for members, atk, dfn in ((pcs, pc_atk, pc_def), (npcs, npc_atk, npc_def)):
+            for member in members:
+                if atk:
+                    member["expertise_attack"] = True
+                if dfn:
+                    member["expertise_defense"] = True
+
+        return {
+            "id": sid,
+            "description": (f"Grid Analysis: {pc_count} PC(s) (Apt {apt}) vs {npc_count} NPC(s) (DT {dt}). "
+                            f"Offset: +{offset}"),
+            "starting_momentum": starting_momentum,
+            "pcs": pcs,
+            "npcs": npcs,
+        }
+
+    def write_json(self, path: str) -> int:
+        """Materializes the sweep as a scenario file, one scenario at a time; returns the count.
+
+        The file is byte-identical to ``json.dump({"scenarios": list(sweep)}, f, indent=4)``.
+        """
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{\n    "scenarios": [')
+            for config in self:
+                f.write(",\n        " if count else "\n        ")
+                f.write(json.dumps(config, indent=4).replace("\n", "\n        "))
+                count += 1
+            f.write("\n    ]\n}" if count else "]\n}")
+        return count
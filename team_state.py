@@ -0,0 +1,227 @@
+"""Struct-of-arrays storage for a team of combatants.
+
+Each attribute is a compact column (``array`` or list) indexed by the member's
+integer ID, so the battle loop can work on indices instead of attribute
+lookups. ``PC`` and ``NPC`` objects are thin views onto one row.
+"""
+from array import array
+from typing import Any, Callable, List, Tuple
+
+class TeamState:
+    """
+    Column storage for one team.
+
+    Attributes:
+        names (List[str]): Display names.
+        hp (array): Current Hit Points.
+        max_hp (array): Maximum Hit Points.
+        aptitude (array): Base bonus added to rolls.
+        dt (array): Difficulty Threshold (0 for PCs, which have none).
+        exp_atk (array): 1 if the member has attack expertise.
+        exp_def (array): 1 if the member has defense expertise.
+        strategies (List[callable]): Targeting strategy of each member.
+        has_dt (bool): True for teams whose members expose a DT (NPCs).
+        actor_order (Tuple[int, ...]): Actor priority used by ``select_actor``:
+            attack experts first, then everyone else, both in team order.
+        dt_order (Tuple[int, ...]): Member IDs by ascending DT, team order on ties.
+        revision (int): Bumped by ``invalidate`` whenever a member is added or a
+            roll input (aptitude, DT, expertise) changes, so anything derived
+            from those columns knows to rebuild.
+    """
+    __slots__ = ('names', 'hp', 'max_hp', 'aptitude', 'dt', 'exp_atk', 'exp_def', 'strategies',
+                 'has_dt', 'revision', '_actor_order', '_dt_order')
+
+    def __init__(self, has_dt: bool = False):
+        """Creates an empty team.
+
+        Args:
+            has_dt: True if members expose a DT (NPC teams).
+        """
+        self.names: List[str] = []
+        self.hp = array('i')
+        self.max_hp = array('i')
+        self.aptitude = array('i')
+        self.dt = array('i')
+        self.exp_atk = array('b')
+        self.exp_def = array('b')
+        self.strategies: List[Callable] = []
+        self.has_dt = has_dt
+        self.revision = 0
+        self._actor_order = None
+        self._dt_order = None
+
+    def append(self, name: str, hp: int, aptitude: int, dt: int, expertise_attack: bool,
+               expertise_defense: bool, targeting_strategy: Any) -> int:
+        """Adds a member row and returns its integer ID."""
+        self.names.append(name)
+        self.hp.append(hp)
+        self.max_hp.append(hp)
+        self.aptitude.append(aptitude)
+        self.dt.append(dt)
+        self.exp_atk.append(1 if expertise_attack else 0)
+        self.exp_def.append(1 if expertise_defense else 0)
+        self.strategies.append(targeting_strategy)
+        self.invalidate()
+        return len(self.names) - 1
+
+    def invalidate(self):
+        """Drops the cached orders and bumps ``revision`` after the roll inputs changed."""
+        self._actor_order = None
+        self._dt_order = None
+        self.revision += 1
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def actor_order(self) -> Tuple[int, ...]:
+        if self._actor_order is None:
+            experts = [i for i in range(len(self)) if self.exp_atk[i]]
+            others = [i for i in range(len(self)) if not self.exp_atk[i]]
+            self._actor_order = tuple(experts + others)
+        return self._actor_order
+
+    @property
+    def dt_order(self) -> Tuple[int, ...]:
+        if self._dt_order is None:
+            self._dt_order = tuple(sorted(range(len(self)), key=self.dt.__getitem__))
+        return self._dt_order
+
+    def reset(self):
+        """Restores every member to full HP in place."""
+        self.hp[:] = self.max_hp
+
+    def any_alive(self) -> bool:
+        """True if at least one member has HP left."""
+        return any(self.hp)
+
+    def living_ids(self) -> List[int]:
+        """IDs of living members, in team order."""
+        hp = self.hp
+        return [i for i in range(len(hp)) if hp[i] > 0]
+
+    def take_damage(self, index: int, amount: int):
+        """Subtracts damage from a member, flooring HP at 0."""
+        hp = self.hp[index] - amount
+        self.hp[index] = hp if hp > 0 else 0
+
+# End-of-list marker of the ActorScheduler linked list
+_END = -1
+
+class ActorScheduler:
+    """
+    Per-battle actor queue and living count of one team.
+
+    Living members are kept in a linked list in ``actor_order``; the cursor
+    walks it as the "not yet acted in this run" queue. Within a run the next
+    actor is the member under the cursor, or the first living member once the
+    cursor has run off the end (everyone has acted). Deaths unlink the member
+    and decrement the living count, so the win check, actor selection and
+    removal are all O(1) however large the team.
+
+    Attributes:
+        team (TeamState): The team columns (HP is updated in place).
+        alive (int): Number of living members.
+        head (int): First living member in actor priority order, or -1.
+        cursor (int): Next member of the current run that has not acted yet, or -1
+            once every living member has acted.
+    """
+    __slots__ = ('team', 'alive', 'head', 'cursor', '_next', '_prev')
+
+    def __init__(self, team: TeamState):
+        """Creates the scheduler of a team (``reset`` runs before each battle).
+
+        Args:
+            team: The team whose members act.
+        """
+        self.team = team
+        self._next = array('i')
+        self._prev = array('i')
+        self.reset()
+
+    def reset(self):
+        """Starts a battle: relinks the living members in the team's current actor order."""
+        hp, size = self.team.hp, len(self.team)
+        if len(self._next) != size:
+            self._next = array('i', [_END] * size)
+            self._prev = array('i', [_END] * size)
+
+        living_order = [i for i in self.team.actor_order if hp[i] > 0]
+        previous = _END
+        for i in living_order:
+            self._prev[i] = previous
+            if previous != _END:
+                self._next[previous] = i
+            previous = i
+        if previous != _END:
+            self._next[previous] = _END
+        self.head = living_order[0] if living_order else _END
+        self.cursor = self.head
+        self.alive = len(living_order)
+
+    def any_alive(self) -> bool:
+        """True if at least one member has HP left."""
+        return self.alive > 0
+
+    def new_run(self):
+        """Starts a run: nobody on the team has acted yet."""
+        self.cursor = self.head
+
+    def next_actor(self) -> int:
+        """The next unacted living member, or the first living member once everyone has acted."""
+        return self.cursor if self.cursor != _END else self.head
+
+    def mark_acted(self, index: int) -> bool:
+        """Records that ``index`` acted and returns True if every living member has now acted."""
+        if index == self.cursor:
+            self.cursor = self._next[index]
+        return self.cursor == _END
+
+    def take_damage(self, index: int, amount: int) -> bool:
+        """Applies damage to a living member, unlinks it if it dies and returns True if it did."""
+        self.team.take_damage(index, amount)
+        if self.team.hp[index] <= 0:
+            self.remove(index)
+            return True
+        return False
+
+    def remove(self, index: int):
+        """Unlinks a member that just died from the actor list and the living count."""
+        self.alive -= 1
+        previous, following = self._prev[index], self._next[index]
+        if previous != _END:
+            self._next[previous] = following
+        else:
+            self.head = following
+        if following != _END:
+            self._prev[following] = previous
+        if self.cursor == index:
+            self.cursor = following
+
+def column_property(column: str, doc: str, invalidates: bool = False) -> property:
+    """A read/write property exposing one TeamState column for a view's row.
+
+    With ``invalidates``, writes call ``TeamState.invalidate`` so orders and
+    matchup tables derived from the column are rebuilt.
+    """
+    def fget(self):
+        return getattr(self._team, column)[self._index]
+
+    def fset(self, value):
+        getattr(self._team, column)[self._index] = value
+        if invalidates:
+            self._team.invalidate()
+
+    return property(fget, fset, doc=doc)
+
+def flag_property(column: str, doc: str, invalidates: bool = False) -> property:
+    """A read/write boolean property over a 0/1 TeamState column (see ``column_property``)."""
+    def fget(self):
+        return bool(getattr(self._team, column)[self._index])
+
+    def fset(self, value):
+        getattr(self._team, column)[self._index] = 1 if value else 0
+        if invalidates:
+            self._team.invalidate()
+
+    return property(fget, fset, doc=doc)
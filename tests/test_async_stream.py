@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from async_stream import simulate_stream
+from battle_engine import run_battle
+from exceptions import ConfigurationError
+from random_streams import battle_rng
+from streaming_stats import MomentumRegression
+
+DUEL = {
+    "id": "duel",
+    "description": "duel desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "Hero", "hp": 4, "aptitude": 5}],
+    "npcs": [{"name": "Foe", "hp": 4, "dt": 15}]
+}
+
+async def collect(stream, limit=None):
+    snapshots = []
+    async for snapshot in stream:
+        snapshots.append(snapshot)
+        if limit is not None and len(snapshots) == limit:
+            break
+    return snapshots
+
+def test_snapshots_accumulate_the_seeded_battles():
+    snapshots = asyncio.run(collect(simulate_stream(DUEL, 250, batch=100, seed=5, workers=2)))
+    assert [s.battles for s in snapshots] == [100, 200, 250]
+    assert [s.done for s in snapshots] == [False, False, True]
+
+    expected = MomentumRegression()
+    for i in range(250):
+        pcs_runs, npcs_runs, winner = run_battle(i + 1, DUEL, rng=battle_rng(5, i + 1))
+        expected.add_runs(winner, pcs_runs, npcs_runs)
+    final = snapshots[-1]
+    assert final.pc_wins == expected.pc_wins
+    assert final.regression.battles == expected.battles
+    assert final.regression.pc.pearson() == pytest.approx(expected.pc.pearson())
+    low, high = final.interval
+    assert low < final.win_rate < high
+    # Earlier snapshots are not changed by later batches
+    assert snapshots[0].regression.battles == 100
+    assert snapshots[0].pc_runs.count < final.pc_runs.count
+
+def test_deadline_and_cancellation_stop_the_stream():
+    snapshots = asyncio.run(collect(simulate_stream(DUEL, 10 ** 7, batch=200, seed=1, deadline=0.2)))
+    assert snapshots and not snapshots[-1].done
+
+    async def cancel_after_first():
+        first = asyncio.get_running_loop().create_future()
+
+        async def consume():
+            async for snapshot in simulate_stream(DUEL, 10 ** 7, batch=200, seed=1):
+                if not first.done():
+                    first.set_result(snapshot)
+
+        task = asyncio.ensure_future(consume())
+        await first
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_after_first())
+
+def test_invalid_config_fails_before_simulating():
+    with pytest.raises(ConfigurationError):
+        asyncio.run(collect(simulate_stream({"id": "broken"}, 10)))
@@ -0,0 +1,36 @@
+import pytest
+
+from balance import parse_parameter, solve_balance, with_parameter
+from exceptions import ConfigurationError, SolverError
+from solver import solve_scenario
+
+DUEL = {
+    "id": "duel",
+    "description": "duel desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "Hero", "hp": 4, "aptitude": 5}],
+    "npcs": [{"name": "Foe", "hp": 4, "dt": 12}, {"name": "Mook", "hp": 1, "dt": 10}]
+}
+
+def test_parameter_paths():
+    assert parse_parameter(DUEL, "npcs[1].dt") == ("npcs", [1], "dt")
+    assert parse_parameter(DUEL, "npcs[*].hp") == ("npcs", [0, 1], "hp")
+    updated = with_parameter(DUEL, "npcs[*].dt", 15)
+    assert [n["dt"] for n in updated["npcs"]] == [15, 15]
+    assert DUEL["npcs"][0]["dt"] == 12
+    for bad in ("npcs[2].dt", "pcs[0].dt", "npcs[0].name", "foes[0].dt"):
+        with pytest.raises(ConfigurationError):
+            parse_parameter(DUEL, bad)
+
+def test_finds_value_closest_to_target():
+    result = solve_balance(DUEL, "npcs[0].dt", 0.6, low=5, high=25, seed=11, max_runs=3000)
+    exact = {v: solve_scenario(with_parameter(DUEL, "npcs[0].dt", v)).pc_win_probability
+             for v in (result.value - 1, result.value, result.value + 1)}
+    assert min(exact, key=lambda v: abs(exact[v] - 0.6)) == result.value
+    low, high = result.interval
+    assert low <= exact[result.value] <= high
+    assert result.runs == sum(runs for _, runs in result.evaluations.values())
+
+def test_unbracketed_target():
+    with pytest.raises(SolverError):
+        solve_balance(DUEL, "pcs[0].hp", 0.01, low=3, high=10, seed=1)
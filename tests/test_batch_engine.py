@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch_engine import run_battles_batch
+from battle_engine import run_battle
+from random_streams import battle_rng
+from scenario import compile_scenario
+
+SCENARIO = {
+    "id": "batch",
+    "description": "batch desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "PC1", "hp": 4, "exp_atk": True}, {"name": "PC2", "hp": 3}],
+    "npcs": [{"name": "NPC1", "hp": 2, "dt": 14, "exp_def": True}, {"name": "NPC2", "hp": 2, "dt": 12}]
+}
+
+def test_batch_result_shape():
+    results = run_battles_batch(SCENARIO, 200, rng=1)
+    assert len(results) == 200
+    for pcs_runs, npcs_runs, winner in results:
+        assert winner in ("pcs", "npcs")
+        assert all(r >= 1 for r in pcs_runs + npcs_runs)
+        # PCs start with momentum, so they always have the first run
+        assert pcs_runs
+
+def test_batch_is_reproducible():
+    assert run_battles_batch(SCENARIO, 50, rng=7) == run_battles_batch(SCENARIO, 50, rng=7)
+
+def test_batch_guaranteed_first_hit():
+    # DT 0 is always beaten by 3+, so the lone PC wins on the first turn
+    config = dict(SCENARIO, pcs=[{"name": "PC1"}], npcs=[{"name": "Mook", "hp": 1, "dt": 0}])
+    for pcs_runs, npcs_runs, winner in run_battles_batch(config, 100, rng=3):
+        assert (pcs_runs, npcs_runs, winner) == ([1], [], "pcs")
+
+def test_batch_final_hp():
+    results, final_hp = run_battles_batch(SCENARIO, 100, rng=5, return_hp=True)
+    assert results == run_battles_batch(SCENARIO, 100, rng=5)
+    assert final_hp.shape == (100, 4)
+    for (_, _, winner), hp in zip(results, final_hp):
+        assert (hp[:2] > 0).any() == (winner == "pcs")
+        assert (hp[2:] > 0).any() == (winner == "npcs")
+
+def _win_rate_and_turns(results):
+    wins = [1.0 if winner == "pcs" else 0.0 for _, _, winner in results]
+    turns = [float(sum(p) + sum(n)) for p, n, _ in results]
+    return wins, turns
+
+def _mean_and_se(values):
+    n = len(values)
+    mean = sum(values) / n
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return mean, math.sqrt(variance / n)
+
+# Close to even, so the win-rate comparison is sensitive
+CONTESTED = {
+    "id": "contested",
+    "description": "contested desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "PC1", "hp": 3, "aptitude": 5, "exp_atk": True}, {"name": "PC2", "hp": 2, "aptitude": 4}],
+    "npcs": [{"name": "NPC1", "hp": 3, "dt": 16, "exp_def": True}, {"name": "NPC2", "hp": 2, "dt": 15, "exp_atk": True}]
+}
+
+@pytest.mark.parametrize("momentum", ["pcs", "npcs"])
+def test_batch_agrees_with_scalar_engine(momentum):
+    config = dict(CONTESTED, starting_momentum=momentum)
+    battles = 4000
+    scenario = compile_scenario(config)
+    scalar = [run_battle(i + 1, scenario, rng=battle_rng(11, i + 1)) for i in range(battles)]
+    batch = run_battles_batch(config, battles, rng=11)
+    for scalar_values, batch_values in zip(_win_rate_and_turns(scalar), _win_rate_and_turns(batch)):
+        scalar_mean, scalar_se = _mean_and_se(scalar_values)
+        batch_mean, batch_se = _mean_and_se(batch_values)
+        # Independent samples of the same distribution: the difference is within 4 standard errors
+        assert abs(batch_mean - scalar_mean) < 4 * math.hypot(scalar_se, batch_se)
+
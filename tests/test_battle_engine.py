@@ -1,3 +1,6 @@
+import logging
+import random
+
 import pytest
 from battle_engine import select_actor, get_living_members
 from pcs import PC
@@ -28,3 +31,16 @@ def test_select_actor_priority():
 def test_select_actor_empty_team():
     with pytest.raises(IndexError):
         select_actor([], set())
+
+@pytest.mark.parametrize("level", [logging.WARNING, logging.DEBUG])
+def test_pc_rolls_do_not_depend_on_log_level(level, caplog):
+    def rolls():
+        rng = random.Random(11)
+        pc = PC("Alice", expertise_attack=True)
+        npc = NPC("Goblin", hp=3, dt=12, expertise_attack=True, expertise_defense=True)
+        drawn = [(pc.make_attack(npc, banes, rng=rng), pc.defend_attack(npc, banes, rng=rng)) for banes in range(20)]
+        return drawn, rng.random()
+
+    expected = rolls()
+    with caplog.at_level(level, logger="pcs"):
+        assert rolls() == expected
@@ -0,0 +1,65 @@
+from battle_engine import run_battle
+from battle_trace import EventRecorder, TraceFormatter
+from mass_engine import run_mass_battle
+from mechanics import Outcome, calculate_outcome
+from random_streams import battle_rng
+from scenario import compile_scenario
+
+CONFIG = {
+    "id": "traced",
+    "description": "traced",
+    "starting_momentum": "npcs",
+    "pcs": [{"name": "Hero", "hp": 3, "aptitude": 5, "exp_def": True}, {"name": "Sidekick", "hp": 2}],
+    "npcs": [{"name": "Brute", "hp": 3, "dt": 14, "exp_atk": True, "exp_def": True}, {"name": "Minion", "hp": 1, "dt": 11}]
+}
+
+def test_trace_does_not_change_battle():
+    scenario = compile_scenario(CONFIG)
+    for i in range(30):
+        recorder = EventRecorder()
+        traced = run_battle(i, scenario, rng=battle_rng(1, i), trace=recorder)
+        assert traced == run_battle(i, scenario, rng=battle_rng(1, i))
+        assert recorder.battles[0][2] == traced[2]
+        assert len(recorder.battles[0][1]) == sum(traced[0]) + sum(traced[1])
+
+def test_events_are_consistent_with_outcomes():
+    scenario = compile_scenario(CONFIG)
+    recorder = EventRecorder()
+    for i in range(30):
+        run_battle(i, scenario, rng=battle_rng(2, i), trace=recorder)
+    for _, events, _ in recorder.battles:
+        for e in events:
+            if e.pcs_turn:
+                aptitude, dt = scenario.pc_state.aptitude[e.actor], scenario.npc_state.dt[e.target]
+            else:
+                aptitude, dt = scenario.pc_state.aptitude[e.target], scenario.npc_state.dt[e.actor]
+            expected = Outcome.TRIUMPH if e.d20 == 20 else calculate_outcome(e.d20 + aptitude + e.boon - e.bane, dt)
+            assert e.outcome == expected
+            assert not (e.boon and e.bane)
+
+def test_mass_engine_emits_same_events():
+    scenario = compile_scenario(CONFIG)
+    a, b = EventRecorder(), EventRecorder()
+    for i in range(20):
+        run_battle(i, scenario, rng=battle_rng(4, i), trace=a)
+        run_mass_battle(i, scenario, rng=battle_rng(4, i), trace=b)
+    assert a.battles == b.battles
+
+def test_formatter_renders_battle_log():
+    scenario = compile_scenario(CONFIG)
+    recorder = EventRecorder()
+    run_battle(1, scenario, rng=battle_rng(3, 1), trace=recorder)
+    formatter = TraceFormatter(scenario)
+    _, events, winner = recorder.battles[0]
+    lines = formatter.battle_start(1)
+    for event in events:
+        lines.extend(formatter.turn(event))
+    lines.extend(formatter.battle_end(winner))
+    assert lines[0] == "=== Battle 1 Start ==="
+    assert lines[1].startswith("Turn 1: Brute (Friction: 0) acts against ")
+    assert lines[2] == "  -> Added Bane for Attacker Attack Expertise (Total Banes: 1)"
+    assert any(line.startswith("  -> Defense Roll: ") for line in lines)
+    assert lines[-1] == ("PCs Win!" if winner == "pcs" else "NPCs Win!")
+    # The tracked HP of the losing side ends at 0
+    losers = formatter.npc_hp if winner == "pcs" else formatter.pc_hp
+    assert not any(losers)
@@ -0,0 +1,70 @@
+import json
+
+from bulk_run import run_benchmarks, simulate_adaptive, simulate_scenarios, CHUNK_SIZE
+from confidence import wilson_interval
+from random_streams import derive_seed
+
+SCENARIOS = {
+    "duel": {
+        "id": "duel",
+        "description": "duel desc",
+        "starting_momentum": "pcs",
+        "pcs": [{"name": "PC1", "hp": 3}],
+        "npcs": [{"name": "NPC1", "hp": 3, "dt": 15}]
+    },
+    "pair": {
+        "id": "pair",
+        "description": "pair desc",
+        "starting_momentum": "npcs",
+        "pcs": [{"name": "PC1", "hp": 2}, {"name": "PC2", "hp": 2, "exp_def": True}],
+        "npcs": [{"name": "NPC1", "hp": 2, "dt": 14}, {"name": "NPC2", "hp": 1, "dt": 12}]
+    }
+}
+
+def test_derive_seed_is_stable_and_distinct():
+    assert derive_seed(1, "duel", 0) == derive_seed(1, "duel", 0)
+    assert derive_seed(1, "duel", 0) != derive_seed(1, "duel", 1)
+    assert derive_seed(1, "duel", 0) != derive_seed(2, "duel", 0)
+
+def test_results_independent_of_worker_count():
+    runs = CHUNK_SIZE + 20
+    serial = dict(simulate_scenarios(SCENARIOS, runs, seed=42, workers=1))
+    parallel = dict(simulate_scenarios(SCENARIOS, runs, seed=42, workers=2))
+    assert list(serial) == ["duel", "pair"]
+    assert all(len(data) == runs for data in serial.values())
+    assert serial == parallel
+
+def test_adaptive_stops_per_scenario_and_replays_fixed_streams():
+    lopsided = dict(SCENARIOS, rout={
+        "id": "rout", "description": "rout desc", "starting_momentum": "pcs",
+        "pcs": [{"name": "PC1", "hp": 4, "aptitude": 10}],
+        "npcs": [{"name": "NPC1", "hp": 1, "dt": 5}]
+    })
+    adaptive = dict(simulate_adaptive(lopsided, seed=7, target_width=0.1, batch_size=CHUNK_SIZE, max_runs=1000))
+    # A near-certain win needs a single batch; the duel needs more
+    assert len(adaptive["rout"]) == CHUNK_SIZE
+    assert len(adaptive["duel"]) > CHUNK_SIZE
+    for sid, summary in adaptive.items():
+        low, high = wilson_interval(summary.pc_wins, len(summary))
+        assert high - low <= 0.1 or len(summary) == 1000
+        fixed = dict(simulate_scenarios({sid: lopsided[sid]}, len(summary), seed=7))
+        assert fixed[sid] == summary
+
+def test_wilson_interval_bounds():
+    low, high = wilson_interval(0, 100)
+    assert low == 0.0 and 0.0 < high < 0.05
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+def test_file_with_repeated_ids_keeps_the_last_entry(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    stale = dict(SCENARIOS["duel"], description="stale duel")
+    entries = [stale, SCENARIOS["pair"], SCENARIOS["duel"]]
+    (tmp_path / "dupes.json").write_text(json.dumps({"scenarios": entries}), encoding="utf-8")
+    run_benchmarks("dupes.json", sim_count=20, seed=3)
+    simulated = [line.split(": ", 1)[1] for line in capsys.readouterr().out.splitlines() if line.startswith("Simulated: ")]
+    assert sorted(simulated) == ["duel", "pair"]
+    report = (tmp_path / "reports" / "balance_report_dupes.md").read_text(encoding="utf-8")
+    assert "stale duel" not in report
+
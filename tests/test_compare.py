@@ -0,0 +1,47 @@
+import copy
+
+from battle_engine import run_battle
+from compare import compare_scenarios
+from mass_engine import run_mass_battle
+from random_streams import RoleStreams
+from solver import solve_scenario
+
+DUEL = {
+    "id": "duel",
+    "description": "duel desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "Hero", "hp": 6, "aptitude": 5}],
+    "npcs": [{"name": "Foe", "hp": 6, "dt": 16}]
+}
+
+def test_role_streams_are_independent_and_mirrored():
+    a, b = RoleStreams(5), RoleStreams(5)
+    b.choice(range(10))
+    b.npc_rolls.random()
+    assert a.pc_rolls.random() == b.pc_rolls.random()
+
+    plain, mirrored = RoleStreams(5), RoleStreams(5, antithetic=True)
+    for _ in range(100):
+        u, v = plain.pc_rolls.random(), mirrored.pc_rolls.random()
+        assert 0.0 <= v < 1.0
+        assert abs(u + v - 1.0) < 1e-12
+    assert [plain.choice(range(4)) for _ in range(50)] == [3 - mirrored.choice(range(4)) for _ in range(50)]
+
+def test_engines_agree_on_role_streams():
+    for seed in range(20):
+        assert run_battle(1, DUEL, rng=RoleStreams(seed)) == run_mass_battle(1, DUEL, rng=RoleStreams(seed))
+
+def test_identical_variants_have_zero_difference():
+    result = compare_scenarios(DUEL, copy.deepcopy(DUEL), 200, seed=1, antithetic=True)
+    assert result.difference == 0.0
+    assert result.interval == (0.0, 0.0)
+
+def test_paired_interval_is_tighter_and_covers_the_exact_difference():
+    tougher = copy.deepcopy(DUEL)
+    tougher["pcs"][0]["hp"] = 7
+    exact = solve_scenario(DUEL).pc_win_probability - solve_scenario(tougher).pc_win_probability
+    for antithetic in (False, True):
+        result = compare_scenarios(DUEL, tougher, 2000, seed=3, antithetic=antithetic)
+        low, high = result.interval
+        assert low <= exact <= high
+        assert result.variance_reduction > 3
@@ -0,0 +1,38 @@
+import math
+import random
+
+from battle_engine import run_battle
+from importance import (PC_ATTACK_SCORES, ImportanceSampler, choose_tilt, estimate_win_probability)
+from mechanics import _tilted_table
+from random_streams import derive_seed
+from solver import solve_scenario
+
+LONG_SHOT = {
+    "id": "long_shot",
+    "description": "long shot desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "Hero", "hp": 3, "aptitude": 2}],
+    "npcs": [{"name": "Foe", "hp": 6, "dt": 19}]
+}
+
+def test_tilted_likelihood_ratios_average_to_one():
+    for theta in (0.0, 0.5, 2.0):
+        cdf, log_ratios = _tilted_table(False, -14, 1, PC_ATTACK_SCORES, theta)
+        tilted = [high - low for low, high in zip((0.0,) + cdf, cdf)]
+        assert math.isclose(sum(p * math.exp(r) for p, r in zip(tilted, log_ratios)), 1.0)
+
+def test_zero_tilt_is_plain_monte_carlo():
+    for i in range(20):
+        seed = derive_seed(7, "importance", i + 1)
+        sampler = ImportanceSampler(seed, theta=0.0)
+        assert run_battle(i + 1, LONG_SHOT, rng=sampler) == run_battle(i + 1, LONG_SHOT, rng=random.Random(seed))
+        assert math.isclose(sampler.likelihood_ratio, 1.0)
+
+def test_estimate_covers_the_exact_probability():
+    exact = solve_scenario(LONG_SHOT).pc_win_probability
+    assert exact < 1e-3
+    theta = choose_tilt(LONG_SHOT, seed=3, pilot_battles=100)
+    result = estimate_win_probability(LONG_SHOT, 2000, seed=3, theta=theta)
+    assert result.tilted_wins > 100
+    assert abs(result.probability - exact) < 4 * result.standard_error
+    assert result.relative_error < 0.2
@@ -0,0 +1,24 @@
+import gzip
+import shutil
+from pathlib import Path
+
+import pytest
+
+import main
+
+def test_results_file_is_flushed_when_a_run_fails(tmp_path, monkeypatch):
+    shutil.copy(Path(main.__file__).with_name("scenarios.json"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    def failing_stats(*args, **kwargs):
+        raise RuntimeError("report failed")
+
+    monkeypatch.setattr(main, "get_stats_lines", failing_stats)
+    # The traceback keeps the run's locals alive, so only an explicit close flushes the file
+    with pytest.raises(RuntimeError) as failure:
+        main.simulation_loop("offset_10_low", 20, seed=1, console="none", compress=True)
+    with gzip.open(tmp_path / "simulation_results.txt.gz", "rt", encoding="utf-8") as f:
+        text = f.read()
+    assert text.startswith("Scenario: ") and "=== Battle 1 Start ===" in text
+    assert "=== Simulation Results ===" in text
+    assert failure.traceback
@@ -0,0 +1,19 @@
+from battle_engine import run_battle
+from mass_engine import run_mass_battle
+from mass_benchmark import army_scenario
+from random_streams import battle_rng
+from scenario import compile_scenario
+
+def test_matches_object_engine_on_army():
+    scenario = compile_scenario(army_scenario(66))
+    for i in range(20):
+        assert run_mass_battle(i, scenario, rng=battle_rng(3, i)) == run_battle(i, scenario, rng=battle_rng(3, i))
+
+def test_matches_object_engine_with_random_targets():
+    config = {
+        "id": "npc_start", "description": "", "starting_momentum": "npcs",
+        "pcs": [{"name": f"PC{i}", "hp": 2, "exp_def": i == 1} for i in range(4)],
+        "npcs": [{"name": f"NPC{i}", "hp": 2, "dt": 14 + i % 3, "exp_atk": i == 2} for i in range(6)],
+    }
+    for i in range(50):
+        assert run_mass_battle(i, config, rng=battle_rng(5, i)) == run_battle(i, config, rng=battle_rng(5, i))
@@ -1,5 +1,5 @@
 import pytest
-from mechanics import roll_d20, roll_boon, roll_bane, calculate_outcome, Outcome
+from mechanics import roll_d20, roll_boon, roll_bane, calculate_outcome, outcome_distribution, sample_outcome, Outcome
 
 def test_roll_d20_bounds():
     """Verify d20 rolls are within [1, 20]."""
@@ -45,3 +45,40 @@ def test_outcome_edge_cases():
     # Setback is [dt-2, dt+2] -> [10, 14] for DT 12
     assert calculate_outcome(9, 12) == Outcome.FAILURE
     assert calculate_outcome(15, 12) == Outcome.CLEAN_SUCCESS
+
+def test_outcome_distribution_sums_to_one():
+    """Every table is a proper probability distribution."""
+    for expertise in (False, True):
+        for boons, banes in [(1, 0), (0, 0), (1, 3), (6, 0), (0, 9)]:
+            dist = outcome_distribution(expertise, 5, 15, boon_stacks=boons, bane_stacks=banes)
+            assert abs(sum(dist.values()) - 1.0) < 1e-12
+
+def test_outcome_distribution_matches_enumeration():
+    """Compare the table against a brute-force enumeration of the dice."""
+    from constants import BOON_BANE_DICE
+    aptitude, dt = 5, 14
+    expected = dict.fromkeys(Outcome, 0.0)
+    for r1 in range(1, 21):
+        for r2 in range(1, 21):
+            die_roll = max(r1, r2)
+            for boon in range(1, BOON_BANE_DICE[2] + 1):
+                p = 1 / 400 / BOON_BANE_DICE[2]
+                if die_roll == 20:
+                    expected[Outcome.TRIUMPH] += p
+                else:
+                    expected[calculate_outcome(die_roll + aptitude + boon, dt)] += p
+    dist = outcome_distribution(True, aptitude, dt, boon_stacks=3, bane_stacks=1)
+    for outcome in Outcome:
+        assert abs(dist[outcome] - expected[outcome]) < 1e-12
+
+def test_outcome_distribution_triumph_only_on_nat20():
+    """An unbeatable DT leaves only natural 20s as successes."""
+    dist = outcome_distribution(False, 0, 100)
+    assert dist[Outcome.TRIUMPH] == 0.05
+    assert dist[Outcome.CATASTROPHE] == 0.95
+
+def test_sample_outcome_follows_table():
+    """Sampled outcomes only hit outcomes with non-zero probability."""
+    dist = outcome_distribution(False, 5, 12, bane_stacks=2)
+    for _ in range(200):
+        assert dist[sample_outcome(False, 5, 12, bane_stacks=2)] > 0
@@ -0,0 +1,33 @@
+import pytest
+
+from exceptions import ConfigurationError
+from perf_benchmark import CaseResult, compare_results, load_baseline, run_suite, save_baseline
+
+def _result(battles_per_sec, peak_kib=100.0):
+    return CaseResult(battles=100, turns=1000, seconds=100 / battles_per_sec, battles_per_sec=battles_per_sec,
+                      us_per_turn=1e6 * (100 / battles_per_sec) / 1000, peak_kib=peak_kib)
+
+def test_suite_round_trips_through_a_baseline(tmp_path):
+    results = run_suite(engines=("object", "mass", "stats"), shapes=["1v15"], scale=0.005, repeats=1)
+    assert set(results) == {"object/1v15", "mass/1v15", "stats/1v15"}
+    # Both engines play the same seeded battles
+    assert results["object/1v15"].turns == results["mass/1v15"].turns
+    for r in results.values():
+        assert r.battles == 10 and r.battles_per_sec > 0 and r.peak_kib > 0
+
+    path = tmp_path / "baseline.json"
+    save_baseline(str(path), results)
+    assert load_baseline(str(path)) == results
+
+def test_compare_flags_only_regressions_beyond_the_threshold():
+    baseline = {"object/5v5": _result(1000.0), "mass/5v5": _result(1000.0), "stats/5v5": _result(1000.0)}
+    current = {"object/5v5": _result(950.0), "mass/5v5": _result(700.0), "stats/5v5": _result(2000.0, 200.0),
+               "batch/5v5": _result(1.0)}
+    regressions = compare_results(baseline, current, threshold=0.1)
+    assert {(r.case, r.metric) for r in regressions} == {
+        ("mass/5v5", "battles_per_sec"), ("mass/5v5", "us_per_turn"), ("stats/5v5", "peak_kib")}
+    assert regressions[0].change == pytest.approx(-0.3)
+
+def test_unknown_shape():
+    with pytest.raises(ConfigurationError):
+        run_suite(shapes=["7v7"])
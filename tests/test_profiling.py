@@ -0,0 +1,70 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import battle_engine
+import bulk_run
+import mechanics
+from battle_engine import run_battle
+from mass_engine import run_mass_battle
+from profiling import PhaseProfiler
+from random_streams import battle_rng
+from scenario import compile_scenario
+from team_state import ActorScheduler
+
+SKIRMISH = {
+    "id": "skirmish",
+    "description": "skirmish desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "Hero", "hp": 4, "aptitude": 5}, {"name": "Sidekick", "hp": 3, "aptitude": 3}],
+    "npcs": [{"name": f"Mook {i}", "hp": 1, "dt": 11} for i in range(4)]
+}
+
+def test_profiling_counts_phases_without_changing_results(tmp_path):
+    plain = [run_battle(i + 1, SKIRMISH, rng=battle_rng(1, i + 1)) for i in range(30)]
+    profiler = PhaseProfiler("test")
+    with profiler:
+        scenario = bulk_run.compile_scenario(SKIRMISH)
+        profiled = [run_battle(i + 1, scenario, rng=battle_rng(1, i + 1)) for i in range(30)]
+        mass = [run_mass_battle(i + 1, scenario, rng=battle_rng(1, i + 1)) for i in range(30)]
+    assert profiled == plain == mass
+
+    turns = sum(sum(p) + sum(n) for p, n, _ in plain)
+    assert profiler.calls[("scenario_build",)] == 1
+    assert profiler.calls[("battle",)] == 60
+    assert profiler.calls[("battle", "roll")] == 2 * turns
+    assert profiler.calls[("battle", "actor_select")] == 2 * turns
+    assert profiler.calls[("battle", "target_select")] == 2 * turns
+    assert ("battle", "win_check") in profiler.calls
+
+    path = tmp_path / "profile.folded"
+    profiler.write_collapsed(str(path))
+    stacks = dict(line.rsplit(" ", 1) for line in path.read_text().splitlines())
+    assert "test;battle;momentum_bookkeeping" in stacks
+    assert all(stack.startswith("test") and int(count) > 0 for stack, count in stacks.items())
+    assert any("momentum_bookkeeping" in line for line in profiler.lines())
+
+def test_hooks_are_removed_on_exit():
+    originals = (battle_engine._target_id, bulk_run.run_battle, bulk_run.compile_scenario,
+                 mechanics.outcome_samplers, ActorScheduler.__dict__["any_alive"])
+    with PhaseProfiler():
+        assert battle_engine._target_id is not originals[0]
+        assert bulk_run.run_battle is not originals[1]
+    assert (battle_engine._target_id, bulk_run.run_battle, bulk_run.compile_scenario,
+            mechanics.outcome_samplers, ActorScheduler.__dict__["any_alive"]) == originals
+    assert compile_scenario is bulk_run.compile_scenario
+
+def test_bulk_run_cli_times_report_rendering(tmp_path):
+    scenarios = [dict(SKIRMISH, id=f"skirmish_{i}") for i in range(3)]
+    (tmp_path / "scenarios.json").write_text(json.dumps({"scenarios": scenarios}), encoding="utf-8")
+    script = Path(bulk_run.__file__).resolve()
+    run = subprocess.run([sys.executable, str(script), "--file", "scenarios.json", "--runs", "20", "--seed", "1",
+                          "--profile", "--profile-out", "profile.folded"],
+                         cwd=tmp_path, check=True, capture_output=True, text=True)
+    report_calls = [int(line.split("|")[1]) for line in run.stdout.splitlines() if line.split("|")[0].strip() == "report"]
+    # One get_regression_lines per scenario, plus write_report even though bulk_run runs as __main__
+    assert report_calls == [len(scenarios) + 1]
+    stacks = dict(line.rsplit(" ", 1) for line in (tmp_path / "profile.folded").read_text().splitlines())
+    assert "bulk_run;report" in stacks and "bulk_run;battle;roll" in stacks
+
@@ -0,0 +1,32 @@
+import random
+from random_streams import battle_rng, derive_seed, spawn
+from battle_engine import run_battle
+
+CONFIG = {
+    "id": "seeded",
+    "description": "seeded desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "PC1", "hp": 3}, {"name": "PC2", "hp": 3}],
+    "npcs": [{"name": "NPC1", "hp": 3, "dt": 15}, {"name": "NPC2", "hp": 2, "dt": 13}]
+}
+
+def test_seeded_battle_is_reproducible():
+    results = [run_battle(1, CONFIG, rng=battle_rng(11, 1)) for _ in range(2)]
+    assert results[0] == results[1]
+
+def test_battle_streams_are_independent():
+    # Jumping to battle 2 does not depend on having played battle 1
+    assert battle_rng(11, 2).random() == battle_rng(11, 2).random()
+    assert battle_rng(11, 1).random() != battle_rng(11, 2).random()
+
+def test_spawn_streams_are_distinct():
+    streams = spawn(5, 3)
+    assert len({s.random() for s in streams}) == 3
+    assert derive_seed(5, "spawn", 0) != derive_seed(5, "spawn", 1)
+
+def test_global_stream_untouched_by_seeded_battle():
+    random.seed(0)
+    expected = random.random()
+    random.seed(0)
+    run_battle(1, CONFIG, rng=battle_rng(11, 1))
+    assert random.random() == expected
@@ -0,0 +1,55 @@
+import pytest
+
+from battle_engine import run_battle
+from battle_trace import EventRecorder
+from exceptions import ConfigurationError
+from random_streams import battle_rng
+from replay import (BattleLog, BattleSummary, battle_seed, iter_battle_log, parse_query, read_battle_log_header,
+                    replay_battle, simulate_summaries, summarize)
+from scenario import compile_scenario
+
+CONFIG = {
+    "id": "replay",
+    "description": "replay desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "PC1", "hp": 3}, {"name": "PC2", "hp": 2, "expertise_attack": True}],
+    "npcs": [{"name": "NPC1", "hp": 3, "dt": 14}, {"name": "NPC2", "hp": 2, "dt": 12}]
+}
+
+def test_replay_reproduces_the_run():
+    scenario = compile_scenario(CONFIG)
+    recorded = [summarize(i, battle_seed(9, i), *run_battle(i, scenario, rng=battle_rng(9, i))) for i in range(1, 41)]
+    assert list(simulate_summaries(scenario, 9, 40)) == recorded
+    assert list(simulate_summaries(scenario, 9, 40, engine="mass")) == recorded
+
+    first, second = EventRecorder(), EventRecorder()
+    for summary in recorded[::7]:
+        assert replay_battle(scenario, summary.battle, summary.seed, trace=first) == summary
+        replay_battle(scenario, summary.battle, summary.seed, engine="mass", trace=second)
+    assert first.battles == second.battles
+    assert [len(events) for _, events, _ in first.battles] == [s.turns for s in recorded[::7]]
+
+def test_battle_log_round_trip(tmp_path):
+    path = tmp_path / "battle_log.tsv"
+    summaries = list(simulate_summaries(compile_scenario(CONFIG), 3, 25))
+    with BattleLog(path, "replay", 3, "object") as log:
+        for summary in summaries:
+            log.write(summary)
+    header = read_battle_log_header(path)
+    assert (header["scenario"], header["seed"], header["engine"]) == ("replay", 3, "object")
+    assert list(iter_battle_log(path)) == summaries
+
+    path.write_text("battle\tseed\n", encoding="utf-8")
+    with pytest.raises(ConfigurationError):
+        read_battle_log_header(path)
+
+def test_parse_query():
+    summary = BattleSummary(battle=4, seed=1, winner="npcs", turns=30, pc_runs=5, npc_runs=6, pc_max_run=3,
+                            npc_max_run=11)
+    assert parse_query("winner=npcs npc_max_run>=10")(summary)
+    assert parse_query("winner=NPCS, turns<=30, pc_max_run!=4")(summary)
+    assert not parse_query("winner=pcs")(summary)
+    assert not parse_query("npc_max_run>11")(summary)
+    for bad in ("", "colour=red", "turns~3", "turns>=many", "winner=draw"):
+        with pytest.raises(ConfigurationError):
+            parse_query(bad)
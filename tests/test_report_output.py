@@ -0,0 +1,77 @@
+import gzip
+import io
+import logging
+
+import pytest
+
+from battle_engine import run_battle
+from battle_trace import LoggingTraceSink
+from exceptions import ConfigurationError
+from random_streams import battle_rng
+from report_output import OutputTraceSink, ReportOutput
+from scenario import compile_scenario
+
+CONFIG = {
+    "id": "output",
+    "description": "output desc",
+    "starting_momentum": "npcs",
+    "pcs": [{"name": "PC1", "hp": 3}, {"name": "PC2", "hp": 2, "expertise_defense": True}],
+    "npcs": [{"name": "NPC1", "hp": 3, "dt": 14, "expertise_attack": True}]
+}
+
+RESULTS = ["\n=== Simulation Results ===", "Final Scorecard: PCs 1 - NPCs 2"]
+
+def run_traced(sink, battles=3, end_battle=None):
+    scenario = compile_scenario(CONFIG)
+    for i in range(1, battles + 1):
+        run_battle(i, scenario, rng=battle_rng(2, i), trace=sink)
+        if end_battle:
+            end_battle()
+
+def test_file_matches_logging_output(tmp_path):
+    log = logging.getLogger("test_report_output")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    handler = logging.FileHandler(tmp_path / "logged.txt", mode="w", encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    try:
+        run_traced(LoggingTraceSink(log))
+        for line in RESULTS:
+            log.info(line)
+    finally:
+        handler.close()
+        log.removeHandler(handler)
+
+    console = io.StringIO()
+    with ReportOutput(tmp_path / "buffered.txt", console_stream=console) as output:
+        run_traced(OutputTraceSink(output), end_battle=output.end_battle)
+        output.results(RESULTS)
+    expected = (tmp_path / "logged.txt").read_text(encoding="utf-8")
+    assert (tmp_path / "buffered.txt").read_text(encoding="utf-8") == expected
+    assert console.getvalue() == expected
+
+def test_battle_details_are_batched(tmp_path):
+    console = io.StringIO()
+    output = ReportOutput(tmp_path / "results.txt", battle_batch=2, console_stream=console)
+    sink = OutputTraceSink(output)
+    run_traced(sink, battles=1, end_battle=output.end_battle)
+    assert console.getvalue() == ""
+    run_traced(sink, battles=1, end_battle=output.end_battle)
+    assert console.getvalue().count("Start ===") == 2
+    output.close()
+
+def test_console_policy_and_gzip(tmp_path):
+    console = io.StringIO()
+    path = tmp_path / "results.txt.gz"
+    with ReportOutput(path, console="results", compress=True, console_stream=console) as output:
+        output.write_file("Header\n\n")
+        run_traced(OutputTraceSink(output), end_battle=output.end_battle)
+        output.results(RESULTS)
+    assert console.getvalue() == "\n".join(RESULTS) + "\n"
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        text = f.read()
+    assert text.startswith("Header\n\n=== Battle 1 Start ===") and text.endswith("\n".join(RESULTS) + "\n")
+
+    with pytest.raises(ConfigurationError):
+        ReportOutput(tmp_path / "other.txt", console="loud")
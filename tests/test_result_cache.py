@@ -0,0 +1,52 @@
+import bulk_run
+from bulk_run import CHUNK_SIZE, simulate_scenarios
+from result_cache import ResultCache, scenario_key
+from streaming_stats import MomentumRegression
+
+CONFIG = {
+    "id": "duel",
+    "description": "duel desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "PC1", "hp": 3}],
+    "npcs": [{"name": "NPC1", "hp": 3, "dt": 15}]
+}
+
+def test_key_depends_on_content_engine_and_seed():
+    key = scenario_key(CONFIG, "object", 1)
+    assert key == scenario_key(dict(reversed(list(CONFIG.items()))), "object", 1)
+    assert key != scenario_key(dict(CONFIG, npcs=[{"name": "NPC1", "hp": 3, "dt": 16}]), "object", 1)
+    assert key != scenario_key(CONFIG, "mass", 1)
+    assert key != scenario_key(CONFIG, "object", 2)
+
+def test_rules_version_bump_invalidates(monkeypatch):
+    key = scenario_key(CONFIG, "object", 1)
+    monkeypatch.setattr("result_cache.RULES_VERSION", 999)
+    assert scenario_key(CONFIG, "object", 1) != key
+
+def test_cached_results_match_and_extend(tmp_path, monkeypatch):
+    runs = CHUNK_SIZE + 30
+    uncached = dict(simulate_scenarios({"duel": CONFIG}, runs, seed=3))
+    cache = ResultCache(tmp_path)
+    assert dict(simulate_scenarios({"duel": CONFIG}, runs, seed=3, cache=cache)) == uncached
+    assert cache.stats() == (0, 2)
+
+    # A fresh cache on the same directory serves everything from disk
+    cache = ResultCache(tmp_path)
+    calls = []
+    real_run_chunk = bulk_run.run_chunk
+    monkeypatch.setattr(bulk_run, "run_chunk", lambda task: calls.append(task) or real_run_chunk(task))
+    assert dict(simulate_scenarios({"duel": CONFIG}, runs, seed=3, cache=cache)) == uncached
+    assert calls == []
+
+    # More runs reuse the full first chunk and only simulate the rest
+    more = dict(simulate_scenarios({"duel": CONFIG}, 2 * CHUNK_SIZE, seed=3, cache=cache))
+    assert len(more["duel"]) == 2 * CHUNK_SIZE
+    assert [task[2] for task in calls] == [CHUNK_SIZE]
+
+def test_eviction_keeps_directory_within_budget(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1)
+    summary = MomentumRegression()
+    summary.add_runs("pcs", [1, 2], [1])
+    cache.put("a" * 64, 0, 1, summary)
+    cache.flush()
+    assert list(tmp_path.glob("*.json")) == []
@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from battle_engine import run_battle
+from bulk_run import simulate_scenarios
+from random_streams import battle_rng
+from results_store import ResultsStore, ResultsWriter
+from scenario import compile_scenario
+from stats import get_regression_lines
+from streaming_stats import MomentumRegression
+
+CONFIG = {
+    "id": "store",
+    "description": "store desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "PC1", "hp": 3}, {"name": "PC2", "hp": 2}],
+    "npcs": [{"name": "NPC1", "hp": 3, "dt": 14}]
+}
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    scenario = compile_scenario(CONFIG)
+    expected = MomentumRegression()
+    final_hp = []
+    with ResultsWriter(tmp_path) as writer:
+        index = writer.scenario_index(CONFIG)
+        for i in range(150):
+            pcs_runs, npcs_runs, winner = run_battle(i + 1, scenario, rng=battle_rng(4, i + 1))
+            expected.add_runs(winner, pcs_runs, npcs_runs)
+            final_hp.append(scenario.pc_state.hp.tolist() + scenario.npc_state.hp.tolist())
+            writer.append(index, 4, i + 1, pcs_runs, npcs_runs, winner, final_hp[-1])
+
+    store = ResultsStore(tmp_path)
+    assert len(store) == 150
+    assert isinstance(store["winner"], np.memmap)
+    assert store["battle"].tolist() == list(range(1, 151))
+    assert int(store["winner"].sum()) == expected.pc_wins
+    assert [store.final_hp(i).tolist() for i in range(150)] == final_hp
+    assert get_regression_lines(store.regression()) == get_regression_lines(expected)
+
+def test_bulk_run_store_matches_summaries(tmp_path):
+    other = dict(CONFIG, id="other", npcs=[{"name": "NPC1", "hp": 2, "dt": 12}])
+    scenarios = {"store": CONFIG, "other": other}
+    with ResultsWriter(tmp_path) as writer:
+        summaries = dict(simulate_scenarios(scenarios, 250, seed=2, writer=writer))
+    assert summaries == dict(simulate_scenarios(scenarios, 250, seed=2))
+
+    store = ResultsStore(tmp_path)
+    assert len(store) == 500
+    assert store["hp"].shape == (500 * 3,)
+    stored = store.scenario_summaries()
+    for sid, summary in summaries.items():
+        assert stored[sid].battles == summary.battles
+        assert stored[sid].pc_wins == summary.pc_wins
+        assert get_regression_lines(stored[sid]) == get_regression_lines(summary)
@@ -0,0 +1,62 @@
+from battle_engine import run_battle
+from mass_engine import run_mass_battle
+from random_streams import battle_rng
+from scenario import CompiledScenario, validate_scenario_config
+
+CONFIG = {
+    "id": "compiled",
+    "description": "compiled desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": "PC1", "hp": 3, "aptitude": 6, "exp_def": True}, {"name": "PC2"}],
+    "npcs": [{"name": "NPC1", "hp": 2, "dt": 14, "exp_def": True, "exp_atk": True}]
+}
+
+def test_validate_returns_compiled_scenario():
+    scenario = validate_scenario_config(CONFIG)
+    assert isinstance(scenario, CompiledScenario)
+    assert [pc.name for pc in scenario.pcs] == ["PC1", "PC2"]
+    assert scenario.starting_momentum == "pcs"
+
+def test_matchup_tables():
+    scenario = validate_scenario_config(CONFIG)
+    # PC1 attacking NPC1: PC1 aptitude vs NPC1 DT, +1 bane for defense expertise
+    assert scenario.pc_attack[0][0] == (False, 6, 14, 1)
+    # NPC1 attacking PC2: PC2 defends with default aptitude, +1 bane for attack expertise
+    assert scenario.npc_attack[0][1] == (False, 5, 14, 1)
+    assert scenario.npc_attack[0][0][0] is True
+
+def test_reset_restores_hp_in_place():
+    scenario = validate_scenario_config(CONFIG)
+    pc = scenario.pcs[0]
+    pc.take_damage(2)
+    scenario.reset()
+    assert scenario.pcs[0] is pc
+    assert pc.hp == 3
+
+def test_compiled_matches_dict_config():
+    scenario = validate_scenario_config(CONFIG)
+    for battle in range(1, 6):
+        from_dict = run_battle(battle, CONFIG, rng=battle_rng(3, battle))
+        from_compiled = run_battle(battle, scenario, rng=battle_rng(3, battle))
+        assert from_dict == from_compiled
+
+def test_view_edits_reach_the_engines():
+    edited = {**CONFIG, "pcs": [{"name": "PC1", "hp": 3, "aptitude": 2, "exp_atk": True}, {"name": "PC2"}],
+              "npcs": [{"name": "NPC1", "hp": 2, "dt": 40}, {"name": "NPC2", "hp": 2, "dt": 8}]}
+    scenario = validate_scenario_config({**CONFIG, "npcs": CONFIG["npcs"] + [{"name": "NPC2", "hp": 2, "dt": 8}]})
+    run_battle(1, scenario, rng=battle_rng(3, 1))
+    scenario.pcs[0].aptitude = 2
+    scenario.pcs[0].expertise_attack = True
+    scenario.pcs[0].expertise_defense = False
+    scenario.npcs[0].dt = 40
+    scenario.npcs[0].expertise_attack = False
+    scenario.npcs[0].expertise_defense = False
+
+    expected = validate_scenario_config(edited)
+    assert scenario.pc_state.actor_order == expected.pc_state.actor_order == (0, 1)
+    assert scenario.npc_state.dt_order == expected.npc_state.dt_order == (1, 0)
+    for battle_fn in (run_battle, run_mass_battle):
+        for battle in range(1, 21):
+            assert battle_fn(battle, scenario, rng=battle_rng(3, battle)) == \
+                battle_fn(battle, expected, rng=battle_rng(3, battle))
+    assert scenario.pc_attack == expected.pc_attack and scenario.npc_attack == expected.npc_attack
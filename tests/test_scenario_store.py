@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+import scenario_store
+from exceptions import ConfigurationError
+from scenario_store import ScenarioStore, iter_scenarios
+
+SCENARIOS = [
+    {"id": "duel", "description": "Élan vs. 竜", "pcs": [{"name": "Ÿves", "hp": 3}], "npcs": [{"name": "竜", "hp": 4, "dt": 15}]},
+    {"id": "skirmish", "description": "two on one", "pcs": [{"name": "A", "hp": 2}, {"name": "B", "hp": 2}],
+     "npcs": [{"name": "Orc", "hp": 3, "dt": 1e1}]},
+    {"id": "horde", "description": "one on many", "pcs": [{"name": "Hero", "hp": 6}],
+     "npcs": [{"name": f"Goblin {i}", "hp": 1, "dt": 12} for i in range(30)]},
+]
+
+def write(path, scenarios, **extra):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "scenarios": scenarios, **extra}, f, indent=2, ensure_ascii=False)
+
+def test_lookup_matches_full_parse(tmp_path, monkeypatch):
+    # A tiny read size splits entries and multi-byte characters across reads
+    monkeypatch.setattr(scenario_store, "READ_SIZE", 7)
+    path = tmp_path / "scenarios.json"
+    write(path, SCENARIOS, notes=["trailing", {"key": None}])
+    store = ScenarioStore(path)
+    assert list(store) == [s["id"] for s in SCENARIOS]
+    assert {sid: store[sid] for sid in store} == {s["id"]: s for s in SCENARIOS}
+    assert "horde" in store and "missing" not in store
+    with pytest.raises(KeyError):
+        store["missing"]
+    assert list(iter_scenarios(path)) == SCENARIOS
+
+def test_index_is_reused(tmp_path, monkeypatch):
+    path = tmp_path / "scenarios.json"
+    write(path, SCENARIOS)
+    first = ScenarioStore(path)
+    assert (tmp_path / "scenarios.json.idx").exists()
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("the file was rescanned")
+
+    monkeypatch.setattr(scenario_store, "_scan", no_scan)
+    second = ScenarioStore(path)
+    assert second["duel"] == SCENARIOS[0]
+    assert second.source_hash == first.source_hash
+    assert second.content_hash("horde") == first.content_hash("horde")
+
+def test_touched_file_keeps_its_entries(tmp_path, monkeypatch):
+    path = tmp_path / "scenarios.json"
+    write(path, SCENARIOS)
+    ScenarioStore(path)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    monkeypatch.setattr(scenario_store, "_scan", lambda *args, **kwargs: iter(()))
+    store = ScenarioStore(path)
+    assert store["skirmish"] == SCENARIOS[1]
+    index = json.loads((tmp_path / "scenarios.json.idx").read_text(encoding="utf-8"))
+    assert index["mtime_ns"] == stat.st_mtime_ns + 10 ** 9
+
+def test_edit_rebuilds_index(tmp_path):
+    path = tmp_path / "scenarios.json"
+    write(path, SCENARIOS)
+    store = ScenarioStore(path)
+    old_hash = store.content_hash("duel")
+
+    edited = [dict(SCENARIOS[0], description="rewritten")] + SCENARIOS[2:] + [{"id": "new", "pcs": [], "npcs": []}]
+    write(path, edited)
+    assert list(store) == ["duel", "horde", "new"]
+    assert store["duel"]["description"] == "rewritten"
+    assert store.content_hash("duel") != old_hash
+    assert "skirmish" not in ScenarioStore(path)
+
+def test_malformed_file_raises(tmp_path):
+    path = tmp_path / "scenarios.json"
+    text = json.dumps({"scenarios": SCENARIOS})
+    path.write_text(text[:len(text) // 2], encoding="utf-8")
+    with pytest.raises(ConfigurationError):
+        ScenarioStore(path)
+    path.write_text(json.dumps({"scenarios": [{"name": "no id"}]}), encoding="utf-8")
+    with pytest.raises(ConfigurationError):
+        list(iter_scenarios(path))
+    with pytest.raises(ConfigurationError):
+        ScenarioStore(tmp_path / "missing.json")
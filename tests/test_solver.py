@@ -0,0 +1,53 @@
+import pytest
+from solver import solve_scenario
+from exceptions import SolverError
+
+def make_config(pcs, npcs, momentum="pcs"):
+    return {"id": "exact", "description": "exact", "starting_momentum": momentum, "pcs": pcs, "npcs": npcs}
+
+def test_guaranteed_first_hit():
+    # DT 0 is always beaten by 3+, so the PC wins on the first turn
+    solution = solve_scenario(make_config([{"name": "PC1"}], [{"name": "Mook", "hp": 1, "dt": 0}]))
+    assert solution.pc_win_probability == pytest.approx(1.0)
+    assert solution.expected_turns == pytest.approx(1.0)
+    assert solution.pc_run_lengths == pytest.approx({1: 1.0})
+    assert solution.npc_run_lengths == {}
+
+def test_natural_20_duel_closed_form():
+    # Against DT 100 only natural 20s succeed: the PC wins on a nat 20 attack,
+    # otherwise the wall attacks and the PC dies unless the defense is a nat 20.
+    solution = solve_scenario(make_config([{"name": "PC1", "hp": 1}], [{"name": "Wall", "hp": 1, "dt": 100}]))
+    loop = 0.95 * 0.05
+    assert solution.pc_win_probability == pytest.approx(0.05 / (1 - loop))
+    assert solution.expected_turns == pytest.approx(1.95 / (1 - loop))
+
+def test_run_length_distributions_are_normalized():
+    config = make_config(
+        [{"name": "PC1", "hp": 2, "exp_atk": True}, {"name": "PC2", "hp": 2}],
+        [{"name": "NPC1", "hp": 2, "dt": 15}, {"name": "NPC2", "hp": 1, "dt": 13, "exp_def": True}],
+        momentum="npcs"
+    )
+    solution = solve_scenario(config)
+    assert 0.0 < solution.pc_win_probability < 1.0
+    assert sum(solution.pc_run_lengths.values()) == pytest.approx(1.0)
+    assert sum(solution.npc_run_lengths.values()) == pytest.approx(1.0)
+    # Every turn belongs to exactly one run
+    expected_turns = sum(k * c for k, c in solution.expected_pc_runs.items()) + \
+        sum(k * c for k, c in solution.expected_npc_runs.items())
+    assert solution.expected_turns == pytest.approx(expected_turns)
+
+def test_state_limit():
+    config = make_config([{"name": f"PC{i}", "hp": 4} for i in range(5)],
+                         [{"name": f"NPC{i}", "hp": 4, "dt": 15} for i in range(5)])
+    with pytest.raises(SolverError):
+        solve_scenario(config, max_states=100)
+
+def test_cache_is_keyed_by_state_limit():
+    config = make_config([{"name": "PC1", "hp": 3}, {"name": "PC2", "hp": 2}],
+                         [{"name": "NPC1", "hp": 3, "dt": 15}, {"name": "NPC2", "hp": 2, "dt": 13}])
+    solution = solve_scenario(config)
+    assert solve_scenario(dict(config)) is solution
+    # A solution found under a generous limit is not returned for a call whose limit it exceeds
+    with pytest.raises(SolverError):
+        solve_scenario(config, max_states=solution.states - 1)
+
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from battle_engine import run_battle
+from mass_engine import run_mass_battle
+from random_streams import battle_rng
+from scenario import compile_scenario
+from strategies import (LivingIndex, LowestDtIndex, TargetIndex, TargetingStrategy, bind_strategies, lowest_dt_strategy,
+                        random_strategy)
+
+SKIRMISH = {
+    "id": "skirmish",
+    "description": "skirmish desc",
+    "starting_momentum": "pcs",
+    "pcs": [{"name": f"PC {i}", "hp": 2, "aptitude": 4} for i in range(3)],
+    "npcs": [{"name": f"NPC {i}", "hp": 1, "dt": 10 + (7 * i) % 5} for i in range(12)]
+}
+
+def test_indexes_pick_what_the_function_strategies_pick():
+    scenario = compile_scenario(SKIRMISH)
+    npcs, hero = scenario.npc_state, scenario.pcs[0]
+    living, lowest = random_strategy.bind(npcs), lowest_dt_strategy.bind(npcs)
+    assert isinstance(living, LivingIndex) and isinstance(lowest, LowestDtIndex)
+    assert isinstance(lowest_dt_strategy.bind(scenario.pc_state), LivingIndex)
+
+    order = list(range(len(npcs)))
+    random.Random(4).shuffle(order)
+    for dead in order:
+        for seed in range(5):
+            expected = random_strategy(hero, scenario.npcs, rng=random.Random(seed))
+            assert living.choose(random.Random(seed)) == expected.index
+        assert lowest.choose() == lowest_dt_strategy(hero, scenario.npcs).index
+        npcs.take_damage(dead, 1)
+        living.on_death(dead)
+    assert living.alive == 0
+    assert living.choose(random.Random(0)) is None and lowest.choose() is None
+
+def test_members_share_indexes_and_functions_are_left_unbound():
+    def first_living(actor, enemy_team, rng=None):
+        return next((e for e in enemy_team if e.is_alive()), None)
+
+    scenario = compile_scenario(SKIRMISH)
+    per_member, distinct = bind_strategies([random_strategy, first_living, random_strategy, lowest_dt_strategy],
+                                           scenario.npc_state)
+    assert per_member[0] is per_member[2]
+    assert per_member[1] is None
+    assert len(distinct) == 2
+
+def test_incomplete_strategies_fail_on_creation():
+    class BindOnly(TargetingStrategy):
+        def bind(self, enemies):
+            return LivingIndex(enemies)
+
+    class NoChoice(TargetIndex):
+        pass
+
+    with pytest.raises(TypeError):
+        BindOnly()
+    with pytest.raises(TypeError):
+        NoChoice()
+
+def test_two_argument_strategies_still_work():
+    def first_living(actor, enemy_team):
+        return next((e for e in enemy_team if e.is_alive()), None)
+
+    def first_living_seeded(actor, enemy_team, rng=None):
+        return first_living(actor, enemy_team)
+
+    results = []
+    for strategy in (first_living, first_living_seeded):
+        scenario = compile_scenario(SKIRMISH)
+        for pc in scenario.pcs:
+            pc.targeting_strategy = strategy
+        results.append([run_battle(i, scenario, rng=battle_rng(4, i)) for i in range(1, 21)])
+        results.append([run_mass_battle(i, scenario, rng=battle_rng(4, i)) for i in range(1, 21)])
+    assert results[0] == results[1] == results[2] == results[3]
+
@@ -0,0 +1,57 @@
+import random
+import statistics
+
+import pytest
+
+from streaming_stats import Covariance, MomentumRegression, RunLengthHistogram, Welford
+
+@pytest.mark.parametrize("size", [2, 3, 4, 5, 10, 101, 1000])
+def test_histogram_order_statistics_match_statistics_module(size):
+    rng = random.Random(size)
+    data = [rng.randint(1, 8) for _ in range(size)]
+    hist = RunLengthHistogram(data)
+    assert hist.median() == statistics.median(data)
+    assert hist.quantiles(n=4) == statistics.quantiles(data, n=4)
+    assert hist.mean == statistics.mean(data)
+    assert (hist.min, hist.max, len(hist)) == (min(data), max(data), len(data))
+
+def test_single_run_quartiles():
+    assert RunLengthHistogram([3]).quantiles(n=4) == [3.0, 3.0, 3.0]
+
+def test_welford_and_merge():
+    rng = random.Random(1)
+    data = [rng.random() for _ in range(500)]
+    whole, left, right = Welford(), Welford(), Welford()
+    for i, x in enumerate(data):
+        whole.add(x)
+        (left if i < 200 else right).add(x)
+    left.merge(right)
+    assert whole.variance == pytest.approx(statistics.variance(data))
+    assert left.mean == pytest.approx(whole.mean)
+    assert left.variance == pytest.approx(whole.variance)
+
+def test_covariance_matches_two_pass():
+    rng = random.Random(2)
+    xs = [rng.random() * 3 for _ in range(300)]
+    ys = [1 if x + rng.random() > 2 else 0 for x in xs]
+    cov = Covariance()
+    for x, y in zip(xs, ys):
+        cov.add(x, y)
+    mx, my = statistics.mean(xs), statistics.mean(ys)
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    assert cov.pearson() == pytest.approx(sxy / (sxx * syy) ** 0.5)
+    slope, intercept = cov.linear_fit()
+    assert slope == pytest.approx(sxy / sxx)
+    assert intercept == pytest.approx(my - slope * mx)
+
+def test_regression_merge_equals_single_pass():
+    battles = [("pcs" if i % 3 else "npcs", [1 + i % 4, 2], [1 + i % 2]) for i in range(50)]
+    whole, a, b = MomentumRegression(), MomentumRegression(), MomentumRegression()
+    for i, battle in enumerate(battles):
+        whole.add_runs(*battle)
+        (a if i < 20 else b).add_runs(*battle)
+    a.merge(b)
+    assert (a.battles, a.pc_wins) == (whole.battles, whole.pc_wins)
+    assert a.diff.pearson() == pytest.approx(whole.diff.pearson())
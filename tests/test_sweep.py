@@ -0,0 +1,63 @@
+import itertools
+import json
+
+import pytest
+
+from bulk_run import simulate_scenarios
+from exceptions import ConfigurationError
+from generate_benchmarks import benchmark_sweep
+from scenario import validate_scenario_config
+from sweep import Sweep
+
+def test_benchmark_grid_ids_and_order():
+    sweep = benchmark_sweep()
+    configs = list(sweep)
+    assert len(configs) == len(sweep) == 108
+    assert configs[0]["id"] == "1v1_off5"
+    assert configs[-1]["id"] == "5v15_off20"
+    assert configs[0]["npcs"] == [{"name": "NPC 1", "hp": 10, "dt": 10}]
+    for config in configs[:10]:
+        validate_scenario_config(config)
+
+def test_multi_valued_axes_get_id_suffixes():
+    sweep = Sweep(offsets=[7], pc_sizes=[2], npc_sizes=[3], pc_hp=[3, 4],
+                  npc_expertise=["none", "both"], starting_momentum=["pcs", "npcs"])
+    ids = [config["id"] for config in sweep]
+    assert len(ids) == len(set(ids)) == 8
+    assert "2v3_off7_pchp4_npcxboth_npcsfirst" in ids
+    both = next(c for c in sweep if c["id"] == "2v3_off7_pchp3_npcxboth_pcsfirst")
+    assert all(n["expertise_attack"] and n["expertise_defense"] for n in both["npcs"])
+    assert both["starting_momentum"] == "pcs"
+
+def test_huge_sweep_is_lazy():
+    sweep = Sweep(offsets=range(100), pc_sizes=range(1, 101), npc_sizes=range(1, 101))
+    assert len(sweep) == 10 ** 6
+    assert [c["id"] for c in itertools.islice(sweep, 2)] == ["1v1_off0", "1v1_off1"]
+
+def test_invalid_axes():
+    with pytest.raises(ConfigurationError):
+        Sweep(offsets=[], pc_sizes=[1], npc_sizes=[1])
+    with pytest.raises(ConfigurationError):
+        Sweep(offsets=[5], pc_sizes=[1], npc_sizes=[1], pc_expertise=["sometimes"])
+
+def test_runner_streams_results_before_consuming_the_sweep():
+    consumed = []
+
+    def configs():
+        for config in Sweep(offsets=[5, 7, 9], pc_sizes=[1], npc_sizes=[1, 2]):
+            consumed.append(config["id"])
+            yield config
+
+    results = simulate_scenarios(configs(), 20, seed=1)
+    sid, summary = next(results)
+    assert sid == "1v1_off5" and len(summary) == 20
+    assert len(consumed) < 6
+    assert len(list(results)) == 5
+
+def test_write_json_matches_indented_dump(tmp_path):
+    sweep = Sweep(offsets=[5, 9], pc_sizes=[1, 2], npc_sizes=[3], pc_hp=[2, 4], pc_expertise=["none", "both"])
+    assert sweep.write_json(tmp_path / "streamed.json") == len(sweep)
+    with open(tmp_path / "dumped.json", "w", encoding="utf-8") as f:
+        json.dump({"scenarios": list(sweep)}, f, indent=4)
+    assert (tmp_path / "streamed.json").read_bytes() == (tmp_path / "dumped.json").read_bytes()
+
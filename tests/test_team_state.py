@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from npcs import NPC
+from pcs import PC
+from battle_engine import select_actor
+from mass_benchmark import army_scenario
+from scenario import compile_scenario
+from strategies import LivingIndex
+from team_state import ActorScheduler, TeamState
+
+def test_views_share_team_columns():
+    team = TeamState(has_dt=True)
+    a = NPC("A", hp=3, dt=14, team=team)
+    b = NPC("B", hp=2, dt=12, expertise_attack=True, team=team)
+    assert (a.index, b.index) == (0, 1)
+    b.take_damage(1)
+    assert list(team.hp) == [3, 1]
+    assert team.actor_order == (1, 0)
+    assert team.dt_order == (1, 0)
+    team.reset()
+    assert b.hp == 2
+
+def test_standalone_views_have_no_dict():
+    pc = PC("Alice")
+    assert len(pc.team) == 1
+    assert not hasattr(pc, "__dict__")
+    with pytest.raises(AttributeError):
+        pc.extra = 1
+
+def test_living_ids_and_floor():
+    team = TeamState()
+    for name in ("P1", "P2", "P3"):
+        PC(name, hp=2, team=team)
+    team.take_damage(1, 5)
+    assert team.hp[1] == 0
+    assert team.living_ids() == [0, 2]
+    assert team.any_alive()
+
+def test_scheduler_matches_select_actor():
+    rng = random.Random(11)
+    for _ in range(30):
+        team = TeamState(has_dt=True)
+        views = [NPC(f"N{i}", hp=rng.randint(1, 3), dt=12, expertise_attack=rng.random() < 0.3, team=team)
+                 for i in range(rng.randint(1, 12))]
+        scheduler = ActorScheduler(team)
+        for _ in range(8):
+            # Between runs the team is the passive side and takes damage
+            for view in views:
+                if view.is_alive() and rng.random() < 0.3:
+                    scheduler.take_damage(view.index, 1)
+            assert scheduler.alive == len(team.living_ids())
+            if not scheduler.any_alive():
+                break
+            scheduler.new_run()
+            run_actors = set()
+            for _ in range(rng.randint(1, 2 * len(views))):
+                actor = scheduler.next_actor()
+                assert views[actor] is select_actor(views, run_actors)
+                run_actors.add(views[actor])
+                everyone_acted = all(v in run_actors or not v.is_alive() for v in views)
+                assert scheduler.mark_acted(actor) == everyone_acted
+
+
+def test_scheduler_tracks_deaths():
+    scenario = compile_scenario(army_scenario(22))
+    team = scenario.npc_scheduler
+    targets = LivingIndex(scenario.npc_state)
+    assert team.alive == targets.alive == 20
+    for index in (0, 3):
+        assert team.take_damage(index, 1)
+        targets.on_death(index)
+    assert team.alive == targets.alive == 18
+    assert targets.kth_living(0) == 1
+    assert targets.kth_living(2) == 4
+    # Walk the run queue: every living member acts once, then the run is exhausted
+    acted = []
+    exhausted = False
+    while not exhausted:
+        actor = team.next_actor()
+        acted.append(actor)
+        exhausted = team.mark_acted(actor)
+    assert sorted(acted) == [i for i in range(20) if i not in (0, 3)]
+    assert team.next_actor() == team.head
+    scenario.reset()
+    assert team.alive == 20 and team.head == 0